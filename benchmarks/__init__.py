@@ -0,0 +1,3 @@
+"""
+Offline benchmarks for the Research Daily Update Bot.
+"""
\ No newline at end of file
@@ -0,0 +1,389 @@
+"""
+Local stand-ins for arXiv, the LLM endpoint and the Slack Web API.
+
+Each fake is a small HTTP server on 127.0.0.1 so the bot's real clients,
+connection pools and retry logic are exercised end to end. Point the bot at
+them with ARXIV_API_URL, LLM_BASE_URL and SLACK_API_URL.
+"""
+import os
+import re
+import json
+import time
+import random
+import threading
+from datetime import datetime, timezone, timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "fixtures", "arxiv_corpus.json")
+
+ATOM_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom" '
+    'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">\n'
+    '<title>arXiv Query</title>\n'
+    '<opensearch:totalResults>{total}</opensearch:totalResults>\n'
+    '<opensearch:startIndex>{start}</opensearch:startIndex>\n'
+    '<opensearch:itemsPerPage>{per_page}</opensearch:itemsPerPage>\n'
+)
+
+ATOM_ENTRY = (
+    '<entry>\n'
+    '<id>http://arxiv.org/abs/{arxiv_id}</id>\n'
+    '<updated>{published}</updated>\n'
+    '<published>{published}</published>\n'
+    '<title>{title}</title>\n'
+    '<summary>{abstract}</summary>\n'
+    '<author><name>{author}</name></author>\n'
+    '<link href="http://arxiv.org/abs/{arxiv_id}" rel="alternate" type="text/html"/>\n'
+    '<link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}" rel="related" type="application/pdf"/>\n'
+    '<arxiv:primary_category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>\n'
+    '<category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>\n'
+    '</entry>\n'
+)
+
+QUERY_TOPIC = re.compile(r'"([^"]+)"')
+QUERY_DATES = re.compile(r"submittedDate:\[(\d{12}) TO (\d{12})\]")
+
+class FakeServer:
+    """
+    Threaded HTTP server running in a background thread.
+    """
+
+    handler_class = None
+
+    def __init__(self):
+        handler = type("Handler", (self.handler_class,), {"fake": self})
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def send_body(self, status, body, content_type, extra_headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+class FakeArxivCorpus:
+    """
+    Deterministic paper corpus generated from the fixture file.
+
+    Every topic gets papers_per_topic_day papers for each of the last `days`
+    days, so larger windows and more topics produce proportionally larger feeds.
+    """
+
+    def __init__(self, fixture_path=FIXTURE_PATH, seed=0, now=None):
+        with open(fixture_path) as f:
+            fixture = json.load(f)
+        self.topics = fixture["topics"]
+        self.now = now or datetime.now(timezone.utc).replace(second=0, microsecond=0)
+        rng = random.Random(seed)
+
+        self.by_topic = {}
+        sequence = 0
+        for topic in self.topics:
+            papers = []
+            for day in range(fixture["days"]):
+                for _ in range(fixture["papers_per_topic_day"]):
+                    sequence += 1
+                    method = rng.choice(fixture["methods"])
+                    values = {"topic": topic, "method": method}
+                    sentences = rng.sample(fixture["abstract_sentences"], 4)
+                    papers.append({
+                        "arxiv_id": f"2601.{sequence:05d}v1",
+                        "title": rng.choice(fixture["title_templates"]).format(**values),
+                        "abstract": " ".join(sentence.format(**values) for sentence in sentences),
+                        "author": f"Author {sequence % 997}",
+                        "published": self.now - timedelta(days=day, minutes=rng.randrange(24 * 60))
+                    })
+            papers.sort(key=lambda paper: paper["published"], reverse=True)
+            self.by_topic[topic.lower()] = papers
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def search(self, query):
+        """
+        Get the papers matching an arXiv query, newest first.
+
+        Args:
+            query (str): search_query built by the bot
+
+        Returns:
+            list: Matching paper records
+        """
+        with self._lock:
+            if query in self._cache:
+                return self._cache[query]
+
+        topics = [topic.lower() for topic in QUERY_TOPIC.findall(query)]
+        dates = QUERY_DATES.search(query)
+        since = until = None
+        if dates:
+            since = datetime.strptime(dates.group(1), "%Y%m%d%H%M").replace(tzinfo=timezone.utc)
+            until = datetime.strptime(dates.group(2), "%Y%m%d%H%M").replace(tzinfo=timezone.utc)
+
+        papers = [
+            paper
+            for topic in topics
+            for paper in self.by_topic.get(topic, [])
+            if since is None or since <= paper["published"] <= until
+        ]
+        papers.sort(key=lambda paper: paper["published"], reverse=True)
+
+        with self._lock:
+            self._cache[query] = papers
+        return papers
+
+class _ArxivHandler(_QuietHandler):
+    def do_GET(self):
+        fake = self.fake
+        args = parse_qs(urlparse(self.path).query)
+        start = int(args.get("start", ["0"])[0])
+        per_page = int(args.get("max_results", ["100"])[0])
+        papers = fake.corpus.search(args.get("search_query", [""])[0])
+        fake.record(len(papers[start:start + per_page]))
+
+        page = papers[start:start + per_page]
+        body = ATOM_HEADER.format(total=len(papers), start=start, per_page=per_page) + "".join(
+            ATOM_ENTRY.format(
+                arxiv_id=paper["arxiv_id"],
+                published=paper["published"].strftime("%Y-%m-%dT%H:%M:%SZ"),
+                title=escape(paper["title"]),
+                abstract=escape(paper["abstract"]),
+                author=escape(paper["author"])
+            )
+            for paper in page
+        ) + "</feed>\n"
+        if fake.latency_seconds:
+            time.sleep(fake.latency_seconds)
+        self.send_body(200, body.encode("utf-8"), "application/atom+xml")
+
+class FakeArxiv(FakeServer):
+    """
+    Fixture-backed arXiv API serving Atom feeds for date-bounded OR queries.
+    """
+
+    handler_class = _ArxivHandler
+
+    def __init__(self, corpus=None, latency_seconds=0.05):
+        """
+        Args:
+            corpus (FakeArxivCorpus): Papers to serve (optional, built from the fixture)
+            latency_seconds (float): Delay added to every page
+        """
+        super().__init__()
+        self.corpus = corpus or FakeArxivCorpus()
+        self.latency_seconds = latency_seconds
+        self.requests = 0
+        self.entries_served = 0
+        self._lock = threading.Lock()
+
+    @property
+    def api_url(self):
+        return f"{self.url}/api/query"
+
+    def record(self, entries):
+        with self._lock:
+            self.requests += 1
+            self.entries_served += entries
+
+class _LLMHandler(_QuietHandler):
+    def do_POST(self):
+        fake = self.fake
+        request = json.loads(self.read_body())
+        prompt = request["messages"][-1]["content"]
+        count = len(re.findall(r"^\s*Paper \d+:", prompt, re.MULTILINE))
+        content = "".join(
+            json.dumps({
+                "id": i,
+                "c": f"Introduces a method that improves results on benchmark {i} at lower cost.",
+                "s": "It makes the approach practical for teams with limited compute budgets.",
+                "i": i == 1
+            }) + "\n"
+            for i in range(1, count + 1)
+        )
+        completion_tokens = max(1, len(content) // 4)
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": completion_tokens,
+            "total_tokens": len(prompt) // 4 + completion_tokens
+        }
+        fake.record(usage["prompt_tokens"], completion_tokens)
+
+        time.sleep(fake.ttft_seconds)
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage")
+            self._stream(content, completion_tokens, usage if include_usage else None)
+        else:
+            time.sleep(completion_tokens / fake.tokens_per_second)
+            body = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            }
+            self.send_body(200, json.dumps(body).encode("utf-8"), "application/json")
+
+    def _stream(self, content, completion_tokens, usage=None):
+        fake = self.fake
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        # About four tokens per chunk, paced at the configured token rate
+        chunk_chars = 16
+        for offset in range(0, len(content), chunk_chars):
+            time.sleep(4 / fake.tokens_per_second)
+            self._event({"content": content[offset:offset + chunk_chars]}, None)
+        self._event({}, "stop")
+        if usage:
+            # Final chunk without choices, as sent for stream_options.include_usage
+            self._write_chunk({"choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+
+    def _event(self, delta, finish_reason):
+        self._write_chunk({"choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]})
+
+    def _write_chunk(self, fields):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": "bench",
+            **fields
+        }
+        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+class FakeLLM(FakeServer):
+    """
+    OpenAI-compatible chat completions endpoint answering in the summarizer's format.
+    """
+
+    handler_class = _LLMHandler
+
+    def __init__(self, ttft_seconds=0.3, tokens_per_second=60.0):
+        """
+        Args:
+            ttft_seconds (float): Delay before the first token
+            tokens_per_second (float): Output token rate
+        """
+        super().__init__()
+        self.ttft_seconds = ttft_seconds
+        self.tokens_per_second = tokens_per_second
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"{self.url}/v1"
+
+    def record(self, prompt_tokens, completion_tokens):
+        with self._lock:
+            self.requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+class _SlackHandler(_QuietHandler):
+    def do_POST(self):
+        fake = self.fake
+        method = self.path.rsplit("/", 1)[-1]
+        body = self.read_body()
+        if "json" in (self.headers.get("Content-Type") or ""):
+            args = json.loads(body or b"{}")
+        else:
+            args = {key: values[0] for key, values in parse_qs(body.decode("utf-8")).items()}
+
+        if fake.latency_seconds:
+            time.sleep(fake.latency_seconds)
+        if fake.should_rate_limit():
+            self.send_body(429, b'{"ok": false, "error": "ratelimited"}', "application/json", {"Retry-After": "1"})
+            return
+
+        ts = fake.record(method, args)
+        response = {"ok": True, "channel": args.get("channel", "C0"), "ts": ts}
+        if method == "auth.test":
+            response.update({"user_id": "UBENCH", "bot_id": "BBENCH", "team_id": "TBENCH"})
+        self.send_body(200, json.dumps(response).encode("utf-8"), "application/json")
+
+class FakeSlack(FakeServer):
+    """
+    Slack Web API that accepts every call and records it with its arrival time.
+    """
+
+    handler_class = _SlackHandler
+
+    def __init__(self, latency_seconds=0.02, rate_limit_every=0):
+        """
+        Args:
+            latency_seconds (float): Delay added to every call
+            rate_limit_every (int): Answer every n-th call with a 429 (0 disables)
+        """
+        super().__init__()
+        self.latency_seconds = latency_seconds
+        self.rate_limit_every = rate_limit_every
+        self.calls = []
+        self.rate_limited = 0
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    @property
+    def api_url(self):
+        return f"{self.url}/api/"
+
+    def should_rate_limit(self):
+        if not self.rate_limit_every:
+            return False
+        with self._lock:
+            self._counter += 1
+            if self._counter % self.rate_limit_every == 0:
+                self.rate_limited += 1
+                return True
+            return False
+
+    def record(self, method, args):
+        with self._lock:
+            ts = f"{time.time():.6f}"
+            self.calls.append((time.monotonic(), method, args))
+            return ts
+
+    def calls_to(self, method):
+        with self._lock:
+            return [(at, args) for at, name, args in self.calls if name == method]
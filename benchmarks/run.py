@@ -0,0 +1,369 @@
+"""
+End-to-end pipeline benchmarks against local fakes.
+
+Every configuration count runs in its own subprocess with a fresh database,
+so peak RSS is measured per size. Scenarios, in order:
+
+- load_jobs: registering jobs for N new configurations, then a restart with no changes
+- scheduled_wave: N scheduled digests through the asyncio engine
+- run_research_update: interactive runs on the streaming path
+- handlers: /test-research-update commands through the job queue
+
+Usage:
+    python -m benchmarks.run --configs 1 10 100 1000 10000
+    python -m benchmarks.run --configs 100 --output results.json
+    python -m benchmarks.run --configs 100 --baseline results.json --max-regression 0.25
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import resource
+import tempfile
+import subprocess
+import numpy as np
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000]
+
+# Interactive scenarios run on a sample, since they are bounded by the job queue
+INTERACTIVE_SAMPLE = 10
+
+# Metrics compared against a baseline, and whether lower is better
+REGRESSION_METRICS = {"p95_ms": True, "throughput_per_s": False}
+
+def summarize_latencies(latencies_s, wall_s):
+    """
+    Summarize latencies of one scenario.
+
+    Args:
+        latencies_s (list): Latency of every operation in seconds
+        wall_s (float): Wall time of the whole scenario in seconds
+
+    Returns:
+        dict: Count, percentiles in milliseconds and throughput
+    """
+    values = np.array(latencies_s) * 1000 if latencies_s else np.zeros(1)
+    return {
+        "count": len(latencies_s),
+        "p50_ms": round(float(np.percentile(values, 50)), 1),
+        "p95_ms": round(float(np.percentile(values, 95)), 1),
+        "p99_ms": round(float(np.percentile(values, 99)), 1),
+        "max_ms": round(float(values.max()), 1),
+        "wall_s": round(wall_s, 3),
+        "throughput_per_s": round(len(latencies_s) / wall_s, 2) if wall_s > 0 else 0.0
+    }
+
+def build_configs(count, topics, channel_prefix, seed):
+    """
+    Build configurations with one to three topics from the fixture corpus.
+    """
+    rng = random.Random(seed)
+    configs = []
+    for i in range(count):
+        chosen = rng.sample(topics, rng.randint(1, 3))
+        configs.append({
+            "frequency": "daily",
+            "time_range": rng.choice([7, 30]),
+            "topic": chosen[0],
+            "additional_topics": chosen[1:],
+            "channel": f"{channel_prefix}{i}"
+        })
+    return configs
+
+def stage_breakdown(run_stats):
+    """
+    Summarize the per-stage timings the bot recorded in its run_stats table.
+
+    Args:
+        run_stats (list): Rows of the run_stats table
+
+    Returns:
+        dict: Median and p95 in milliseconds of each stage, by trigger
+    """
+    stages = ("queue_delay_seconds", "fetch_seconds", "ttft_seconds", "llm_seconds", "slack_seconds", "total_seconds")
+    breakdown = {}
+    for trigger in sorted({row["trigger"] for row in run_stats}):
+        rows = [row for row in run_stats if row["trigger"] == trigger]
+        breakdown[trigger] = {"runs": len(rows)}
+        for stage in stages:
+            values = np.array([row[stage] for row in rows if row[stage] is not None]) * 1000
+            if len(values):
+                breakdown[trigger][stage.replace("_seconds", "")] = {
+                    "p50_ms": round(float(np.percentile(values, 50)), 1),
+                    "p95_ms": round(float(np.percentile(values, 95)), 1)
+                }
+    return breakdown
+
+def wait_for(condition, timeout_s, interval_s=0.01):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(interval_s)
+    return False
+
+def run_size(count, args):
+    """
+    Run every scenario for one configuration count in this process.
+
+    Args:
+        count (int): Number of configurations
+        args: Parsed command line arguments
+
+    Returns:
+        dict: Results by scenario, plus process and fake server counters
+    """
+    from benchmarks.fakes import FakeArxiv, FakeLLM, FakeSlack
+
+    arxiv = FakeArxiv(latency_seconds=args.arxiv_latency).start()
+    llm = FakeLLM(ttft_seconds=args.llm_ttft, tokens_per_second=args.llm_tokens_per_second).start()
+    slack = FakeSlack(latency_seconds=args.slack_latency, rate_limit_every=args.slack_rate_limit_every).start()
+
+    workdir = tempfile.mkdtemp(prefix="bench-")
+    os.environ.update({
+        "DB_PATH": os.path.join(workdir, "bench.db"),
+        "ARXIV_API_URL": arxiv.api_url,
+        "ARXIV_DELAY_SECONDS": "0",
+        "LLM_BASE_URL": llm.base_url,
+        "NVIDIA_API_KEY": "bench",
+        "SLACK_API_URL": slack.api_url,
+        "SLACK_BOT_TOKEN": "xoxb-bench",
+        "METRICS_PORT": "0"
+    })
+
+    # The bot reads its settings at import time, so it is imported only now
+    from src.runtime import get_runtime
+    from src.database.models import save_configs, get_config
+    from src.scheduler.jobs import load_existing_jobs, run_research_update
+    from src.slack_app.handlers import test_research_update
+    from src.database.run_stats import get_recent_run_stats
+
+    results = {}
+    runtime = get_runtime()
+    topics = arxiv.corpus.topics
+
+    # Job registration for N new configurations, then a restart with nothing changed
+    config_ids = save_configs(build_configs(count, topics, "CW", seed=count))
+    started = time.monotonic()
+    load_existing_jobs(runtime.scheduler)
+    results["load_jobs"] = summarize_latencies([time.monotonic() - started], time.monotonic() - started)
+    results["load_jobs"]["throughput_per_s"] = round(count / max(results["load_jobs"]["wall_s"], 1e-9), 2)
+    started = time.monotonic()
+    load_existing_jobs(runtime.scheduler)
+    results["load_jobs_restart"] = summarize_latencies([time.monotonic() - started], time.monotonic() - started)
+
+    # Scheduled wave through the asyncio engine; a digest is done when it is posted
+    configs = [get_config(config_id) for config_id in config_ids]
+    import asyncio
+    started = time.monotonic()
+    asyncio.run_coroutine_threadsafe(runtime.engine.run_many(configs), runtime.engine.loop).result()
+    wall = time.monotonic() - started
+    posted = {args_["channel"]: at for at, args_ in slack.calls_to("chat.postMessage")}
+    results["scheduled_wave"] = summarize_latencies(
+        [posted[config["channel"]] - started for config in configs if config["channel"] in posted],
+        wall
+    )
+
+    # Interactive runs on the streaming path, on fresh configurations
+    sample = min(count, INTERACTIVE_SAMPLE)
+    sample_ids = save_configs(build_configs(sample, topics, "CS", seed=count + 1))
+    latencies, first_content = [], []
+    started = time.monotonic()
+    for config_id in sample_ids:
+        config = get_config(config_id)
+        run_started = time.monotonic()
+        run_research_update(config, runtime.slack_client)
+        latencies.append(time.monotonic() - run_started)
+        updates = [at for at, args_ in slack.calls_to("chat.update") if args_.get("channel") == config["channel"]]
+        if updates:
+            first_content.append(min(updates) - run_started)
+    results["run_research_update"] = summarize_latencies(latencies, time.monotonic() - started)
+    results["time_to_first_content"] = summarize_latencies(first_content, time.monotonic() - started)
+
+    # Slash commands: handler latency, and time until the progress message reports the result
+    handler_ids = save_configs(build_configs(sample, topics, "CH", seed=count + 2))
+    handler_latencies, submitted = [], {}
+    started = time.monotonic()
+    for i, config_id in enumerate(handler_ids):
+        body = {"channel_id": f"CCMD{i}", "user_id": "UBENCH", "text": str(config_id)}
+        handler_started = time.monotonic()
+        test_research_update(lambda *a, **k: None, body, runtime.slack_client, {"runtime": runtime}, logging)
+        handler_latencies.append(time.monotonic() - handler_started)
+        submitted[f"CCMD{i}"] = handler_started
+
+    def finished():
+        done = {
+            args_["channel"]: at for at, args_ in slack.calls_to("chat.update")
+            if args_.get("channel", "").startswith("CCMD") and args_.get("text", "").startswith((":white_check_mark:", ":x:"))
+        }
+        return done if len(done) == len(submitted) else None
+
+    wait_for(finished, timeout_s=args.timeout)
+    done = finished() or {}
+    results["handlers"] = summarize_latencies(handler_latencies, time.monotonic() - started)
+    results["handler_completion"] = summarize_latencies(
+        [done[channel] - at for channel, at in submitted.items() if channel in done],
+        time.monotonic() - started
+    )
+
+    results_stages = stage_breakdown(get_recent_run_stats(limit=count + 2 * sample))
+
+    runtime.shutdown()
+    for fake in (arxiv, llm, slack):
+        fake.stop()
+
+    return {
+        "configs": count,
+        "scenarios": results,
+        "stages": results_stages,
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "arxiv_requests": arxiv.requests,
+        "llm_requests": llm.requests,
+        "llm_prompt_tokens": llm.prompt_tokens,
+        "llm_completion_tokens": llm.completion_tokens,
+        "slack_calls": len(slack.calls),
+        "slack_rate_limited": slack.rate_limited
+    }
+
+def print_report(runs):
+    """
+    Print a table of every scenario for every configuration count.
+    """
+    header = f"{'configs':>8} {'scenario':<22} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>9}"
+    print(header)
+    print("-" * len(header))
+    for run in runs:
+        for name, stats in run["scenarios"].items():
+            print(
+                f"{run['configs']:>8} {name:<22} {stats['count']:>6} {stats['p50_ms']:>9} "
+                f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['throughput_per_s']:>9}"
+            )
+        for trigger, stages in run.get("stages", {}).items():
+            timings = ", ".join(
+                f"{stage} {values['p50_ms']}/{values['p95_ms']}"
+                for stage, values in stages.items() if stage != "runs"
+            )
+            print(f"{'':>8} {trigger} stages p50/p95 ms: {timings}")
+        print(
+            f"{'':>8} peak RSS {run['peak_rss_mb']} MB | arXiv requests {run['arxiv_requests']} | "
+            f"LLM requests {run['llm_requests']} ({run['llm_completion_tokens']} output tokens) | "
+            f"Slack calls {run['slack_calls']} ({run['slack_rate_limited']} rate limited)"
+        )
+
+def find_regressions(runs, baseline, max_regression):
+    """
+    Compare runs with a baseline.
+
+    Args:
+        runs (list): Current results
+        baseline (list): Results of a previous run
+        max_regression (float): Tolerated relative slowdown, e.g. 0.2 for 20%
+
+    Returns:
+        list: Descriptions of every regression found
+    """
+    previous = {run["configs"]: run for run in baseline}
+    regressions = []
+    for run in runs:
+        before = previous.get(run["configs"])
+        if before is None:
+            continue
+        for name, stats in run["scenarios"].items():
+            old = before["scenarios"].get(name)
+            if not old or not stats["count"] or not old["count"]:
+                continue
+            for metric, lower_is_better in REGRESSION_METRICS.items():
+                if not old[metric]:
+                    continue
+                change = (stats[metric] - old[metric]) / old[metric]
+                if (change if lower_is_better else -change) > max_regression:
+                    regressions.append(
+                        f"{run['configs']} configs, {name}: {metric} {old[metric]} -> {stats[metric]}"
+                    )
+        if run["peak_rss_mb"] > before["peak_rss_mb"] * (1 + max_regression):
+            regressions.append(
+                f"{run['configs']} configs: peak RSS {before['peak_rss_mb']} -> {run['peak_rss_mb']} MB"
+            )
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the research update pipeline against local fakes.")
+    parser.add_argument("--configs", type=int, nargs="+", default=DEFAULT_SIZES, help="Configuration counts to run")
+    parser.add_argument("--arxiv-latency", type=float, default=0.05, help="Seconds added to every arXiv page")
+    parser.add_argument("--llm-ttft", type=float, default=0.3, help="Seconds before the first LLM token")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=60.0, help="LLM output token rate")
+    parser.add_argument("--slack-latency", type=float, default=0.02, help="Seconds added to every Slack call")
+    parser.add_argument("--slack-rate-limit-every", type=int, default=0, help="Answer every n-th Slack call with a 429")
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds to wait for queued runs")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Fail if results regress against this JSON file")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Tolerated relative regression")
+    parser.add_argument("--verbose", action="store_true", help="Show the bot's logs")
+    parser.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.single is not None:
+        if not args.verbose:
+            logging.disable(logging.CRITICAL)
+        print(json.dumps(run_size(args.single, args)))
+        return 0
+
+    runs = []
+    passthrough = strip_option_values(
+        argv if argv is not None else sys.argv[1:],
+        {"--configs", "--output", "--baseline", "--max-regression"}
+    )
+    for count in args.configs:
+        command = [sys.executable, "-m", "benchmarks.run", "--single", str(count)]
+        command += passthrough
+        completed = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=None if args.verbose else subprocess.DEVNULL,
+            text=True
+        )
+        if completed.returncode != 0:
+            print(f"Benchmark for {count} configurations failed with exit code {completed.returncode}")
+            return completed.returncode
+        runs.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+
+    print_report(runs)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(runs, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(runs, json.load(f), args.max_regression)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+def strip_option_values(argv, options):
+    """
+    Drop options, and the values following them, from an argument list.
+    """
+    kept = []
+    skipping = False
+    for arg in argv:
+        if arg in options:
+            skipping = True
+            continue
+        if skipping and not arg.startswith("--"):
+            # Option values, including negative numbers, never start with "--"
+            continue
+        skipping = False
+        kept.append(arg)
+    return kept
+
+if __name__ == "__main__":
+    sys.exit(main())
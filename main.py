@@ -2,40 +2,116 @@
 """
 Main entry point for the Research Daily Update Bot.
 Initializes all components and starts the application.
+
+Socket Mode connects as soon as the database and Slack client are ready; the
+scheduler, the research pipeline and the LLM SDK are loaded afterwards.
+Run with --profile-startup to measure boot-to-ready time.
+
+By default one process serves Slack and runs the scheduled updates. With
+--role frontend it only serves Slack, and processes started with
+--role worker share the scheduled updates through the database.
 """
 import os
+import sys
+import argparse
+import threading
 from dotenv import load_dotenv
-from src.slack_app.app import create_slack_app, start_socket_mode
-from src.database.connection import init_db
-from src.scheduler.jobs import initialize_scheduler, load_existing_jobs
+
+# Modules read their settings when imported, so load the environment first
+load_dotenv()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Research Daily Update Bot")
+    parser.add_argument("--role", choices=("all", "frontend", "worker"), default=os.environ.get("BOT_ROLE", "all"),
+                        help="Serve Slack and run scheduled updates (all), only serve Slack (frontend) "
+                             "or only run a share of the scheduled updates (worker)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Port of the metrics endpoint, 0 to disable it (default: METRICS_PORT or 9108); "
+                             "give each process on a host its own port")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Report per-module import costs and boot-to-ready time, then exit")
+    parser.add_argument("--budget", type=float, default=None,
+                        help="Boot-to-ready budget in seconds for --profile-startup")
+    parser.add_argument("--top", type=int, default=15,
+                        help="Rows per table for --profile-startup")
+    # Used by --profile-startup to time the boot in a child process
+    parser.add_argument("--startup-phases", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
 
 def main():
-    # Load environment variables
-    load_dotenv()
-    
+    args = parse_args()
+    if args.profile_startup:
+        from src.startup_profile import profile_startup, STARTUP_BUDGET_SECONDS
+        budget = args.budget if args.budget is not None else STARTUP_BUDGET_SECONDS
+        sys.exit(profile_startup(budget, args.top))
+    if args.startup_phases:
+        from src.startup_profile import run_startup_phases
+        run_startup_phases()
+        return
+    if args.role == "worker":
+        run_worker(args.metrics_port)
+        return
+
+    from src.runtime import get_runtime
+    from src.slack_app.app import create_slack_app, connect_socket_mode
+
     print("Environment loaded")
     print(f"Bot token starts with: {os.environ.get('SLACK_BOT_TOKEN', 'Not found')[:10]}...")
     print(f"App token starts with: {os.environ.get('SLACK_APP_TOKEN', 'Not found')[:10]}...")
-    
-    # Initialize database
-    init_db()
-    
+
+    # Open the database and shared Slack client once for the process
+    print("Initializing runtime...")
+    runtime = get_runtime(metrics_port=args.metrics_port)
+    runtime.schedule_jobs = args.role == "all"
+
     # Create and configure the Slack app
     print("Creating Slack app...")
-    app = create_slack_app()
-    
-    # Initialize scheduler and load existing jobs
-    print("Initializing scheduler...")
-    scheduler = initialize_scheduler()
-    load_existing_jobs(scheduler, app)
-    
-    print("Research Daily Update Bot is ready! Starting socket mode...")
+    app = create_slack_app(runtime)
+
+    print("Starting socket mode...")
     try:
-        # Start the Slack app in socket mode
-        start_socket_mode(app)
+        handler = connect_socket_mode(app)
         print("Socket mode started successfully")
     except Exception as e:
         print(f"Error starting socket mode: {str(e)}")
+        return
+
+    # Start the scheduler and pipeline, load jobs for new or changed configurations
+    # and resume runs a previous process left unfinished
+    if runtime.schedule_jobs:
+        from src.scheduler.jobs import load_existing_jobs, resume_unfinished_runs
+        runtime.warm_up()
+        load_existing_jobs(runtime.scheduler)
+        resume_unfinished_runs(runtime.engine)
+    print("Research Daily Update Bot is ready!")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        handler.close()
+        runtime.shutdown()
+
+def run_worker(metrics_port=None):
+    """
+    Run scheduled updates for this worker's share of the configurations.
+
+    Args:
+        metrics_port (int): Port of this worker's metrics endpoint (optional)
+    """
+    from src.runtime import get_runtime
+    from src.scheduler.workers import ScheduleWorker
+
+    print("Initializing runtime...")
+    runtime = get_runtime(metrics_port=metrics_port)
+    runtime.schedule_jobs = False
+    worker = ScheduleWorker(runtime.engine).start()
+    print(f"Worker {worker.worker_id} is ready!")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        worker.stop()
+        runtime.shutdown()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -7,14 +7,17 @@ setup(
     install_requires=[
         "slack-bolt>=1.16.0",
         "jira>=3.4.1",
-        "arxiv>=1.4.7",
+        "arxiv>=2.0.0",
         "openai>=1.0.0",
         "apscheduler>=3.10.0",
         "python-dotenv>=1.0.0",
+        "aiohttp>=3.8.0",
+        "sqlalchemy>=1.4.0",
+        "numpy>=1.21.0",
     ],
     author="April Yang",
     author_email="yutongy@nvidia.com",
     description="A Slackbot that syncs Jira tickets with relevant arXiv papers and delivers research summaries.",
     keywords="slack, jira, arxiv, research, bot",
-    python_requires=">=3.7",
+    python_requires=">=3.9",
 )
\ No newline at end of file
@@ -1,57 +1,258 @@
 """
 Client for searching and fetching papers from arXiv.
+
+The arxiv package is imported when the first search runs, not when the
+module is loaded. Every search in the process shares one arXiv client and
+fetches one page at a time through it, so arXiv's request delay holds across
+concurrent searches. Pages of interactive searches are fetched before the
+pages of scheduled batches waiting for the client.
 """
-import arxiv
+import os
+import heapq
+import itertools
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timezone, timedelta
+from src.clients.registry import get_shared_client, get_circuit_breaker
+from src.clients.resilience import HTTP_MAX_RETRIES
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Date format used by the submittedDate query filter
+ARXIV_DATE_FORMAT = "%Y%m%d%H%M"
+
+# Bounds on the number of results requested per page
+MIN_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Rough number of new papers per topic and day, used to size pages
+EXPECTED_PAPERS_PER_TOPIC_DAY = 10
+
+# Seconds between requests to the arXiv API, as its terms of use ask
+ARXIV_DELAY_SECONDS = float(os.environ.get("ARXIV_DELAY_SECONDS", "3.0"))
+
+# Query endpoint of the arXiv API
+ARXIV_API_URL = os.environ.get("ARXIV_API_URL", "https://export.arxiv.org/api/query")
+
+# Fetch priorities; lower values get the client first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+
+class PriorityLock:
+    """
+    Lock handed to the waiting caller with the lowest priority value first.
+
+    Callers with the same priority get the lock in the order they asked for it.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._waiting = []
+        self._sequence = itertools.count()
+        self._held = False
+
+    @contextmanager
+    def hold(self, priority):
+        """
+        Hold the lock for the duration of a with block.
+
+        Args:
+            priority (int): Priority of the caller, lower goes first
+        """
+        entry = (priority, next(self._sequence))
+        with self._condition:
+            heapq.heappush(self._waiting, entry)
+            while self._held or self._waiting[0] != entry:
+                self._condition.wait()
+            heapq.heappop(self._waiting)
+            self._held = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._held = False
+                self._condition.notify_all()
+
+# Held while a page is fetched; the arXiv client is not thread-safe and spaces
+# requests by delay_seconds only when they go through it one at a time
+_request_lock = PriorityLock()
+
+def _create_arxiv_client():
+    # The library retries failed requests and arXiv's sporadic empty pages,
+    # each retry spaced by delay_seconds like any other request
+    import arxiv
+    client = arxiv.Client(delay_seconds=ARXIV_DELAY_SECONDS, num_retries=HTTP_MAX_RETRIES)
+    client.query_url_format = ARXIV_API_URL + "?{}"
+    return client
+
+def get_arxiv_client():
+    """
+    Get the process-wide arXiv client.
+
+    The client must only be used while holding _request_lock; use
+    fetch_arxiv_page rather than calling it directly.
+
+    Returns:
+        arxiv.Client: Shared arXiv client
+    """
+    return get_shared_client("arxiv", _create_arxiv_client)
+
+def fetch_arxiv_page(query, start, page_size, priority=PRIORITY_BATCH):
+    """
+    Fetch one page of results for a query, newest first.
+
+    Pages of all searches in the process are fetched one at a time, so the
+    shared client keeps ARXIV_DELAY_SECONDS between any two requests. Waiting
+    pages are fetched in priority order.
+
+    Args:
+        query (str): arXiv query string
+        start (int): Index of the first result
+        page_size (int): Results to request
+        priority (int): PRIORITY_INTERACTIVE or PRIORITY_BATCH
+
+    Returns:
+        list: arxiv.Result objects, fewer than page_size at the end of the results
+    """
+    import arxiv
+    search = arxiv.Search(
+        query=query,
+        max_results=start + page_size,
+        sort_by=arxiv.SortCriterion.SubmittedDate,
+        sort_order=arxiv.SortOrder.Descending
+    )
+    with _request_lock.hold(priority):
+        client = get_arxiv_client()
+        client.page_size = page_size
+        return list(client.results(search, offset=start))
+
+def build_query(topics):
+    """
+    Build an arXiv OR-query from a list of topics.
+
+    Args:
+        topics (list): List of search topics
+
+    Returns:
+        str: arXiv query string
+    """
+    return " OR ".join([f'"{topic}"' for topic in topics])
+
+def result_to_paper(result):
+    """
+    Convert an arXiv result into the paper dictionary used by the bot.
+
+    Args:
+        result (arxiv.Result): Search result from the arXiv client
+
+    Returns:
+        dict: Paper entry
+    """
+    # Convert arXiv datetime to UTC-aware datetime
+    published_utc = result.published.astimezone(timezone.utc)
+
+    return {
+        "arxiv_id": result.get_short_id(),
+        "title": result.title,
+        "authors": [a.name for a in result.authors],
+        "abstract": result.summary,
+        "published": published_utc,
+        "pdf_url": result.pdf_url.replace("http://", "https://").replace(" ", "%20"),
+        "doi": result.doi or ""
+    }
+
+def build_date_bounded_query(query, since, until):
+    """
+    Restrict an arXiv query to a submission date range.
+
+    Args:
+        query (str): arXiv query string
+        since (datetime): UTC-aware start of the range
+        until (datetime): UTC-aware end of the range
+
+    Returns:
+        str: arXiv query string with a submittedDate filter
+    """
+    since_text = since.astimezone(timezone.utc).strftime(ARXIV_DATE_FORMAT)
+    until_text = until.astimezone(timezone.utc).strftime(ARXIV_DATE_FORMAT)
+    return f"({query}) AND submittedDate:[{since_text} TO {until_text}]"
+
+def estimate_page_size(topic_count, since, until):
+    """
+    Pick a page size that fits the expected number of results in few requests.
+
+    Short incremental windows use small pages so a single cheap request
+    usually covers them, while long lookbacks use large pages to keep the
+    number of rate-limited requests low.
+
+    Args:
+        topic_count (int): Number of topics in the query
+        since (datetime): Start of the date range
+        until (datetime): End of the date range
+
+    Returns:
+        int: Results to request per page
+    """
+    days = max((until - since).total_seconds() / 86400, 1)
+    expected = int(days * topic_count * EXPECTED_PAPERS_PER_TOPIC_DAY)
+    return max(MIN_PAGE_SIZE, min(MAX_PAGE_SIZE, expected))
+
+def stream_arxiv_papers(topics, since, until=None, page_size=None, priority=PRIORITY_BATCH):
+    """
+    Lazily yield papers matching the topics submitted within a date range.
+
+    The date range is pushed into the query and results are paged newest
+    first, so iteration stops as soon as the start of the range is reached
+    and no page beyond it is requested.
+
+    Args:
+        topics (list): List of search topics
+        since (datetime): UTC-aware lower bound on the publication date
+        until (datetime): UTC-aware upper bound (optional, defaults to now)
+        page_size (int): Results per request (optional, estimated if omitted)
+        priority (int): Priority of the page fetches (optional)
+
+    Yields:
+        dict: Paper entry, newest first
+    """
+    until = until or datetime.now(timezone.utc)
+    query = build_date_bounded_query(build_query(topics), since, until)
+    page_size = page_size or estimate_page_size(len(topics), since, until)
+
+    start = 0
+    while True:
+        # Only the request counts towards the breaker, not the caller's work between pages
+        with get_circuit_breaker("arxiv"):
+            results = fetch_arxiv_page(query, start, page_size, priority)
+        for result in results:
+            paper = result_to_paper(result)
+            if paper["published"] <= since:
+                return
+            yield paper
+        if len(results) < page_size:
+            return
+        start += len(results)
+
 def search_arxiv_papers(topics, time_range_days):
     """
     Search arXiv for papers matching the given topics within the time range.
-    
+
     Args:
         topics (list): List of search topics
         time_range_days (int): Number of days to look back
-        
+
     Returns:
         list: List of paper entries
     """
-    client = arxiv.Client()
-    query = " OR ".join([f'"{topic}"' for topic in topics])
-    
     # Calculate cutoff date with UTC timezone
     cutoff_date = datetime.now(timezone.utc) - timedelta(days=time_range_days)
-    
-    search = arxiv.Search(
-        query=query,
-        max_results=100,
-        sort_by=arxiv.SortCriterion.SubmittedDate,
-        sort_order=arxiv.SortOrder.Descending
-    )
-    
+
     try:
-        results = client.results(search)
-        papers = []
-        
-        for result in results:
-            # Convert arXiv datetime to UTC-aware datetime
-            published_utc = result.published.astimezone(timezone.utc)
-            
-            if published_utc > cutoff_date:
-                papers.append({
-                    "title": result.title,
-                    "authors": [a.name for a in result.authors],
-                    "abstract": result.summary,
-                    "published": published_utc,
-                    "pdf_url": result.pdf_url.replace("http://", "https://").replace(" ", "%20"),
-                    "doi": result.doi or ""
-                })
-                
+        papers = list(stream_arxiv_papers(topics, cutoff_date))
         logger.info(f"Found {len(papers)} recent papers matching topics: {', '.join(topics)}")
         return papers
-        
+
     except Exception as e:
         logger.error(f"Error searching arXiv: {str(e)}")
-        return []
\ No newline at end of file
+        return []
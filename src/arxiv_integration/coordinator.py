@@ -0,0 +1,313 @@
+"""
+Coordinator that coalesces arXiv fetches for configurations that run at the same time.
+
+Scheduled jobs share the same cron triggers, so many of them ask arXiv for
+overlapping topics within a few seconds of each other. The coordinator collects
+the distinct topics of every job due in the current window, merges them into as
+few OR-queries as the query length limit allows, runs each query once and hands
+the matching papers back to every configuration.
+
+Fetched papers are kept in the local paper store together with a per-topic
+watermark, the end of the last successful fetch, so each run only asks arXiv
+for papers submitted since then and serves the rest of the lookback window
+from the database.
+"""
+import os
+import re
+import time
+import functools
+import threading
+import logging
+from datetime import datetime, timezone, timedelta
+from src.arxiv_integration.client import (
+    build_query, stream_arxiv_papers, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+)
+from src.arxiv_integration.parser import TERM, normalize_topic, stem_term
+from src.database.papers import (
+    save_topic_papers, get_papers_for_topics, get_topic_coverage,
+    update_topic_coverage, prune_papers
+)
+
+logger = logging.getLogger(__name__)
+
+# Longest query string sent to arXiv in a single request
+MAX_QUERY_LENGTH = int(os.environ.get("ARXIV_MAX_QUERY_LENGTH", "1000"))
+
+# Seconds the first caller waits for other jobs to join its batch
+BATCH_WINDOW_SECONDS = float(os.environ.get("ARXIV_BATCH_WINDOW_SECONDS", "2"))
+
+# Seconds fetched topic results are reused by later jobs of the same wave
+RESULT_TTL_SECONDS = int(os.environ.get("ARXIV_RESULT_TTL_SECONDS", "900"))
+
+# Hours re-fetched below a topic watermark, since arXiv announces papers
+# some time after their submission date
+WATERMARK_OVERLAP_HOURS = int(os.environ.get("ARXIV_WATERMARK_OVERLAP_HOURS", "48"))
+
+# Number of streamed papers buffered before they are written to the store
+SAVE_CHUNK_SIZE = 200
+
+# Days stored papers are kept before being pruned
+PAPER_RETENTION_DAYS = int(os.environ.get("PAPER_RETENTION_DAYS", "31"))
+
+def get_config_topics(config):
+    """
+    Get the list of topics a configuration subscribes to.
+
+    Args:
+        config (dict): Configuration dictionary
+
+    Returns:
+        list: Main topic followed by the additional topics
+    """
+    return [config["topic"]] + list(config.get("additional_topics") or [])
+
+def merge_topics_into_queries(topics, max_length=MAX_QUERY_LENGTH):
+    """
+    Pack topics into as few OR-queries as the query length limit allows.
+
+    Args:
+        topics (iterable): Normalized search topics
+        max_length (int): Maximum length of a single query string
+
+    Returns:
+        list: List of topic groups, one per query
+    """
+    groups = []
+    current = []
+    for topic in sorted(set(topics)):
+        candidate = current + [topic]
+        if current and len(build_query(candidate)) > max_length:
+            groups.append(current)
+            current = [topic]
+        else:
+            current = candidate
+    if current:
+        groups.append(current)
+    return groups
+
+def _term_pattern(term):
+    # Match a term in its singular and plural forms, like arXiv's stemmed search
+    term = stem_term(term)
+    if len(term) > 2 and term.endswith("y"):
+        return re.escape(term[:-1]) + "(?:y|ies)"
+    return re.escape(term) + "(?:e?s)?"
+
+@functools.lru_cache(maxsize=4096)
+def topic_pattern(topic):
+    """
+    Compile the pattern that finds a topic phrase in paper text.
+
+    The topic's terms must appear in order as whole words, separated only by
+    whitespace or punctuation, so "retrieval-augmented generation" and
+    "LLMs" match the topics "retrieval augmented generation" and "llm" while
+    "rag" does not match inside "average".
+
+    Args:
+        topic (str): Search topic
+
+    Returns:
+        re.Pattern: Pattern over lower-cased text, or None if the topic has no terms
+    """
+    terms = TERM.findall(normalize_topic(topic))
+    if not terms:
+        return None
+    phrase = r"[\W_]+".join(_term_pattern(term) for term in terms)
+    return re.compile(rf"(?<![^\W_]){phrase}(?![^\W_])")
+
+def paper_matches_topic(paper, topic):
+    """
+    Check whether a paper fetched by a merged query belongs to a topic.
+
+    Mirrors the phrase search arXiv ran for the topic on its own, so each
+    topic is routed the papers its per-topic query would have returned.
+
+    Args:
+        paper (dict): Paper entry
+        topic (str): Normalized search topic
+
+    Returns:
+        bool: True if the topic phrase occurs in the title, abstract or authors
+    """
+    pattern = topic_pattern(topic)
+    if pattern is None:
+        return False
+    text = " ".join([paper['title'], paper['abstract']] + list(paper.get('authors') or [])).lower()
+    return pattern.search(text) is not None
+
+class _Batch:
+    """Topics collected from the jobs that joined one fetch window."""
+
+    def __init__(self):
+        self.topics = {}
+        self.done = threading.Event()
+
+    def add(self, topics, time_range_days):
+        for topic in topics:
+            self.topics[topic] = max(self.topics.get(topic, 0), time_range_days)
+
+class FetchCoordinator:
+    """
+    Coalesces concurrent arXiv searches into a small number of merged queries.
+    """
+
+    def __init__(self, due_configs=None, window_seconds=BATCH_WINDOW_SECONDS,
+                 ttl_seconds=RESULT_TTL_SECONDS, max_query_length=MAX_QUERY_LENGTH):
+        """
+        Args:
+            due_configs (callable): Returns the configurations due in the current window (optional)
+            window_seconds (float): Time the first caller waits for others to join
+            ttl_seconds (int): How long fetched topic results are reused
+            max_query_length (int): Maximum length of a merged query string
+        """
+        self.due_configs = due_configs
+        self.window_seconds = window_seconds
+        self.ttl_seconds = ttl_seconds
+        self.max_query_length = max_query_length
+        self._lock = threading.Lock()
+        self._pending = None
+        # topic -> (fetched_at, lookback_days) for topics whose store is up to date
+        self._fresh = {}
+
+    def get_papers(self, topics, time_range_days, coalesce=True):
+        """
+        Get recent papers for a set of topics, sharing fetches with concurrent callers.
+
+        Args:
+            topics (list): List of search topics
+            time_range_days (int): Number of days to look back
+            coalesce (bool): Wait for other jobs of the window and fetch their
+                topics too; disable for one-off runs, whose pages are then
+                fetched ahead of those of scheduled batches
+
+        Returns:
+            list: List of paper entries, newest first
+        """
+        wanted = [normalize_topic(topic) for topic in topics]
+
+        with self._lock:
+            missing = [topic for topic in wanted if not self._is_fresh(topic, time_range_days)]
+            if missing and not coalesce:
+                batch = _Batch()
+                batch.add(missing, time_range_days)
+                is_leader = True
+            elif missing:
+                batch = self._pending
+                is_leader = batch is None
+                if is_leader:
+                    batch = self._pending = _Batch()
+                batch.add(missing, time_range_days)
+
+        if missing and is_leader:
+            try:
+                if coalesce:
+                    time.sleep(self.window_seconds)
+                    with self._lock:
+                        self._pending = None
+                    self._add_due_topics(batch)
+                self._run_batch(batch, PRIORITY_BATCH if coalesce else PRIORITY_INTERACTIVE)
+            finally:
+                batch.done.set()
+        elif missing:
+            batch.done.wait()
+
+        cutoff_date = datetime.now(timezone.utc) - timedelta(days=time_range_days)
+        return get_papers_for_topics(wanted, cutoff_date)
+
+    def _add_due_topics(self, batch):
+        """Add topics of every other job due in this window to the batch."""
+        if self.due_configs is None:
+            return
+        try:
+            configs = self.due_configs()
+        except Exception as e:
+            logger.error(f"Error loading due configurations: {str(e)}")
+            return
+
+        with self._lock:
+            for config in configs:
+                time_range = int(config["time_range"])
+                topics = [normalize_topic(topic) for topic in get_config_topics(config)]
+                batch.add([t for t in topics if not self._is_fresh(t, time_range)], time_range)
+
+    def _plan_fetch_start(self, now, time_range_days, coverage):
+        """
+        Get the earliest publication date that still has to be fetched for a topic.
+
+        Args:
+            now (datetime): Current UTC time
+            time_range_days (int): Lookback requested for the topic
+            coverage (tuple): Stored (covered_since, fetched_until) or None
+
+        Returns:
+            datetime: UTC-aware fetch start
+        """
+        cutoff_date = now - timedelta(days=time_range_days)
+        if coverage is None or coverage[0] > cutoff_date:
+            return cutoff_date
+
+        covered_since, fetched_until = coverage
+        watermark = fetched_until or covered_since
+        return max(cutoff_date, watermark - timedelta(hours=WATERMARK_OVERLAP_HOURS))
+
+    def _run_batch(self, batch, priority=PRIORITY_BATCH):
+        """Fetch every topic in the batch above its watermark using merged queries."""
+        now = datetime.now(timezone.utc)
+        coverage = get_topic_coverage(list(batch.topics))
+        starts = {
+            topic: self._plan_fetch_start(now, days, coverage.get(topic))
+            for topic, days in batch.topics.items()
+        }
+        # Topics needing a similar amount of history share queries, so a new
+        # topic's full lookback does not widen the incremental fetches
+        by_start_day = {}
+        for topic, start in starts.items():
+            by_start_day.setdefault(start.date(), []).append(topic)
+        groups = [
+            group
+            for topics in by_start_day.values()
+            for group in merge_topics_into_queries(topics, self.max_query_length)
+        ]
+
+        logger.info(f"Fetching {len(batch.topics)} distinct topics from arXiv in {len(groups)} queries")
+
+        for group in groups:
+            fetch_start = min(starts[topic] for topic in group)
+            try:
+                # Papers are routed and stored page by page as they stream in
+                pending = {topic: [] for topic in group}
+                for count, paper in enumerate(stream_arxiv_papers(group, fetch_start, now, priority=priority), 1):
+                    for topic in group:
+                        if paper_matches_topic(paper, topic):
+                            pending[topic].append(paper)
+                    if count % SAVE_CHUNK_SIZE == 0:
+                        if not save_topic_papers(pending):
+                            raise RuntimeError("could not store fetched papers")
+                        pending = {topic: [] for topic in group}
+                if not save_topic_papers(pending):
+                    raise RuntimeError("could not store fetched papers")
+            except Exception as e:
+                # Leave the topics stale so the next caller retries them
+                logger.error(f"Error searching arXiv: {str(e)}")
+                continue
+
+            # The fetch covered everything submitted up to the request time,
+            # whether or not the topic had new papers
+            new_coverage = {
+                topic: (min(coverage.get(topic, (fetch_start, None))[0], fetch_start), now)
+                for topic in group
+            }
+            if not update_topic_coverage(new_coverage):
+                continue
+
+            with self._lock:
+                for topic in group:
+                    self._fresh[topic] = (time.monotonic(), batch.topics[topic])
+
+        prune_papers(now - timedelta(days=PAPER_RETENTION_DAYS))
+
+    def _is_fresh(self, topic, time_range_days):
+        entry = self._fresh.get(topic)
+        if entry is None:
+            return False
+        fetched_at, lookback_days = entry
+        return time.monotonic() - fetched_at < self.ttl_seconds and lookback_days >= time_range_days
@@ -1,6 +1,10 @@
 """
 Functions for parsing and processing arXiv paper data.
 """
+import re
+
+# Runs of letters and digits; arXiv's search splits text into terms on anything else
+TERM = re.compile(r"[^\W_]+")
 
 def format_papers_for_llm(papers):
     """
@@ -29,4 +33,34 @@ URL: {paper["entry_id"]}
 """
         formatted_papers.append(formatted_paper)
     
-    return "\n".join(formatted_papers)
\ No newline at end of file
+    return "\n".join(formatted_papers)
+
+def normalize_topic(topic):
+    """
+    Normalize a topic so that equivalent spellings share one query slot.
+    
+    Args:
+        topic (str): Search topic
+        
+    Returns:
+        str: Lower-cased topic with collapsed whitespace
+    """
+    return " ".join(topic.lower().split())
+
+def stem_term(term):
+    """
+    Reduce a lower-cased term to its singular form, like arXiv's stemmed search.
+    
+    Args:
+        term (str): Lower-cased term
+        
+    Returns:
+        str: Singular form of the term
+    """
+    if len(term) > 4 and term.endswith("ies"):
+        return term[:-3] + "y"
+    if len(term) > 4 and term.endswith(("sses", "xes", "ches", "shes")):
+        return term[:-2]
+    if len(term) > 3 and term.endswith("s") and not term.endswith("ss"):
+        return term[:-1]
+    return term
@@ -0,0 +1,115 @@
+"""
+Local relevance ranking of fetched papers against configured topics.
+
+Papers are scored with BM25 over their title and abstract. Term frequencies
+for every candidate are gathered into one matrix, so the whole candidate set
+is scored in a single vectorized pass before anything is sent to the LLM.
+Terms are split and singularized the same way the coordinator routes papers
+to topics, so a paper routed to "transformers" also scores for it.
+"""
+import os
+import logging
+from collections import Counter
+import numpy as np
+from src.arxiv_integration.parser import TERM, stem_term
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Title terms count this many times, since a topic in the title is a strong signal
+TITLE_WEIGHT = 2
+
+# Papers scoring below this fraction of the best paper are dropped
+RANK_MIN_RELATIVE_SCORE = float(os.environ.get("RANK_MIN_RELATIVE_SCORE", "0.1"))
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from in into is it of on or that the their this to
+using via we with without our its can based
+""".split())
+
+def tokenize(text):
+    """
+    Split text into lower-cased, singular terms without stopwords.
+
+    Args:
+        text (str): Text to tokenize
+
+    Returns:
+        list: List of terms
+    """
+    return [stem_term(term) for term in TERM.findall(text.lower()) if term not in STOPWORDS]
+
+def score_papers(papers, topics):
+    """
+    Score papers against topics with BM25.
+
+    A paper's score is its best score over the topics, so a configuration
+    with several topics does not penalize papers matching only one of them.
+
+    Args:
+        papers (list): Candidate paper entries
+        topics (list): Search topics
+
+    Returns:
+        numpy.ndarray: One relevance score per paper
+    """
+    topic_terms = [sorted(set(tokenize(topic))) for topic in topics]
+    vocabulary = {term: i for i, term in enumerate(sorted({t for terms in topic_terms for t in terms}))}
+    if not papers or not vocabulary:
+        return np.zeros(len(papers))
+
+    # Term frequency matrix restricted to query terms: papers x terms
+    tf = np.zeros((len(papers), len(vocabulary)))
+    lengths = np.zeros(len(papers))
+    for row, paper in enumerate(papers):
+        counts = Counter(tokenize(paper["title"]) * TITLE_WEIGHT + tokenize(paper["abstract"]))
+        lengths[row] = sum(counts.values())
+        for term, column in vocabulary.items():
+            tf[row, column] = counts[term]
+
+    doc_count = len(papers)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((doc_count - df + 0.5) / (df + 0.5))
+    avg_length = max(lengths.mean(), 1.0)
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length)
+    term_scores = idf * tf * (BM25_K1 + 1) / (tf + norm[:, None])
+
+    # Topic membership matrix: terms x topics
+    membership = np.zeros((len(vocabulary), len(topics)))
+    for column, terms in enumerate(topic_terms):
+        for term in terms:
+            membership[vocabulary[term], column] = 1
+
+    return (term_scores @ membership).max(axis=1)
+
+def rank_papers(papers, topics, top_k, min_relative_score=RANK_MIN_RELATIVE_SCORE):
+    """
+    Keep the most relevant papers for the topics, best first.
+
+    Args:
+        papers (list): Candidate paper entries
+        topics (list): Search topics
+        top_k (int): Maximum number of papers to keep
+        min_relative_score (float): Minimum score as a fraction of the best score
+
+    Returns:
+        list: Selected paper entries ordered by relevance
+    """
+    if not papers:
+        return []
+
+    scores = score_papers(papers, topics)
+    best = scores.max()
+    if best <= 0:
+        logger.info(f"No papers mention topics: {', '.join(topics)}")
+        return []
+
+    # Stable sort keeps newer papers first among equal scores
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    selected = [papers[i] for i in order if scores[i] >= best * min_relative_score]
+
+    logger.info(f"Ranked {len(papers)} papers, kept {len(selected)} for topics: {', '.join(topics)}")
+    return selected
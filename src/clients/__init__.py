@@ -0,0 +1,3 @@
+"""
+Shared outbound clients for the Research Daily Update Bot.
+"""
\ No newline at end of file
@@ -0,0 +1,68 @@
+"""
+Process-wide registry of outbound clients and circuit breakers.
+
+Clients are created once per process and shared by every job, so their
+connection pools stay warm instead of paying a TLS handshake per call.
+"""
+import threading
+import logging
+from src.clients.resilience import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+_clients = {}
+_breakers = {}
+_lock = threading.Lock()
+
+def get_shared_client(name, factory):
+    """
+    Get the shared client registered under a name, creating it on first use.
+
+    Args:
+        name (str): Client name, e.g. "llm" or "jira"
+        factory (callable): Builds the client when it does not exist yet
+
+    Returns:
+        The shared client
+    """
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            client = factory()
+            _clients[name] = client
+            logger.info(f"Created shared {name} client")
+        return client
+
+def get_circuit_breaker(name):
+    """
+    Get the circuit breaker of an upstream endpoint.
+
+    Args:
+        name (str): Endpoint name
+
+    Returns:
+        CircuitBreaker: Breaker shared by all callers of the endpoint
+    """
+    with _lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name)
+            _breakers[name] = breaker
+        return breaker
+
+def close_shared_clients():
+    """
+    Close and forget every shared client, e.g. on shutdown.
+    """
+    with _lock:
+        clients = list(_clients.items())
+        _clients.clear()
+
+    for name, client in clients:
+        close = getattr(client, "close", None)
+        if close is None:
+            continue
+        try:
+            close()
+        except Exception as e:
+            logger.error(f"Error closing {name} client: {str(e)}")
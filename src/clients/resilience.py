@@ -0,0 +1,83 @@
+"""
+Retry and circuit breaking for calls to upstream services.
+"""
+import os
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Retries of a failed request
+HTTP_MAX_RETRIES = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+
+# Consecutive failures that open a circuit, and seconds before it is probed again
+CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.environ.get("CIRCUIT_RESET_SECONDS", "60"))
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of calling an upstream service whose circuit is open.
+    """
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker guarding one upstream endpoint.
+
+    After CIRCUIT_FAILURE_THRESHOLD consecutive failures the circuit opens and
+    calls fail fast with CircuitOpenError. Once the reset timeout has passed a
+    single trial call is let through; its outcome closes or reopens the circuit.
+
+    Used as a context manager around the call:
+
+        with get_circuit_breaker("llm"):
+            response = client.chat.completions.create(...)
+    """
+
+    def __init__(self, name, failure_threshold=CIRCUIT_FAILURE_THRESHOLD, reset_seconds=CIRCUIT_RESET_SECONDS):
+        """
+        Args:
+            name (str): Endpoint name used in logs and errors
+            failure_threshold (int): Consecutive failures that open the circuit
+            reset_seconds (float): Seconds the circuit stays open before a trial call
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def __enter__(self):
+        with self._lock:
+            if self.opened_at is None:
+                return self
+            if time.monotonic() - self.opened_at < self.reset_seconds or self._trial_running:
+                raise CircuitOpenError(f"Circuit for {self.name} is open, skipping call")
+            self._trial_running = True
+            return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with self._lock:
+            self._trial_running = False
+            if exc_type is None:
+                self.failures = 0
+                self.opened_at = None
+                return False
+
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"Opening circuit for {self.name} after {self.failures} failures")
+                self.opened_at = time.monotonic()
+        return False
@@ -0,0 +1,116 @@
+"""
+Stage checkpoints of scheduled research updates.
+
+Each scheduled delivery of a configuration has one row, keyed by the time
+the digest is due. The prepare run ahead of delivery saves the output of
+every stage it completes, so the delivery only renders and posts, and a run
+interrupted by a crash resumes from its last completed stage.
+"""
+from src.database.connection import get_db_connection, transaction
+from src.database.papers import to_db_time, from_db_time
+import os
+import json
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pipeline stages in the order they complete
+CHECKPOINT_STAGES = ("fetched", "ranked", "summarized", "posted")
+
+# Days checkpoints are kept after their delivery time
+CHECKPOINT_RETENTION_DAYS = int(os.environ.get("CHECKPOINT_RETENTION_DAYS", "7"))
+
+def _dump_papers(papers):
+    return json.dumps([dict(paper, published=to_db_time(paper['published'])) for paper in papers])
+
+def _load_papers(payload):
+    return [dict(paper, published=from_db_time(paper['published'])) for paper in json.loads(payload)]
+
+def _row_to_checkpoint(row):
+    return {
+        "config_id": row['config_id'],
+        "delivery_at": row['delivery_at'],
+        "stage": row['stage'],
+        "papers": _load_papers(row['papers']) if row['papers'] is not None else None,
+        "summaries": json.loads(row['summaries']) if row['summaries'] is not None else None
+    }
+
+def save_checkpoint(config_id, delivery_at, stage, papers, summaries=None):
+    """
+    Record that a scheduled run completed a stage.
+
+    Saving the "posted" stage also forgets checkpoints past the retention period.
+
+    Args:
+        config_id (int): ID of the configuration
+        delivery_at (str): Delivery time of the run, as a UTC database timestamp
+        stage (str): One of CHECKPOINT_STAGES
+        papers (list): Papers left after the stage
+        summaries (dict): Paper summaries by arXiv ID, once summarized (optional)
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            conn.execute('''
+            INSERT OR REPLACE INTO run_checkpoints (config_id, delivery_at, stage, papers, summaries, updated_at)
+            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            ''', (
+                config_id, delivery_at, stage, _dump_papers(papers),
+                json.dumps(summaries) if summaries is not None else None
+            ))
+            if stage == "posted":
+                conn.execute(
+                    "DELETE FROM run_checkpoints WHERE delivery_at < datetime('now', ?)",
+                    (f"-{CHECKPOINT_RETENTION_DAYS} days",)
+                )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving {stage} checkpoint for configuration {config_id}: {str(e)}")
+        return False
+
+def get_checkpoint(config_id, delivery_at):
+    """
+    Get the checkpoint of a scheduled run.
+
+    Args:
+        config_id (int): ID of the configuration
+        delivery_at (str): Delivery time of the run, as a UTC database timestamp
+
+    Returns:
+        dict: Checkpoint with config_id, delivery_at, stage, papers and
+            summaries, or None if the run has not completed a stage
+    """
+    try:
+        row = get_db_connection().execute(
+            'SELECT * FROM run_checkpoints WHERE config_id = ? AND delivery_at = ?',
+            (config_id, delivery_at)
+        ).fetchone()
+        return _row_to_checkpoint(row) if row else None
+    except Exception as e:
+        logger.error(f"Error getting checkpoint for configuration {config_id}: {str(e)}")
+        return None
+
+def get_unfinished_checkpoints(since):
+    """
+    Get the checkpoints of scheduled runs that stopped before posting.
+
+    Args:
+        since (datetime): Only runs due at or after this time
+
+    Returns:
+        list: Checkpoints ordered by delivery time
+    """
+    try:
+        rows = get_db_connection().execute('''
+        SELECT * FROM run_checkpoints
+        WHERE stage != 'posted' AND delivery_at >= ?
+        ORDER BY delivery_at, config_id
+        ''', (to_db_time(since),)).fetchall()
+        return [_row_to_checkpoint(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting unfinished checkpoints: {str(e)}")
+        return []
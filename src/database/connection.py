@@ -1,9 +1,19 @@
 """
-Database connection and initialization.
+Database connection management and initialization.
+
+Each thread keeps one long-lived SQLite connection in WAL mode, so Slack
+handler threads, scheduler threads and engine workers read concurrently with
+a single writer instead of reconnecting and fighting over the rollback
+journal lock. Connections run in autocommit mode; writes go through the
+transaction() context manager.
 """
 import sqlite3
 import os
+import json
 import logging
+import threading
+from contextlib import contextmanager
+from src.arxiv_integration.parser import normalize_topic
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -12,39 +22,285 @@ logger = logging.getLogger(__name__)
 # Database file location
 DB_PATH = os.environ.get("DB_PATH", "research_bot.db")
 
+# Milliseconds a connection waits for a lock held by another writer
+BUSY_TIMEOUT_MS = int(os.environ.get("DB_BUSY_TIMEOUT_MS", "5000"))
+
+# Prepared statements kept per connection by the sqlite3 module
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+
+def _connect():
+    conn = sqlite3.connect(
+        DB_PATH,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        cached_statements=STATEMENT_CACHE_SIZE,
+        isolation_level=None
+    )
+    # Enable row factory to return rows as dictionaries
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
 def get_db_connection():
     """
-    Create and return a database connection.
+    Get the calling thread's database connection, opening it on first use.
+    
+    The connection is reused for the lifetime of the thread, so callers must
+    not close it. Reusing it also keeps the sqlite3 prepared statement cache
+    warm across calls.
     
     Returns:
         sqlite3.Connection: Database connection object
     """
-    conn = sqlite3.connect(DB_PATH)
-    # Enable row factory to return rows as dictionaries
-    conn.row_factory = sqlite3.Row
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = _connect()
+        _local.depth = 0
     return conn
 
+def close_db_connection():
+    """
+    Close the calling thread's database connection, if it has one.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        conn.close()
+        _local.conn = None
+
+@contextmanager
+def transaction():
+    """
+    Run a block of statements in a single write transaction.
+    
+    The transaction takes the write lock up front (BEGIN IMMEDIATE), so it
+    waits for the busy timeout instead of failing when it later upgrades
+    from reading to writing. Nested blocks join the outermost transaction.
+    
+    Yields:
+        sqlite3.Connection: The calling thread's connection
+    """
+    conn = get_db_connection()
+    if _local.depth:
+        _local.depth += 1
+        try:
+            yield conn
+        finally:
+            _local.depth -= 1
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    _local.depth = 1
+    try:
+        yield conn
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        _local.depth = 0
+
 def init_db():
     """
     Initialize the database schema if it doesn't exist.
     """
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS configurations (
-            id INTEGER PRIMARY KEY,
-            frequency TEXT,
-            time_range INTEGER,
-            topic TEXT,
-            additional_topics TEXT,
-            channel TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-        ''')
-        conn.commit()
+        with transaction() as conn:
+            _create_schema(conn.cursor())
         logger.info("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
-    finally:
-        conn.close()
\ No newline at end of file
+
+def _create_schema(cursor):
+    """Create missing tables and indexes and migrate older schemas."""
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS configurations (
+        id INTEGER PRIMARY KEY,
+        frequency TEXT,
+        time_range INTEGER,
+        topic TEXT,
+        additional_topics TEXT,
+        channel TEXT,
+        created_by TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    # Databases created before configs tracked their last change
+    columns = [row['name'] for row in cursor.execute('PRAGMA table_info(configurations)')]
+    if 'updated_at' not in columns:
+        cursor.execute('ALTER TABLE configurations ADD COLUMN updated_at TIMESTAMP')
+        cursor.execute('UPDATE configurations SET updated_at = created_at')
+    # Databases created before configs recorded the user who set them up
+    if 'created_by' not in columns:
+        cursor.execute('ALTER TABLE configurations ADD COLUMN created_by TEXT')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_configurations_updated_at ON configurations (updated_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_configurations_channel ON configurations (channel, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_configurations_created_by ON configurations (created_by, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_configurations_frequency ON configurations (frequency, id)')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS config_topics (
+        config_id INTEGER NOT NULL,
+        position INTEGER NOT NULL,
+        topic TEXT NOT NULL,
+        normalized_topic TEXT NOT NULL,
+        PRIMARY KEY (config_id, position)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_config_topics_topic ON config_topics (normalized_topic, config_id)')
+    # Backfill the topic index for configs saved when topics only lived in the JSON column
+    unindexed = cursor.execute('''
+    SELECT id, topic, additional_topics FROM configurations
+    WHERE id NOT IN (SELECT config_id FROM config_topics)
+    ''').fetchall()
+    for row in unindexed:
+        topics = [row['topic']] + json.loads(row['additional_topics'] or '[]')
+        cursor.executemany(
+            'INSERT INTO config_topics (config_id, position, topic, normalized_topic) VALUES (?, ?, ?, ?)',
+            [(row['id'], position, topic, normalize_topic(topic)) for position, topic in enumerate(topics)]
+        )
+    if unindexed:
+        logger.info(f"Indexed topics of {len(unindexed)} existing configurations")
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS app_state (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS papers (
+        arxiv_id TEXT PRIMARY KEY,
+        title TEXT,
+        authors TEXT,
+        abstract TEXT,
+        published TIMESTAMP,
+        pdf_url TEXT,
+        doi TEXT,
+        fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_papers_published ON papers (published)')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS paper_topics (
+        topic TEXT,
+        arxiv_id TEXT,
+        PRIMARY KEY (topic, arxiv_id)
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS topic_watermarks (
+        topic TEXT PRIMARY KEY,
+        covered_since TIMESTAMP,
+        fetched_until TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    # Databases created before watermarks recorded the end of the last fetch
+    # resume from the newest paper seen, which is never later than that
+    columns = [row['name'] for row in cursor.execute('PRAGMA table_info(topic_watermarks)')]
+    if 'fetched_until' not in columns:
+        cursor.execute('ALTER TABLE topic_watermarks ADD COLUMN fetched_until TIMESTAMP')
+        cursor.execute('UPDATE topic_watermarks SET fetched_until = last_published')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS summary_cache (
+        cache_key TEXT PRIMARY KEY,
+        arxiv_id TEXT,
+        model TEXT,
+        payload TEXT,
+        size INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_summary_cache_last_used ON summary_cache (last_used_at)')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS delivered_papers (
+        config_id INTEGER NOT NULL,
+        channel TEXT NOT NULL,
+        arxiv_id TEXT NOT NULL,
+        delivered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (config_id, channel, arxiv_id)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_delivered_papers_delivered_at ON delivered_papers (delivered_at)')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS jira_tickets (
+        issue_key TEXT PRIMARY KEY,
+        epic_id TEXT NOT NULL,
+        summary TEXT,
+        description TEXT,
+        status TEXT,
+        labels TEXT,
+        updated TIMESTAMP,
+        synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jira_tickets_epic ON jira_tickets (epic_id)')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS jira_epic_syncs (
+        epic_id TEXT PRIMARY KEY,
+        last_updated TIMESTAMP,
+        full_synced_at TIMESTAMP
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS run_stats (
+        id INTEGER PRIMARY KEY,
+        config_id INTEGER,
+        channel TEXT,
+        trigger TEXT,
+        status TEXT,
+        error TEXT,
+        started_at TIMESTAMP,
+        total_seconds REAL,
+        queue_delay_seconds REAL,
+        fetch_seconds REAL,
+        papers_fetched INTEGER,
+        papers_new INTEGER,
+        papers_ranked INTEGER,
+        llm_requests INTEGER,
+        llm_seconds REAL,
+        ttft_seconds REAL,
+        prompt_tokens INTEGER,
+        completion_tokens INTEGER,
+        slack_calls INTEGER,
+        slack_seconds REAL,
+        slack_rate_limited INTEGER
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_run_stats_config ON run_stats (config_id, started_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_run_stats_started_at ON run_stats (started_at)')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS run_checkpoints (
+        config_id INTEGER NOT NULL,
+        delivery_at TIMESTAMP NOT NULL,
+        stage TEXT NOT NULL,
+        papers TEXT,
+        summaries TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (config_id, delivery_at)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_run_checkpoints_delivery_at ON run_checkpoints (delivery_at)')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS workers (
+        worker_id TEXT PRIMARY KEY,
+        started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        heartbeat_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS run_leases (
+        config_id INTEGER NOT NULL,
+        delivery_at TIMESTAMP NOT NULL,
+        phase TEXT NOT NULL,
+        worker_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        attempts INTEGER DEFAULT 1,
+        expires_at TIMESTAMP,
+        PRIMARY KEY (delivery_at, phase, config_id)
+    )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_run_leases_worker ON run_leases (worker_id, status)')
@@ -0,0 +1,184 @@
+"""
+Worker membership and run leases for worker mode.
+
+Workers announce themselves with a heartbeat; a worker whose heartbeat is
+older than WORKER_TIMEOUT_SECONDS is considered gone. A worker claims a
+scheduled run by taking its lease, which it renews while the run is in
+flight. A lease that expires before the run completes can be claimed by
+another worker, so the runs of a crashed worker are taken over.
+"""
+from src.database.connection import get_db_connection, transaction
+import os
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds without a heartbeat after which a worker is considered gone
+WORKER_TIMEOUT_SECONDS = int(os.environ.get("WORKER_TIMEOUT_SECONDS", "30"))
+
+# Days finished leases are kept after their delivery time
+LEASE_RETENTION_DAYS = int(os.environ.get("LEASE_RETENTION_DAYS", "7"))
+
+def heartbeat(worker_id):
+    """
+    Record that a worker is alive and forget workers gone for a day.
+
+    Args:
+        worker_id (str): ID of the worker
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            conn.execute('''
+            INSERT INTO workers (worker_id) VALUES (?)
+            ON CONFLICT (worker_id) DO UPDATE SET heartbeat_at = CURRENT_TIMESTAMP
+            ''', (worker_id,))
+            conn.execute("DELETE FROM workers WHERE heartbeat_at < datetime('now', '-1 day')")
+        return True
+    except Exception as e:
+        logger.error(f"Error recording heartbeat of worker {worker_id}: {str(e)}")
+        return False
+
+def get_live_workers(timeout_seconds=WORKER_TIMEOUT_SECONDS):
+    """
+    Get the workers with a recent heartbeat.
+
+    Args:
+        timeout_seconds (int): Maximum age of the last heartbeat
+
+    Returns:
+        list: Worker IDs in sorted order
+    """
+    try:
+        rows = get_db_connection().execute(
+            "SELECT worker_id FROM workers WHERE heartbeat_at >= datetime('now', ?) ORDER BY worker_id",
+            (f"-{int(timeout_seconds)} seconds",)
+        ).fetchall()
+        return [row['worker_id'] for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting live workers: {str(e)}")
+        return []
+
+def remove_worker(worker_id):
+    """
+    Remove a worker that is shutting down, so its shard moves right away.
+
+    Args:
+        worker_id (str): ID of the worker
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            conn.execute('DELETE FROM workers WHERE worker_id = ?', (worker_id,))
+        return True
+    except Exception as e:
+        logger.error(f"Error removing worker {worker_id}: {str(e)}")
+        return False
+
+def get_leases(delivery_at, phase):
+    """
+    Get the leases of every run of a delivery time and phase.
+
+    Args:
+        delivery_at (str): Delivery time, as a UTC database timestamp
+        phase (str): "prepare" or "deliver"
+
+    Returns:
+        dict: Leases by configuration ID, each with worker_id, status,
+            attempts and whether it has expired
+    """
+    try:
+        rows = get_db_connection().execute('''
+        SELECT config_id, worker_id, status, attempts, expires_at < datetime('now') AS expired
+        FROM run_leases
+        WHERE delivery_at = ? AND phase = ?
+        ''', (delivery_at, phase)).fetchall()
+        return {row['config_id']: dict(row) for row in rows}
+    except Exception as e:
+        logger.error(f"Error getting leases: {str(e)}")
+        return {}
+
+def claim_lease(config_id, delivery_at, phase, worker_id, lease_seconds):
+    """
+    Claim a run unless another worker holds a live lease on it or it is finished.
+
+    Args:
+        config_id (int): ID of the configuration
+        delivery_at (str): Delivery time, as a UTC database timestamp
+        phase (str): "prepare" or "deliver"
+        worker_id (str): ID of the claiming worker
+        lease_seconds (int): Seconds until the lease expires unless renewed
+
+    Returns:
+        bool: True if the worker now holds the lease
+    """
+    try:
+        with transaction() as conn:
+            claimed = conn.execute('''
+            INSERT INTO run_leases (config_id, delivery_at, phase, worker_id, status, expires_at)
+            VALUES (?, ?, ?, ?, 'running', datetime('now', ?))
+            ON CONFLICT (delivery_at, phase, config_id) DO UPDATE SET
+                worker_id = excluded.worker_id,
+                expires_at = excluded.expires_at,
+                attempts = run_leases.attempts + 1
+            WHERE run_leases.status = 'running' AND run_leases.expires_at < datetime('now')
+            ''', (config_id, delivery_at, phase, worker_id, f"{int(lease_seconds)} seconds")).rowcount
+        return claimed == 1
+    except Exception as e:
+        logger.error(f"Error claiming lease for configuration {config_id}: {str(e)}")
+        return False
+
+def renew_leases(worker_id, lease_seconds):
+    """
+    Extend every running lease a worker holds.
+
+    Args:
+        worker_id (str): ID of the worker
+        lease_seconds (int): Seconds from now until the leases expire
+
+    Returns:
+        int: Number of renewed leases
+    """
+    try:
+        with transaction() as conn:
+            return conn.execute('''
+            UPDATE run_leases SET expires_at = datetime('now', ?)
+            WHERE worker_id = ? AND status = 'running'
+            ''', (f"{int(lease_seconds)} seconds", worker_id)).rowcount
+    except Exception as e:
+        logger.error(f"Error renewing leases of worker {worker_id}: {str(e)}")
+        return 0
+
+def complete_lease(config_id, delivery_at, phase, worker_id):
+    """
+    Mark a claimed run as finished and forget leases past the retention period.
+
+    Args:
+        config_id (int): ID of the configuration
+        delivery_at (str): Delivery time, as a UTC database timestamp
+        phase (str): "prepare" or "deliver"
+        worker_id (str): ID of the worker holding the lease
+
+    Returns:
+        bool: True if the worker still held the lease, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            completed = conn.execute('''
+            UPDATE run_leases SET status = 'done'
+            WHERE config_id = ? AND delivery_at = ? AND phase = ? AND worker_id = ?
+            ''', (config_id, delivery_at, phase, worker_id)).rowcount
+            conn.execute(
+                "DELETE FROM run_leases WHERE delivery_at < datetime('now', ?)",
+                (f"-{LEASE_RETENTION_DAYS} days",)
+            )
+        return completed == 1
+    except Exception as e:
+        logger.error(f"Error completing lease for configuration {config_id}: {str(e)}")
+        return False
@@ -0,0 +1,77 @@
+"""
+Ledger of papers already delivered to each configuration and channel.
+
+The table is the only source of truth, so deliveries recorded by another
+process (a worker, the Slack front end or a restarted peer) are seen right
+away. Candidates are checked with one indexed lookup per call.
+"""
+from src.database.connection import get_db_connection, transaction
+import os
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Days a delivery is remembered; longer than the longest lookback period
+DELIVERY_RETENTION_DAYS = int(os.environ.get("DELIVERY_RETENTION_DAYS", "45"))
+
+# Paper IDs per lookup, below SQLite's limit on bound parameters
+LOOKUP_CHUNK_SIZE = 500
+
+def filter_undelivered(config_id, channel, papers):
+    """
+    Drop papers that were already delivered to a configuration's channel.
+
+    Args:
+        config_id (int): Configuration ID
+        channel (str): Slack channel ID
+        papers (list): Candidate paper entries
+
+    Returns:
+        list: Papers not delivered before, in their original order
+    """
+    try:
+        arxiv_ids = list({paper['arxiv_id'] for paper in papers})
+        delivered = set()
+        conn = get_db_connection()
+        for start in range(0, len(arxiv_ids), LOOKUP_CHUNK_SIZE):
+            chunk = arxiv_ids[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = conn.execute(f'''
+            SELECT arxiv_id FROM delivered_papers
+            WHERE config_id = ? AND channel = ? AND arxiv_id IN ({placeholders})
+            ''', (config_id, channel, *chunk)).fetchall()
+            delivered.update(row['arxiv_id'] for row in rows)
+
+        return [paper for paper in papers if paper['arxiv_id'] not in delivered]
+    except Exception as e:
+        logger.error(f"Error checking delivered papers: {str(e)}")
+        return papers
+
+def record_deliveries(config_id, channel, arxiv_ids):
+    """
+    Record papers as delivered and forget deliveries past the retention period.
+
+    Args:
+        config_id (int): Configuration ID
+        channel (str): Slack channel ID
+        arxiv_ids (list): IDs of the delivered papers
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO delivered_papers (config_id, channel, arxiv_id) VALUES (?, ?, ?)',
+                [(config_id, channel, arxiv_id) for arxiv_id in arxiv_ids]
+            )
+            conn.execute(
+                "DELETE FROM delivered_papers WHERE delivered_at < datetime('now', ?)",
+                (f"-{DELIVERY_RETENTION_DAYS} days",)
+            )
+        return True
+    except Exception as e:
+        logger.error(f"Error recording delivered papers: {str(e)}")
+        return False
@@ -1,7 +1,8 @@
 """
 Database models and operations.
 """
-from src.database.connection import get_db_connection
+from src.database.connection import get_db_connection, transaction
+from src.arxiv_integration.parser import normalize_topic
 import json
 import logging
 
@@ -9,33 +10,55 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default page size for keyset-paginated config queries
+CONFIG_PAGE_SIZE = 500
+
+# SQL expression for the current UTC time with milliseconds, so config changes
+# made within the same second as a scheduler sync are still ordered against it
+NOW_MS = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+def _row_to_config(row):
+    config = dict(row)
+    # Parse JSON string back to list
+    config['additional_topics'] = json.loads(config['additional_topics'])
+    return config
+
+def _write_config_topics(conn, config_id, config):
+    """Replace the topic index rows of a configuration."""
+    topics = [config['topic']] + list(config.get('additional_topics', []))
+    conn.execute('DELETE FROM config_topics WHERE config_id = ?', (config_id,))
+    conn.executemany(
+        'INSERT INTO config_topics (config_id, position, topic, normalized_topic) VALUES (?, ?, ?, ?)',
+        [(config_id, position, topic, normalize_topic(topic)) for position, topic in enumerate(topics)]
+    )
+
 def save_config(config):
     """
     Save a new configuration to the database.
     
     Args:
         config (dict): Configuration dictionary
-        
+    
     Returns:
         int: ID of the inserted configuration
     """
-    conn = get_db_connection()
     try:
         # Convert list of additional topics to JSON string for storage
         additional_topics = json.dumps(config.get('additional_topics', []))
         
-        cursor = conn.cursor()
-        cursor.execute('''
-        INSERT INTO configurations (frequency, time_range, topic, additional_topics, channel)
-        VALUES (?, ?, ?, ?, ?)
-        ''', (
-            config['frequency'],
-            config['time_range'],
-            config['topic'],
-            additional_topics,
-            config['channel']
-        ))
-        conn.commit()
+        with transaction() as conn:
+            cursor = conn.execute(f'''
+            INSERT INTO configurations (frequency, time_range, topic, additional_topics, channel, created_by, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, {NOW_MS})
+            ''', (
+                config['frequency'],
+                config['time_range'],
+                config['topic'],
+                additional_topics,
+                config['channel'],
+                config.get('created_by')
+            ))
+            _write_config_topics(conn, cursor.lastrowid, config)
         
         # Get the ID of the inserted row
         config_id = cursor.lastrowid
@@ -43,10 +66,7 @@ def save_config(config):
         return config_id
     except Exception as e:
         logger.error(f"Error saving configuration: {str(e)}")
-        conn.rollback()
         return None
-    finally:
-        conn.close()
 
 def get_config(config_id):
     """
@@ -54,27 +74,20 @@ def get_config(config_id):
     
     Args:
         config_id (int): Configuration ID
-        
+    
     Returns:
         dict: Configuration dictionary or None if not found
     """
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM configurations WHERE id = ?', (config_id,))
-        row = cursor.fetchone()
+        conn = get_db_connection()
+        row = conn.execute('SELECT * FROM configurations WHERE id = ?', (config_id,)).fetchone()
         
         if row:
-            config = dict(row)
-            # Parse JSON string back to list
-            config['additional_topics'] = json.loads(config['additional_topics'])
-            return config
+            return _row_to_config(row)
         return None
     except Exception as e:
         logger.error(f"Error getting configuration: {str(e)}")
         return None
-    finally:
-        conn.close()
 
 def get_all_configs():
     """
@@ -83,26 +96,18 @@ def get_all_configs():
     Returns:
         list: List of configuration dictionaries
     """
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM configurations')
-        rows = cursor.fetchall()
+        conn = get_db_connection()
+        rows = conn.execute('SELECT * FROM configurations').fetchall()
         
         # Convert rows to dictionaries and parse JSON
-        configs = []
-        for row in rows:
-            config = dict(row)
-            config['additional_topics'] = json.loads(config['additional_topics'])
-            configs.append(config)
-            
+        configs = [_row_to_config(row) for row in rows]
+        
         logger.info(f"Retrieved {len(configs)} configurations")
         return configs
     except Exception as e:
         logger.error(f"Error getting configurations: {str(e)}")
         return []
-    finally:
-        conn.close()
 
 def update_config(config_id, config_data):
     """
@@ -111,38 +116,35 @@ def update_config(config_id, config_data):
     Args:
         config_id (int): Configuration ID
         config_data (dict): Updated configuration data
-        
+    
     Returns:
         bool: True if successful, False otherwise
     """
-    conn = get_db_connection()
     try:
         # Convert list of additional topics to JSON string for storage
         additional_topics = json.dumps(config_data.get('additional_topics', []))
         
-        cursor = conn.cursor()
-        cursor.execute('''
-        UPDATE configurations
-        SET frequency = ?, time_range = ?, topic = ?, additional_topics = ?, channel = ?
-        WHERE id = ?
-        ''', (
-            config_data['frequency'],
-            config_data['time_range'],
-            config_data['topic'],
-            additional_topics,
-            config_data['channel'],
-            config_id
-        ))
-        conn.commit()
+        with transaction() as conn:
+            conn.execute(f'''
+            UPDATE configurations
+            SET frequency = ?, time_range = ?, topic = ?, additional_topics = ?, channel = ?,
+                updated_at = {NOW_MS}
+            WHERE id = ?
+            ''', (
+                config_data['frequency'],
+                config_data['time_range'],
+                config_data['topic'],
+                additional_topics,
+                config_data['channel'],
+                config_id
+            ))
+            _write_config_topics(conn, config_id, config_data)
         
         logger.info(f"Updated configuration with ID: {config_id}")
         return True
     except Exception as e:
         logger.error(f"Error updating configuration: {str(e)}")
-        conn.rollback()
         return False
-    finally:
-        conn.close()
 
 def delete_config(config_id):
     """
@@ -150,21 +152,277 @@ def delete_config(config_id):
     
     Args:
         config_id (int): Configuration ID
-        
+    
     Returns:
         bool: True if successful, False otherwise
     """
-    conn = get_db_connection()
     try:
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM configurations WHERE id = ?', (config_id,))
-        conn.commit()
+        with transaction() as conn:
+            conn.execute('DELETE FROM configurations WHERE id = ?', (config_id,))
+            conn.execute('DELETE FROM config_topics WHERE config_id = ?', (config_id,))
         
         logger.info(f"Deleted configuration with ID: {config_id}")
         return True
     except Exception as e:
         logger.error(f"Error deleting configuration: {str(e)}")
-        conn.rollback()
         return False
-    finally:
-        conn.close()
\ No newline at end of file
+
+def save_configs(configs):
+    """
+    Save many new configurations in a single transaction.
+    
+    Args:
+        configs (list): List of configuration dictionaries
+        
+    Returns:
+        list: IDs of the inserted configurations, or None if nothing was saved
+    """
+    try:
+        config_ids = []
+        with transaction() as conn:
+            for config in configs:
+                cursor = conn.execute(f'''
+                INSERT INTO configurations (frequency, time_range, topic, additional_topics, channel, created_by, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, {NOW_MS})
+                ''', (
+                    config['frequency'],
+                    config['time_range'],
+                    config['topic'],
+                    json.dumps(config.get('additional_topics', [])),
+                    config['channel'],
+                    config.get('created_by')
+                ))
+                _write_config_topics(conn, cursor.lastrowid, config)
+                config_ids.append(cursor.lastrowid)
+        
+        logger.info(f"Saved {len(config_ids)} configurations")
+        return config_ids
+    except Exception as e:
+        logger.error(f"Error saving configurations: {str(e)}")
+        return None
+
+def get_configs_for_topics(topics, after_id=0, limit=CONFIG_PAGE_SIZE):
+    """
+    Get one page of the configurations subscribed to any of the given topics.
+    
+    Pages are keyed on the configuration ID, so fetching the next page costs
+    the same however deep into the result set it is.
+    
+    Args:
+        topics (list): Topics to look up, in any spelling
+        after_id (int): Return configurations with an ID above this one
+        limit (int): Maximum number of configurations to return
+        
+    Returns:
+        list: List of configuration dictionaries ordered by ID
+    """
+    normalized = sorted({normalize_topic(topic) for topic in topics})
+    if not normalized:
+        return []
+    
+    try:
+        placeholders = ", ".join("?" for _ in normalized)
+        rows = get_db_connection().execute(f'''
+        SELECT * FROM configurations
+        WHERE id IN (
+            SELECT config_id FROM config_topics
+            WHERE normalized_topic IN ({placeholders}) AND config_id > ?
+        )
+        ORDER BY id
+        LIMIT ?
+        ''', (*normalized, after_id, limit)).fetchall()
+        return [_row_to_config(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting configurations for topics: {str(e)}")
+        return []
+
+def get_configs_for_channel(channel, after_id=0, limit=CONFIG_PAGE_SIZE):
+    """
+    Get one page of the configurations posting to a channel.
+    
+    Args:
+        channel (str): Slack channel ID
+        after_id (int): Return configurations with an ID above this one
+        limit (int): Maximum number of configurations to return
+        
+    Returns:
+        list: List of configuration dictionaries ordered by ID
+    """
+    try:
+        rows = get_db_connection().execute('''
+        SELECT * FROM configurations
+        WHERE channel = ? AND id > ?
+        ORDER BY id
+        LIMIT ?
+        ''', (channel, after_id, limit)).fetchall()
+        return [_row_to_config(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting configurations for channel: {str(e)}")
+        return []
+
+def get_configs_for_frequency(frequency, after_id=0, limit=CONFIG_PAGE_SIZE):
+    """
+    Get one page of the configurations with an update frequency.
+    
+    Args:
+        frequency (str): "daily" or "weekly"
+        after_id (int): Return configurations with an ID above this one
+        limit (int): Maximum number of configurations to return
+        
+    Returns:
+        list: List of configuration dictionaries ordered by ID
+    """
+    try:
+        rows = get_db_connection().execute('''
+        SELECT * FROM configurations
+        WHERE frequency = ? AND id > ?
+        ORDER BY id
+        LIMIT ?
+        ''', (frequency, after_id, limit)).fetchall()
+        return [_row_to_config(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting configurations for frequency: {str(e)}")
+        return []
+
+def get_configs_for_user(user_id, channels=(), limit=CONFIG_PAGE_SIZE):
+    """
+    Get the configurations a user set up.
+    
+    Configurations saved before their creator was recorded have no owner;
+    they are listed for the members of the channel they post to.
+    
+    Args:
+        user_id (str): Slack user ID
+        channels (iterable): IDs of the channels the user is a member of (optional)
+        limit (int): Maximum number of configurations to return
+        
+    Returns:
+        list: List of configuration dictionaries ordered by ID
+    """
+    channels = list(channels)
+    try:
+        placeholders = ", ".join("?" for _ in channels)
+        rows = get_db_connection().execute(f'''
+        SELECT * FROM configurations
+        WHERE created_by = ? OR (created_by IS NULL AND channel IN ({placeholders}))
+        ORDER BY id
+        LIMIT ?
+        ''', (user_id, *channels, limit)).fetchall()
+        return [_row_to_config(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting configurations for user: {str(e)}")
+        return []
+
+def has_unowned_configs():
+    """
+    Check whether any configuration was saved before creators were recorded.
+    
+    Returns:
+        bool: True if a configuration has no creator
+    """
+    try:
+        row = get_db_connection().execute(
+            'SELECT 1 FROM configurations WHERE created_by IS NULL LIMIT 1'
+        ).fetchone()
+        return row is not None
+    except Exception as e:
+        logger.error(f"Error checking for unowned configurations: {str(e)}")
+        return False
+
+def iter_config_pages(fetch_page, *args, page_size=CONFIG_PAGE_SIZE):
+    """
+    Iterate over every configuration returned by a keyset-paginated query.
+    
+    Args:
+        fetch_page (callable): get_configs_for_topics, get_configs_for_channel
+            or get_configs_for_frequency
+        *args: Positional arguments for fetch_page before after_id
+        page_size (int): Configurations fetched per query
+        
+    Yields:
+        dict: Configuration dictionary
+    """
+    after_id = 0
+    while True:
+        page = fetch_page(*args, after_id=after_id, limit=page_size)
+        yield from page
+        if len(page) < page_size:
+            return
+        after_id = page[-1]['id']
+
+def get_configs_updated_since(timestamp):
+    """
+    Get configurations created or changed since a point in time.
+    
+    Changes are stamped with millisecond precision, so configurations saved
+    shortly before the previous sync are not returned again.
+    
+    Args:
+        timestamp (str): UTC timestamp from get_db_time(), or None for all
+    
+    Returns:
+        list: List of configuration dictionaries
+    """
+    if timestamp is None:
+        return get_all_configs()
+    
+    try:
+        conn = get_db_connection()
+        rows = conn.execute(
+            'SELECT * FROM configurations WHERE updated_at >= ? OR updated_at IS NULL',
+            (timestamp,)
+        ).fetchall()
+        
+        configs = [_row_to_config(row) for row in rows]
+        
+        logger.info(f"Retrieved {len(configs)} configurations changed since {timestamp}")
+        return configs
+    except Exception as e:
+        logger.error(f"Error getting changed configurations: {str(e)}")
+        return []
+
+def get_db_time():
+    """
+    Get the current time as the database records configuration changes.
+    
+    Returns:
+        str: UTC timestamp with milliseconds
+    """
+    return get_db_connection().execute(f'SELECT {NOW_MS}').fetchone()[0]
+
+def get_state(key):
+    """
+    Get a value from the application state table.
+    
+    Args:
+        key (str): State key
+    
+    Returns:
+        str: Stored value or None if not set
+    """
+    try:
+        conn = get_db_connection()
+        row = conn.execute('SELECT value FROM app_state WHERE key = ?', (key,)).fetchone()
+        return row['value'] if row else None
+    except Exception as e:
+        logger.error(f"Error getting state {key}: {str(e)}")
+        return None
+
+def set_state(key, value):
+    """
+    Store a value in the application state table.
+    
+    Args:
+        key (str): State key
+        value (str): Value to store
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            conn.execute('INSERT OR REPLACE INTO app_state (key, value) VALUES (?, ?)', (key, value))
+        return True
+    except Exception as e:
+        logger.error(f"Error setting state {key}: {str(e)}")
+        return False
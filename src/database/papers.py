@@ -0,0 +1,204 @@
+"""
+Local store of fetched arXiv papers and per-topic fetch watermarks.
+"""
+from src.database.connection import get_db_connection, transaction
+from datetime import datetime, timezone
+import json
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Timestamps are stored as sortable UTC strings
+DB_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def to_db_time(value):
+    """
+    Convert a datetime into the UTC string stored in the database.
+
+    Args:
+        value (datetime): Timezone-aware datetime
+
+    Returns:
+        str: UTC timestamp string
+    """
+    return value.astimezone(timezone.utc).strftime(DB_TIME_FORMAT)
+
+def from_db_time(value):
+    """
+    Convert a stored UTC string back into a timezone-aware datetime.
+
+    Args:
+        value (str): UTC timestamp string or None
+
+    Returns:
+        datetime: UTC-aware datetime or None
+    """
+    if value is None:
+        return None
+    return datetime.strptime(value, DB_TIME_FORMAT).replace(tzinfo=timezone.utc)
+
+def _row_to_paper(row):
+    paper = dict(row)
+    paper['authors'] = json.loads(paper['authors'])
+    paper['published'] = from_db_time(paper['published'])
+    paper.pop('fetched_at', None)
+    return paper
+
+def save_topic_papers(topic_papers):
+    """
+    Store fetched papers and link them to the topics they matched.
+
+    Args:
+        topic_papers (dict): Mapping of topic to a list of paper entries
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            cursor = conn.cursor()
+            for topic, papers in topic_papers.items():
+                cursor.executemany('''
+                INSERT INTO papers (arxiv_id, title, authors, abstract, published, pdf_url, doi)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (arxiv_id) DO UPDATE SET
+                    title = excluded.title,
+                    authors = excluded.authors,
+                    abstract = excluded.abstract,
+                    pdf_url = excluded.pdf_url,
+                    doi = excluded.doi,
+                    fetched_at = CURRENT_TIMESTAMP
+                ''', [
+                    (
+                        paper['arxiv_id'],
+                        paper['title'],
+                        json.dumps(paper['authors']),
+                        paper['abstract'],
+                        to_db_time(paper['published']),
+                        paper['pdf_url'],
+                        paper['doi']
+                    )
+                    for paper in papers
+                ])
+                cursor.executemany(
+                    'INSERT OR IGNORE INTO paper_topics (topic, arxiv_id) VALUES (?, ?)',
+                    [(topic, paper['arxiv_id']) for paper in papers]
+                )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving papers: {str(e)}")
+        return False
+
+def get_papers_for_topics(topics, since):
+    """
+    Get stored papers linked to any of the topics and published after a date.
+
+    Args:
+        topics (list): Normalized search topics
+        since (datetime): UTC-aware lower bound on the publication date
+
+    Returns:
+        list: List of paper entries, newest first
+    """
+    if not topics:
+        return []
+
+    try:
+        placeholders = ", ".join("?" for _ in topics)
+        rows = get_db_connection().execute(f'''
+        SELECT * FROM papers
+        WHERE published > ?
+          AND arxiv_id IN (SELECT arxiv_id FROM paper_topics WHERE topic IN ({placeholders}))
+        ORDER BY published DESC
+        ''', (to_db_time(since), *topics)).fetchall()
+        return [_row_to_paper(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting stored papers: {str(e)}")
+        return []
+
+def get_topic_coverage(topics):
+    """
+    Get the stored fetch coverage for a list of topics.
+
+    Args:
+        topics (list): Normalized search topics
+
+    Returns:
+        dict: Mapping of topic to a (covered_since, fetched_until) tuple
+    """
+    if not topics:
+        return {}
+
+    try:
+        placeholders = ", ".join("?" for _ in topics)
+        rows = get_db_connection().execute(
+            f'SELECT * FROM topic_watermarks WHERE topic IN ({placeholders})',
+            tuple(topics)
+        ).fetchall()
+        return {
+            row['topic']: (from_db_time(row['covered_since']), from_db_time(row['fetched_until']))
+            for row in rows
+        }
+    except Exception as e:
+        logger.error(f"Error getting topic watermarks: {str(e)}")
+        return {}
+
+def update_topic_coverage(coverage):
+    """
+    Store the fetch coverage of topics after a successful fetch.
+
+    Args:
+        coverage (dict): Mapping of topic to a (covered_since, fetched_until) tuple
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            conn.executemany('''
+            INSERT OR REPLACE INTO topic_watermarks (topic, covered_since, fetched_until, updated_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ''', [
+                (
+                    topic,
+                    to_db_time(covered_since),
+                    to_db_time(fetched_until) if fetched_until else None
+                )
+                for topic, (covered_since, fetched_until) in coverage.items()
+            ])
+        return True
+    except Exception as e:
+        logger.error(f"Error updating topic watermarks: {str(e)}")
+        return False
+
+def prune_papers(older_than):
+    """
+    Delete stored papers published before a date and shrink topic coverage to match.
+
+    Args:
+        older_than (datetime): UTC-aware retention cutoff
+
+    Returns:
+        int: Number of deleted papers
+    """
+    try:
+        cutoff = to_db_time(older_than)
+        with transaction() as conn:
+            conn.execute('''
+            DELETE FROM paper_topics
+            WHERE arxiv_id IN (SELECT arxiv_id FROM papers WHERE published <= ?)
+            ''', (cutoff,))
+            deleted = conn.execute('DELETE FROM papers WHERE published <= ?', (cutoff,)).rowcount
+            conn.execute(
+                'UPDATE topic_watermarks SET covered_since = ? WHERE covered_since < ?',
+                (cutoff, cutoff)
+            )
+
+        if deleted:
+            logger.info(f"Pruned {deleted} papers published before {cutoff}")
+        return deleted
+    except Exception as e:
+        logger.error(f"Error pruning papers: {str(e)}")
+        return 0
@@ -0,0 +1,102 @@
+"""
+Per-run pipeline statistics of research updates.
+"""
+from src.database.connection import get_db_connection, transaction
+import os
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Days run statistics are kept
+RUN_STATS_RETENTION_DAYS = int(os.environ.get("RUN_STATS_RETENTION_DAYS", "30"))
+
+RUN_STATS_COLUMNS = (
+    "config_id", "channel", "trigger", "status", "error", "started_at", "total_seconds",
+    "queue_delay_seconds", "fetch_seconds", "papers_fetched", "papers_new", "papers_ranked",
+    "llm_requests", "llm_seconds", "ttft_seconds", "prompt_tokens", "completion_tokens",
+    "slack_calls", "slack_seconds", "slack_rate_limited"
+)
+
+def save_run_stats(stats):
+    """
+    Store the statistics of a finished run and forget runs past the retention period.
+
+    Args:
+        stats (dict): Values keyed by the names in RUN_STATS_COLUMNS
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        placeholders = ", ".join("?" for _ in RUN_STATS_COLUMNS)
+        with transaction() as conn:
+            conn.execute(
+                f'INSERT INTO run_stats ({", ".join(RUN_STATS_COLUMNS)}) VALUES ({placeholders})',
+                tuple(stats.get(column) for column in RUN_STATS_COLUMNS)
+            )
+            conn.execute(
+                "DELETE FROM run_stats WHERE started_at < datetime('now', ?)",
+                (f"-{RUN_STATS_RETENTION_DAYS} days",)
+            )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving run stats: {str(e)}")
+        return False
+
+def get_recent_run_stats(config_id=None, limit=20):
+    """
+    Get the statistics of the most recent runs.
+
+    Args:
+        config_id (int): Only runs of this configuration (optional)
+        limit (int): Maximum number of runs
+
+    Returns:
+        list: Run statistics dictionaries, newest first
+    """
+    try:
+        if config_id is None:
+            rows = get_db_connection().execute(
+                'SELECT * FROM run_stats ORDER BY started_at DESC, id DESC LIMIT ?',
+                (limit,)
+            ).fetchall()
+        else:
+            rows = get_db_connection().execute(
+                'SELECT * FROM run_stats WHERE config_id = ? ORDER BY started_at DESC, id DESC LIMIT ?',
+                (config_id, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+    except Exception as e:
+        logger.error(f"Error getting run stats: {str(e)}")
+        return []
+
+def get_latest_run_stats(config_ids):
+    """
+    Get the statistics of the last run of each configuration.
+
+    Prepare runs are skipped, so the result describes the last delivery.
+
+    Args:
+        config_ids (list): Configuration IDs
+
+    Returns:
+        dict: Run statistics by configuration ID, for configurations that ran
+    """
+    if not config_ids:
+        return {}
+    try:
+        placeholders = ", ".join("?" for _ in config_ids)
+        rows = get_db_connection().execute(f'''
+        SELECT * FROM run_stats
+        WHERE id IN (
+            SELECT MAX(id) FROM run_stats
+            WHERE config_id IN ({placeholders}) AND trigger != 'prepare'
+            GROUP BY config_id
+        )
+        ''', tuple(config_ids)).fetchall()
+        return {row['config_id']: dict(row) for row in rows}
+    except Exception as e:
+        logger.error(f"Error getting latest run stats: {str(e)}")
+        return {}
@@ -0,0 +1,110 @@
+"""
+On-disk cache of per-paper LLM summaries.
+"""
+from src.database.connection import transaction
+import json
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def get_cached_summaries(cache_keys):
+    """
+    Look up cached summaries and mark them as recently used.
+
+    Args:
+        cache_keys (list): Content-addressed cache keys
+
+    Returns:
+        dict: Mapping of cache key to the cached summary dictionary
+    """
+    if not cache_keys:
+        return {}
+
+    try:
+        placeholders = ", ".join("?" for _ in cache_keys)
+        with transaction() as conn:
+            rows = conn.execute(
+                f'SELECT cache_key, payload FROM summary_cache WHERE cache_key IN ({placeholders})',
+                tuple(cache_keys)
+            ).fetchall()
+            summaries = {row['cache_key']: json.loads(row['payload']) for row in rows}
+
+            if summaries:
+                hit_placeholders = ", ".join("?" for _ in summaries)
+                conn.execute(
+                    f'UPDATE summary_cache SET last_used_at = CURRENT_TIMESTAMP WHERE cache_key IN ({hit_placeholders})',
+                    tuple(summaries)
+                )
+        return summaries
+    except Exception as e:
+        logger.error(f"Error reading summary cache: {str(e)}")
+        return {}
+
+def save_summaries(entries):
+    """
+    Store per-paper summaries in the cache.
+
+    Args:
+        entries (list): List of (cache_key, arxiv_id, model, summary) tuples
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        rows = []
+        for cache_key, arxiv_id, model, summary in entries:
+            payload = json.dumps(summary)
+            rows.append((cache_key, arxiv_id, model, payload, len(payload)))
+
+        with transaction() as conn:
+            conn.executemany('''
+            INSERT OR REPLACE INTO summary_cache (cache_key, arxiv_id, model, payload, size)
+            VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+        return True
+    except Exception as e:
+        logger.error(f"Error saving summaries: {str(e)}")
+        return False
+
+def evict_summaries(max_age_days, max_bytes):
+    """
+    Evict cached summaries that are too old or exceed the cache size budget.
+
+    Entries unused for longer than the age limit are removed first, then the
+    least recently used entries until the total payload size fits the budget.
+
+    Args:
+        max_age_days (int): Maximum days since an entry was last used
+        max_bytes (int): Maximum total payload size in bytes
+
+    Returns:
+        int: Number of evicted entries
+    """
+    try:
+        with transaction() as conn:
+            evicted = conn.execute(
+                "DELETE FROM summary_cache WHERE last_used_at < datetime('now', ?)",
+                (f"-{int(max_age_days)} days",)
+            ).rowcount
+
+            excess = conn.execute('SELECT COALESCE(SUM(size), 0) FROM summary_cache').fetchone()[0] - max_bytes
+            if excess > 0:
+                rows = conn.execute('SELECT cache_key, size FROM summary_cache ORDER BY last_used_at ASC')
+                stale_keys = []
+                for row in rows:
+                    if excess <= 0:
+                        break
+                    stale_keys.append((row['cache_key'],))
+                    excess -= row['size']
+                rows.close()
+                conn.executemany('DELETE FROM summary_cache WHERE cache_key = ?', stale_keys)
+                evicted += len(stale_keys)
+
+        if evicted:
+            logger.info(f"Evicted {evicted} cached summaries")
+        return evicted
+    except Exception as e:
+        logger.error(f"Error evicting summaries: {str(e)}")
+        return 0
@@ -0,0 +1,127 @@
+"""
+Local cache of Jira epic tickets and per-epic sync state.
+"""
+from src.database.connection import get_db_connection, transaction
+from src.database.papers import to_db_time, from_db_time
+import json
+import logging
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def save_tickets(epic_id, tickets, replace=False):
+    """
+    Store tickets of an epic in the cache.
+
+    Args:
+        epic_id (str): Jira epic key
+        tickets (list): Ticket dictionaries with an "updated" datetime
+        replace (bool): Whether the tickets are the complete epic, replacing
+            any cached ticket that is no longer part of it
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            if replace:
+                conn.execute('DELETE FROM jira_tickets WHERE epic_id = ?', (epic_id,))
+            conn.executemany('''
+            INSERT OR REPLACE INTO jira_tickets (issue_key, epic_id, summary, description, status, labels, updated)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (
+                    ticket['key'],
+                    epic_id,
+                    ticket['summary'],
+                    ticket['description'],
+                    ticket['status'],
+                    json.dumps(ticket['labels']),
+                    to_db_time(ticket['updated']) if ticket.get('updated') else None
+                )
+                for ticket in tickets
+            ])
+        return True
+    except Exception as e:
+        logger.error(f"Error saving Jira tickets: {str(e)}")
+        return False
+
+def get_cached_tickets(epic_id):
+    """
+    Get the cached tickets of an epic.
+
+    Args:
+        epic_id (str): Jira epic key
+
+    Returns:
+        list: Ticket dictionaries ordered by issue key
+    """
+    try:
+        rows = get_db_connection().execute(
+            'SELECT * FROM jira_tickets WHERE epic_id = ? ORDER BY issue_key',
+            (epic_id,)
+        ).fetchall()
+        return [
+            {
+                "key": row['issue_key'],
+                "summary": row['summary'],
+                "description": row['description'],
+                "status": row['status'],
+                "labels": json.loads(row['labels'] or "[]"),
+                "updated": from_db_time(row['updated'])
+            }
+            for row in rows
+        ]
+    except Exception as e:
+        logger.error(f"Error getting cached Jira tickets: {str(e)}")
+        return []
+
+def get_epic_sync(epic_id):
+    """
+    Get the sync state of an epic.
+
+    Args:
+        epic_id (str): Jira epic key
+
+    Returns:
+        tuple: (latest ticket update seen, time of the last full sync), or (None, None)
+    """
+    try:
+        row = get_db_connection().execute(
+            'SELECT last_updated, full_synced_at FROM jira_epic_syncs WHERE epic_id = ?',
+            (epic_id,)
+        ).fetchone()
+        if row is None:
+            return None, None
+        return from_db_time(row['last_updated']), from_db_time(row['full_synced_at'])
+    except Exception as e:
+        logger.error(f"Error getting Jira sync state: {str(e)}")
+        return None, None
+
+def set_epic_sync(epic_id, last_updated, full_synced_at):
+    """
+    Store the sync state of an epic.
+
+    Args:
+        epic_id (str): Jira epic key
+        last_updated (datetime): Latest ticket update seen, or None
+        full_synced_at (datetime): Time of the last full sync
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        with transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO jira_epic_syncs (epic_id, last_updated, full_synced_at) VALUES (?, ?, ?)',
+                (
+                    epic_id,
+                    to_db_time(last_updated) if last_updated else None,
+                    to_db_time(full_synced_at) if full_synced_at else None
+                )
+            )
+        return True
+    except Exception as e:
+        logger.error(f"Error saving Jira sync state: {str(e)}")
+        return False
@@ -1,17 +1,31 @@
 """
 Jira API client for connecting to Jira and fetching data.
+
+The jira package is imported when the client is first created, so touching
+src.jira_integration does not load it.
 """
 import os
-from jira import JIRA
+from src.clients.registry import get_shared_client
+from src.clients.resilience import HTTP_MAX_RETRIES
+
+# Seconds before a single Jira request is abandoned
+JIRA_TIMEOUT_SECONDS = float(os.environ.get("JIRA_TIMEOUT_SECONDS", "30"))
+
+def _create_jira_client():
+    from jira import JIRA
+    # The client's resilient session backs off exponentially and honors Retry-After
+    return JIRA(
+        server=os.environ["JIRA_SERVER"],
+        basic_auth=(os.environ["JIRA_USER"], os.environ["JIRA_API_TOKEN"]),
+        max_retries=HTTP_MAX_RETRIES,
+        timeout=JIRA_TIMEOUT_SECONDS
+    )
 
 def get_jira_client():
     """
-    Create and return a configured Jira client.
+    Get the shared, logged-in Jira client.
     
     Returns:
         JIRA: Configured Jira client
     """
-    return JIRA(
-        server=os.environ["JIRA_SERVER"],
-        basic_auth=(os.environ["JIRA_USER"], os.environ["JIRA_API_TOKEN"])
-    )
\ No newline at end of file
+    return get_shared_client("jira", _create_jira_client)
@@ -2,55 +2,180 @@
 Functions for fetching and processing Jira tickets.
 """
 from src.jira_integration.client import get_jira_client
+from src.jira_integration.topics import extract_ranked_topics, MAX_EPIC_TOPICS
+from src.clients.registry import get_circuit_breaker
+from src.database.tickets import save_tickets, get_cached_tickets, get_epic_sync, set_epic_sync
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Issue fields requested from Jira; "updated" drives the incremental sync
+TICKET_FIELDS = "summary,description,status,labels,updated"
+
+# Issues requested per page and epics synced at once
+JIRA_PAGE_SIZE = int(os.environ.get("JIRA_PAGE_SIZE", "100"))
+JIRA_SYNC_CONCURRENCY = int(os.environ.get("JIRA_SYNC_CONCURRENCY", "4"))
+
+# Incremental syncs look back this far past the last update seen, since JQL
+# dates are minute-precision and in the Jira user's time zone
+JIRA_SYNC_OVERLAP_HOURS = 24
+
+# Days between full syncs, which also drop tickets removed from an epic
+JIRA_FULL_SYNC_DAYS = int(os.environ.get("JIRA_FULL_SYNC_DAYS", "7"))
+
+# Timestamp format of Jira issue fields
+JIRA_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+def build_epic_jql(epic_id, updated_since=None):
+    """
+    Build the JQL query selecting the issues of an epic.
+
+    Args:
+        epic_id (str): Jira epic key
+        updated_since (datetime): Only select issues updated after this time (optional)
+
+    Returns:
+        str: JQL query ordered by issue key
+    """
+    jql_query = f'(parent = {epic_id} OR "Epic Link" = {epic_id})'
+    if updated_since is not None:
+        jql_query += f' AND updated >= "{updated_since.strftime("%Y/%m/%d %H:%M")}"'
+    return jql_query + ' ORDER BY key'
+
+def issue_to_ticket(issue):
+    """
+    Convert a raw Jira search result issue into a ticket dictionary.
+
+    Args:
+        issue (dict): Issue from a JSON search result
+
+    Returns:
+        dict: Ticket with key, summary, description, status, labels and updated
+    """
+    fields = issue["fields"]
+    updated = fields.get("updated")
+    return {
+        "key": issue["key"],
+        "summary": fields.get("summary"),
+        "description": fields.get("description"),
+        "status": (fields.get("status") or {}).get("name"),
+        "labels": fields.get("labels") or [],
+        "updated": datetime.strptime(updated, JIRA_TIME_FORMAT).astimezone(timezone.utc) if updated else None
+    }
+
+def fetch_epic_tickets(epic_id, updated_since=None):
+    """
+    Fetch the tickets of an epic from Jira, page by page.
+
+    Only the fields the bot uses are requested, and results are read as plain
+    JSON instead of being wrapped in issue resources.
+
+    Args:
+        epic_id (str): Jira epic key
+        updated_since (datetime): Only fetch issues updated after this time (optional)
+
+    Returns:
+        list: List of ticket dictionaries
+    """
+    jira = get_jira_client()
+    jql_query = build_epic_jql(epic_id, updated_since)
+
+    tickets = []
+    start_at = 0
+    with get_circuit_breaker("jira"):
+        while True:
+            page = jira.search_issues(
+                jql_query,
+                startAt=start_at,
+                maxResults=JIRA_PAGE_SIZE,
+                fields=TICKET_FIELDS,
+                json_result=True
+            )
+            issues = page.get("issues", [])
+            tickets.extend(issue_to_ticket(issue) for issue in issues)
+            start_at += len(issues)
+            if not issues or start_at >= page.get("total", 0):
+                break
+    return tickets
+
+def sync_epic(epic_id):
+    """
+    Bring the local cache of an epic's tickets up to date.
+
+    The first sync, and one every JIRA_FULL_SYNC_DAYS, reads the whole epic;
+    other syncs only fetch issues updated since the last update seen.
+
+    Args:
+        epic_id (str): Jira epic key
+
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        now = datetime.now(timezone.utc)
+        last_updated, full_synced_at = get_epic_sync(epic_id)
+        full = full_synced_at is None or now - full_synced_at >= timedelta(days=JIRA_FULL_SYNC_DAYS)
+
+        updated_since = None
+        if not full and last_updated is not None:
+            updated_since = last_updated - timedelta(hours=JIRA_SYNC_OVERLAP_HOURS)
+        tickets = fetch_epic_tickets(epic_id, updated_since)
+
+        if not save_tickets(epic_id, tickets, replace=full):
+            return False
+
+        updates = [ticket["updated"] for ticket in tickets if ticket["updated"]]
+        if updates:
+            last_updated = max([last_updated, *updates]) if last_updated else max(updates)
+        set_epic_sync(epic_id, last_updated, now if full else full_synced_at)
+
+        logger.info(f"Synced {len(tickets)} tickets for epic {epic_id} ({'full' if full else 'incremental'})")
+        return True
+    except Exception as e:
+        logger.error(f"Error syncing epic {epic_id}: {str(e)}")
+        return False
+
+def sync_epics(epic_ids):
+    """
+    Sync several epics in parallel.
+
+    Args:
+        epic_ids (list): Jira epic keys
+
+    Returns:
+        dict: Mapping of epic key to whether its sync succeeded
+    """
+    with ThreadPoolExecutor(max_workers=JIRA_SYNC_CONCURRENCY, thread_name_prefix="jira-sync") as executor:
+        return dict(zip(epic_ids, executor.map(sync_epic, epic_ids)))
 
 def get_tickets_from_epic(epic_id):
     """
     Fetch all tickets belonging to a specific Jira epic.
     
+    The local cache is refreshed incrementally first, so repeated calls
+    only transfer the tickets that changed.
+    
     Args:
         epic_id (str): The ID of the Jira epic
         
     Returns:
         list: List of ticket dictionaries with relevant information
     """
-    jira = get_jira_client()
-    
-    # JQL query to get all issues in the epic
-    jql_query = f'parent = {epic_id} OR "Epic Link" = {epic_id}'
-    issues = jira.search_issues(jql_query)
-    
-    # Extract relevant information
-    tickets = []
-    for issue in issues:
-        tickets.append({
-            "key": issue.key,
-            "summary": issue.fields.summary,
-            "description": issue.fields.description,
-            "status": issue.fields.status.name,
-            "labels": issue.fields.labels
-        })
-    
-    return tickets
+    sync_epic(epic_id)
+    return get_cached_tickets(epic_id)
 
-def extract_topics_from_tickets(tickets):
+def extract_topics_from_tickets(tickets, max_topics=MAX_EPIC_TOPICS):
     """
     Extract potential research topics from ticket information.
     
     Args:
         tickets (list): List of ticket dictionaries
+        max_topics (int): Maximum number of topics to return
         
     Returns:
-        list: List of extracted topics
+        list: List of extracted topics, most relevant first
     """
-    # Extract keywords from ticket summaries and descriptions
-    topics = set()
-    for ticket in tickets:
-        # Add labels as topics
-        topics.update(ticket.get("labels", []))
-        
-        # Extract key terms from summary
-        if ticket.get("summary"):
-            summary_words = ticket["summary"].lower().split()
-            topics.update([word for word in summary_words if len(word) > 5])
-        
-    return list(topics)
\ No newline at end of file
+    return [topic for topic, _ in extract_ranked_topics(tickets, max_topics)]
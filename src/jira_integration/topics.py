@@ -0,0 +1,161 @@
+"""
+Ranked research topic extraction from Jira tickets.
+
+Candidate topics are word n-grams that do not cross punctuation or
+stopwords. Their TF-IDF weights are computed for the whole epic at once from
+flat (ticket, phrase, count) arrays, then summed per phrase, so a phrase ranks
+high when it is frequent in the tickets that mention it and specific to them.
+"""
+import os
+import re
+import numpy as np
+from src.arxiv_integration.ranker import STOPWORDS
+from src.arxiv_integration.parser import normalize_topic
+
+# Number of topics kept for an epic; every topic adds a clause to the arXiv query
+MAX_EPIC_TOPICS = int(os.environ.get("MAX_EPIC_TOPICS", "8"))
+
+# Topics scoring below this fraction of the best topic are dropped
+MIN_TOPIC_SCORE = 0.2
+
+# Longest phrase considered, in words
+MAX_NGRAM = 3
+
+# Summaries and labels say more about an epic's topic than descriptions
+SUMMARY_WEIGHT = 2.0
+LABEL_WEIGHT = 3.0
+
+# Words common in tickets but meaningless as research topics
+TICKET_STOPWORDS = STOPWORDS | frozenset("""
+able add added adding also all any be been bug but check create do does done each fix fixed
+get have if implement implementation improve investigate issue like look make may more need
+needs new not now only other please remove see set should so some support task test
+tests todo update updated use used when which will work would
+""".split())
+
+SEGMENT_BREAK = re.compile(r"[.,;:!?()\[\]{}\"'|/\\\n]+")
+WORD_PATTERN = re.compile(r"[a-z][a-z0-9\-]*[a-z0-9]|[a-z]")
+
+def iter_phrases(text):
+    """
+    Yield the candidate n-grams of a text.
+
+    Phrases never span punctuation or stopwords, so "training of large models"
+    yields "training" and "large models" but not "training large".
+
+    Args:
+        text (str): Ticket text
+
+    Yields:
+        str: Lower-cased phrase of one to MAX_NGRAM words
+    """
+    for segment in SEGMENT_BREAK.split(text.lower()):
+        run = []
+        for word in WORD_PATTERN.findall(segment) + [None]:
+            if word is not None and word not in TICKET_STOPWORDS and len(word) > 1:
+                run.append(word)
+                continue
+            for n in range(1, MAX_NGRAM + 1):
+                for start in range(len(run) - n + 1):
+                    yield " ".join(run[start:start + n])
+            run = []
+
+def _ticket_texts(ticket):
+    """Yield (text, weight) pairs of the fields of a ticket."""
+    if ticket.get("summary"):
+        yield ticket["summary"], SUMMARY_WEIGHT
+    if isinstance(ticket.get("description"), str):
+        yield ticket["description"], 1.0
+    for label in ticket.get("labels") or []:
+        # Labels are single tokens like "diffusion-models"
+        yield label.replace("-", " ").replace("_", " "), LABEL_WEIGHT
+
+def score_topics(tickets):
+    """
+    Score every candidate phrase of an epic with summed TF-IDF.
+
+    Args:
+        tickets (list): Ticket dictionaries
+
+    Returns:
+        dict: Mapping of phrase to score
+    """
+    vocabulary = {}
+    rows, columns, counts = [], [], []
+    for row, ticket in enumerate(tickets):
+        for text, weight in _ticket_texts(ticket):
+            for phrase in iter_phrases(text):
+                rows.append(row)
+                columns.append(vocabulary.setdefault(phrase, len(vocabulary)))
+                counts.append(weight)
+    if not vocabulary:
+        return {}
+
+    rows = np.array(rows)
+    columns = np.array(columns)
+    counts = np.array(counts)
+
+    # Collapse repeated (ticket, phrase) pairs into one entry
+    pair_ids, inverse = np.unique(rows * len(vocabulary) + columns, return_inverse=True)
+    tf = np.bincount(inverse, weights=counts)
+    pair_rows = pair_ids // len(vocabulary)
+    pair_columns = pair_ids % len(vocabulary)
+
+    # Smoothed IDF keeps phrases found in every ticket, the epic's theme, above zero
+    doc_count = len(tickets)
+    df = np.bincount(pair_columns, minlength=len(vocabulary))
+    idf = np.log((1 + doc_count) / (1 + df)) + 1
+
+    # Sublinear TF, L2-normalized per ticket so long descriptions do not dominate
+    weights = (1 + np.log(tf)) * idf[pair_columns]
+    norms = np.sqrt(np.bincount(pair_rows, weights=weights ** 2, minlength=doc_count))
+    weights /= norms[pair_rows]
+
+    # Multi-word phrases are more specific topics, but must recur to count
+    lengths = np.array([phrase.count(" ") + 1 for phrase in vocabulary])
+    scores = np.bincount(pair_columns, weights=weights, minlength=len(vocabulary)) * np.sqrt(lengths)
+    if doc_count > 1:
+        scores[(lengths > 1) & (df < 2)] = 0
+
+    phrases = list(vocabulary)
+    return {phrases[i]: float(scores[i]) for i in np.flatnonzero(scores > 0)}
+
+def extract_ranked_topics(tickets, max_topics=MAX_EPIC_TOPICS, min_score=MIN_TOPIC_SCORE):
+    """
+    Extract the top research topics of an epic with their scores.
+
+    Topics that duplicate a better one after normalization, are part of or
+    contain a better topic, or share a two-word phrase with one, are dropped.
+
+    Args:
+        tickets (list): Ticket dictionaries
+        max_topics (int): Maximum number of topics to return
+        min_score (float): Minimum score as a fraction of the best score
+
+    Returns:
+        list: (topic, score) tuples, best first, scores relative to the best topic
+    """
+    scores = score_topics(tickets)
+    if not scores:
+        return []
+
+    best = max(scores.values())
+    selected = []
+    seen_words = set()
+    seen_unigrams = set()
+    seen_bigrams = set()
+    for phrase, score in sorted(scores.items(), key=lambda item: (-item[1], item[0])):
+        if score < best * min_score or len(selected) >= max_topics:
+            break
+        words = normalize_topic(phrase).split()
+        bigrams = set(zip(words, words[1:]))
+        if len(words) == 1 and words[0] in seen_words:
+            continue
+        if bigrams & seen_bigrams or seen_unigrams.intersection(words):
+            continue
+        selected.append((" ".join(words), round(score / best, 3)))
+        seen_words.update(words)
+        seen_bigrams.update(bigrams)
+        if len(words) == 1:
+            seen_unigrams.add(words[0])
+    return selected
@@ -1,21 +1,57 @@
 """
 Client for interacting with NVIDIA NIMs LLM services.
+
+The openai SDK takes about a second to import, so it is only imported when
+the first client is created.
 """
 import os
-from openai import OpenAI
+from src.clients.registry import get_shared_client
+from src.clients.resilience import HTTP_MAX_RETRIES
+
+LLM_BASE_URL = os.environ.get("LLM_BASE_URL", "https://integrate.api.nvidia.com/v1")
+
+# Seconds before a single LLM request is abandoned
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "120"))
+
+def _create_llm_client():
+    from openai import OpenAI
+    api_key = os.environ.get("NVIDIA_API_KEY", "")
+    
+    # The SDK retries with exponential backoff and honors Retry-After
+    return OpenAI(
+        base_url=LLM_BASE_URL,
+        api_key=api_key,
+        max_retries=HTTP_MAX_RETRIES,
+        timeout=LLM_TIMEOUT_SECONDS
+    )
 
 def get_llm_client():
     """
-    Configure and return the NVIDIA NIMs client using OpenAI-compatible interface.
+    Get the shared NVIDIA NIMs client using OpenAI-compatible interface.
+    
+    The client and its keep-alive connection pool are created once per process.
     
     Returns:
         OpenAI: Configured NVIDIA NIMs client
     """
+    return get_shared_client("llm", _create_llm_client)
+
+def get_async_llm_client():
+    """
+    Configure and return an async NVIDIA NIMs client for the asyncio pipeline.
+    
+    The client's connection pool is bound to the event loop it is first used
+    on, so the asyncio engine creates one and keeps it for its lifetime.
+    
+    Returns:
+        AsyncOpenAI: Configured async NVIDIA NIMs client
+    """
+    from openai import AsyncOpenAI
     api_key = os.environ.get("NVIDIA_API_KEY", "")
     
-    client = OpenAI(
-        base_url="https://integrate.api.nvidia.com/v1",
-        api_key=api_key
+    return AsyncOpenAI(
+        base_url=LLM_BASE_URL,
+        api_key=api_key,
+        max_retries=HTTP_MAX_RETRIES,
+        timeout=LLM_TIMEOUT_SECONDS
     )
-    
-    return client
\ No newline at end of file
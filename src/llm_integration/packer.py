@@ -0,0 +1,145 @@
+"""
+Token-budgeted packing of papers into summarization requests.
+
+Abstracts are cleaned of LaTeX and whitespace noise, then trimmed at sentence
+boundaries to a share of the digest's input budget that depends on the
+paper's relevance rank. The trimmed papers are packed greedily into as few
+requests as the per-request input and output budgets allow.
+"""
+from typing import List, Dict
+import os
+import re
+import math
+
+# Rough characters per token for English text in Llama tokenizers
+CHARS_PER_TOKEN = 4
+
+# Input tokens spent on abstracts across one digest, and per single request
+DIGEST_INPUT_TOKEN_BUDGET = int(os.environ.get("DIGEST_INPUT_TOKEN_BUDGET", "4000"))
+REQUEST_INPUT_TOKEN_BUDGET = int(os.environ.get("REQUEST_INPUT_TOKEN_BUDGET", "2000"))
+
+# Bounds on the abstract share of a single paper
+MIN_ABSTRACT_TOKENS = 60
+MAX_ABSTRACT_TOKENS = 350
+
+# Tokens per paper for the "Paper N:" and "Title:" lines
+PAPER_OVERHEAD_TOKENS = 8
+
+LATEX_ESCAPE = re.compile(r"\\([%&_#$])")
+LATEX_DROPPED = re.compile(r"\\(?:cite[a-z]*|ref|eqref|label|footnote|url)\{[^{}]*\}")
+LATEX_WRAPPER = re.compile(r"\\[a-zA-Z]+\*?(?:\[[^\]]*\])?\{([^{}]*)\}")
+LATEX_COMMAND = re.compile(r"\\([a-zA-Z]+)")
+WHITESPACE = re.compile(r"\s+")
+SENTENCE_END = re.compile(r"[.!?](?=\s)")
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a text without calling a tokenizer.
+    """
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def normalize_abstract(text: str) -> str:
+    """
+    Strip LaTeX markup and collapse whitespace in an arXiv abstract.
+
+    Citations and references are dropped, formatting commands keep their
+    argument (\\textbf{x} becomes x) and bare commands keep their name
+    (\\alpha becomes alpha).
+    """
+    text = LATEX_ESCAPE.sub(r"\1", text)
+    text = LATEX_DROPPED.sub("", text)
+    # Unwrap nested commands from the inside out
+    previous = None
+    while previous != text:
+        previous = text
+        text = LATEX_WRAPPER.sub(r"\1", text)
+    text = LATEX_COMMAND.sub(r"\1", text)
+    text = text.replace("$", "").replace("{", "").replace("}", "").replace("~", " ")
+    return WHITESPACE.sub(" ", text).strip()
+
+def truncate_to_tokens(text: str, budget: int) -> str:
+    """
+    Trim text to a token budget, preferring to end at a sentence boundary.
+    """
+    if estimate_tokens(text) <= budget:
+        return text
+
+    limit = budget * CHARS_PER_TOKEN
+    cut = text[:limit]
+    sentence_ends = [match.end() for match in SENTENCE_END.finditer(cut + " ")]
+    if sentence_ends and sentence_ends[-1] >= limit // 2:
+        return cut[:sentence_ends[-1]]
+    return cut.rsplit(" ", 1)[0] + "..."
+
+def allocate_abstract_budgets(lengths: List[int], ranks: List[int], total_budget: int) -> List[int]:
+    """
+    Split the abstract budget between papers according to their rank.
+
+    Each paper's share is proportional to 1/sqrt(rank + 1). Abstracts shorter
+    than their share keep their full length and the surplus is shared out
+    again among the rest.
+
+    Args:
+        lengths: Estimated token length of each normalized abstract
+        ranks: Relevance rank of each paper, 0 being the best
+        total_budget: Tokens available for all abstracts
+
+    Returns:
+        list: Token budget for each abstract
+    """
+    weights = [1 / math.sqrt(rank + 1) for rank in ranks]
+    budgets = [0] * len(lengths)
+    remaining = set(range(len(lengths)))
+    budget_left = total_budget
+
+    while remaining:
+        weight_sum = sum(weights[i] for i in remaining)
+        fitting = [i for i in remaining if lengths[i] <= budget_left * weights[i] / weight_sum]
+        if not fitting:
+            for i in remaining:
+                budgets[i] = int(budget_left * weights[i] / weight_sum)
+            break
+        for i in fitting:
+            budgets[i] = lengths[i]
+            budget_left -= lengths[i]
+            remaining.remove(i)
+
+    return [
+        min(lengths[i], MAX_ABSTRACT_TOKENS, max(budget, MIN_ABSTRACT_TOKENS))
+        for i, budget in enumerate(budgets)
+    ]
+
+def pack_summary_requests(papers: List[Dict], ranks: List[int], max_papers: int) -> List[List[Dict]]:
+    """
+    Compact abstracts and pack papers into summarization requests.
+
+    Args:
+        papers: Papers to summarize, in rank order
+        ranks: Relevance rank of each paper within its digest
+        max_papers: Most papers a single request may hold, set by the output budget
+
+    Returns:
+        list: Requests, each a list of paper copies with a "prompt_abstract" key
+    """
+    abstracts = [normalize_abstract(paper["abstract"]) for paper in papers]
+    budgets = allocate_abstract_budgets(
+        [estimate_tokens(abstract) for abstract in abstracts],
+        ranks,
+        DIGEST_INPUT_TOKEN_BUDGET
+    )
+
+    requests = []
+    current = []
+    current_tokens = 0
+    for paper, abstract, budget in zip(papers, abstracts, budgets):
+        compact = truncate_to_tokens(abstract, budget)
+        tokens = estimate_tokens(paper["title"]) + estimate_tokens(compact) + PAPER_OVERHEAD_TOKENS
+        if current and (len(current) >= max_papers or current_tokens + tokens > REQUEST_INPUT_TOKEN_BUDGET):
+            requests.append(current)
+            current = []
+            current_tokens = 0
+        current.append({**paper, "prompt_abstract": compact})
+        current_tokens += tokens
+    if current:
+        requests.append(current)
+    return requests
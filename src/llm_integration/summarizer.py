@@ -1,63 +1,440 @@
 """
 Module for summarizing research papers using NVIDIA NIMs.
 """
-from typing import List, Dict
+from typing import List, Dict, Iterator, Union
+import os
+import json
+import time
+import queue
+import asyncio
+import hashlib
 import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from src.llm_integration.client import get_llm_client
+from src.llm_integration.packer import pack_summary_requests, estimate_tokens
+from src.clients.registry import get_circuit_breaker
+from src.metrics.pipeline import record_llm_request, record_llm_error
+from src.database.summaries import get_cached_summaries, save_summaries, evict_summaries
 
 logger = logging.getLogger(__name__)
 
-def summarize_papers(papers: List[Dict], topics: List[str]) -> str:
+_executor = None
+_executor_lock = threading.Lock()
+
+LLM_MODEL = "meta/llama-3.3-70b-instruct"
+
+# Bump whenever the per-paper prompt changes so stale summaries are not reused
+PROMPT_VERSION = "3"
+
+# Maximum number of papers included in a digest
+MAX_DIGEST_PAPERS = 15
+
+# Most papers summarized per LLM request and number of requests in flight at once
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "5"))
+LLM_CONCURRENCY = int(os.environ.get("LLM_CONCURRENCY", "4"))
+
+# Output token budget per request and per paper within it
+LLM_MAX_TOKENS = 1024
+MAX_TOKENS_PER_PAPER = 160
+
+# Ask streamed responses to end with a usage chunk for token accounting
+STREAM_OPTIONS = {"include_usage": True}
+
+# Summary cache eviction limits
+SUMMARY_CACHE_MAX_AGE_DAYS = int(os.environ.get("SUMMARY_CACHE_MAX_AGE_DAYS", "60"))
+SUMMARY_CACHE_MAX_BYTES = int(os.environ.get("SUMMARY_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+def get_summary_executor() -> ThreadPoolExecutor:
     """
-    Generate a formatted summary of research papers with metadata.
+    Get the worker pool shared by all summarization requests.
+
+    Sharing one pool bounds the number of concurrent LLM requests across all
+    jobs running in the process, not just within one digest.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=LLM_CONCURRENCY, thread_name_prefix="summarizer")
+        return _executor
+
+def summary_cache_key(paper: Dict, model: str = LLM_MODEL) -> str:
+    """
+    Build the content-addressed cache key of a paper summary.
+
+    The key changes whenever the abstract, the model or the prompt changes,
+    so a revised paper or a new prompt never reuses an outdated summary.
+    """
+    abstract_hash = hashlib.sha256(paper["abstract"].encode("utf-8")).hexdigest()
+    key_text = f"{paper['arxiv_id']}\n{abstract_hash}\n{model}\n{PROMPT_VERSION}"
+    return hashlib.sha256(key_text.encode("utf-8")).hexdigest()
+
+def parse_paper_summaries(content: str, papers: List[Dict]) -> Dict[str, Dict]:
+    """
+    Parse the per-paper JSON lines returned by the LLM.
+
+    Each line is an object like `{"id": 1, "c": "...", "s": "...", "i": true}`
+    where id is the paper's number in the request; malformed lines are ignored.
+    """
+    summaries = {}
+    for line in content.splitlines():
+        line = line.strip().rstrip(",")
+        if not line.startswith("{"):
+            continue
+        try:
+            item = json.loads(line)
+            index = int(item["id"]) - 1
+            contribution = str(item["c"]).strip()
+            significance = str(item["s"]).strip()
+        except (ValueError, KeyError, TypeError):
+            continue
+        if not 0 <= index < len(papers) or not contribution:
+            continue
+        summaries[papers[index]["arxiv_id"]] = {
+            "contribution": contribution,
+            "significance": significance,
+            "important": item.get("i") is True
+        }
+    return summaries
+
+def drop_truncated_line(content: str, finish_reason) -> str:
+    """
+    Drop the last line of LLM output that was cut by the token limit.
+
+    When the output budget runs out, the final line stops mid-sentence; it is
+    dropped so the paper falls back to a plain link instead.
+    """
+    if finish_reason == "length":
+        logger.warning("LLM output hit the token limit, dropping the last summary line")
+        content = content.rsplit("\n", 1)[0] if "\n" in content else ""
+    return content
+
+def completed_content(response) -> str:
+    """
+    Get the message content of a chat completion without a truncated last line.
+    """
+    choice = response.choices[0]
+    return drop_truncated_line(choice.message.content or "", choice.finish_reason)
+
+def count_tokens(request: Dict, content: str, usage=None):
+    """
+    Get the prompt and completion tokens of a request.
+
+    Servers that report no usage are accounted with estimates.
+
+    Returns:
+        tuple: (prompt tokens, completion tokens)
+    """
+    if usage is not None:
+        return usage.prompt_tokens, usage.completion_tokens
+    prompt = sum(estimate_tokens(message["content"]) for message in request["messages"])
+    return prompt, estimate_tokens(content)
+
+def build_summary_request(papers: List[Dict]) -> Dict:
+    """
+    Build the chat completion arguments for summarizing a batch of papers.
     """
-    client = get_llm_client()
-    topics_text = ", ".join(topics)
-    
-    # Format papers with metadata for LLM input
     formatted_papers = "\n\n".join(
+        f"Paper {i}:\n"
         f"Title: {paper['title']}\n"
-        f"PDF URL: {paper['pdf_url']}\n"
-        f"Abstract: {paper['abstract'][:500]}..."
-        for paper in papers[:15]
+        f"Abstract: {paper.get('prompt_abstract', paper['abstract'])}"
+        for i, paper in enumerate(papers, 1)
     )
 
+    return {
+        "model": LLM_MODEL,
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are a research assistant summarizing arXiv papers. Answer only in the requested format."
+            },
+            {
+                "role": "user",
+                "content": f"""For each paper below, write its key contribution and why it matters, one sentence each.
+
+                Respond with exactly one JSON object per line, one line per paper, and nothing else:
+                {{"id": <paper number>, "c": "<key contribution>", "s": "<why it matters>", "i": <true or false>}}
+
+                - Set "i" to true only for papers that are a significant advance
+                - Do not use markdown, links or emojis
+
+                {formatted_papers}"""
+            }
+        ],
+        "temperature": 0.2,
+        "top_p": 0.7,
+        "max_tokens": min(LLM_MAX_TOKENS, MAX_TOKENS_PER_PAPER * len(papers))
+    }
+
+def generate_paper_summaries(papers: List[Dict]) -> Dict[str, Dict]:
+    """
+    Ask the LLM for the key contribution and significance of each paper.
+    """
+    client = get_llm_client()
+    request = build_summary_request(papers)
+    started = time.monotonic()
     try:
-        response = client.chat.completions.create(
-            model="meta/llama-3.3-70b-instruct",
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "You are a research assistant formatting paper summaries for Slack. Use markdown links and emojis."
-                },
-                {
-                    "role": "user",
-                    "content": f"""Format these papers about {topics_text} into a Slack message:
-                    
-                    {formatted_papers}
-                    
-                    Structure:
-                    :books: *Recent Papers in {topics_text}*
-                    
-                    For each paper:
-                    :page_facing_up: <{{pdf_url}}|{{Title}}> 
-                    :pushpin: _Key Contribution_: [1-sentence summary]
-                    :mag: _Why It Matters_: [1-sentence significance]
-                    
-                    - Use :star: for important papers. 
-                    - Replace {{pdf_url}} with the FULL URL from "PDF URL"
-                    - Replace {{Title}} with EXACT paper title
-                    - URLs MUST start with https://
-                    - Remove any markdown except the <URL|TEXT> format"""
-                }
-            ],
-            temperature=0.2,
-            top_p=0.7,
-            max_tokens=1024
-        )
-        
-        return response.choices[0].message.content
-        
+        with get_circuit_breaker("llm"):
+            response = client.chat.completions.create(**request)
+    except Exception:
+        record_llm_error()
+        raise
+    content = completed_content(response)
+    prompt_tokens, completion_tokens = count_tokens(request, response.choices[0].message.content or "", response.usage)
+    record_llm_request(time.monotonic() - started, prompt_tokens, completion_tokens, mode="blocking")
+    return parse_paper_summaries(content, papers)
+
+def stream_paper_summaries(papers: List[Dict], updates: queue.Queue):
+    """
+    Stream the LLM summaries of a batch, queueing each paper's summary as soon
+    as its line is complete.
+
+    The batch ends with None on the queue, or with the exception that stopped it.
+    """
+    try:
+        client = get_llm_client()
+        request = build_summary_request(papers)
+        started = time.monotonic()
+        ttft = None
+        content = ""
+        usage = None
+        buffer = ""
+        finish_reason = None
+        with get_circuit_breaker("llm"):
+            stream = client.chat.completions.create(**request, stream=True, stream_options=STREAM_OPTIONS)
+            for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta.content or ""
+                if delta and ttft is None:
+                    ttft = time.monotonic() - started
+                content += delta
+                buffer += delta
+                finish_reason = choice.finish_reason or finish_reason
+                while "\n" in buffer:
+                    line, buffer = buffer.split("\n", 1)
+                    summaries = parse_paper_summaries(line, papers)
+                    if summaries:
+                        updates.put(summaries)
+
+        prompt_tokens, completion_tokens = count_tokens(request, content, usage)
+        record_llm_request(time.monotonic() - started, prompt_tokens, completion_tokens, mode="stream", ttft_seconds=ttft)
+
+        # A last line cut by the token limit is dropped, as in completed_content
+        if finish_reason != "length":
+            summaries = parse_paper_summaries(buffer, papers)
+            if summaries:
+                updates.put(summaries)
+        updates.put(None)
     except Exception as e:
-        logger.error(f"Summarization error: {str(e)}")
-        return f"Error generating research summary: {str(e)}"
\ No newline at end of file
+        record_llm_error()
+        updates.put(e)
+
+async def generate_paper_summaries_async(papers: List[Dict], client) -> Dict[str, Dict]:
+    """
+    Async variant of generate_paper_summaries using an AsyncOpenAI client.
+
+    The response is streamed and collected, which costs nothing extra and
+    measures the time to first token of scheduled runs.
+    """
+    request = build_summary_request(papers)
+    started = time.monotonic()
+    ttft = None
+    content = ""
+    usage = None
+    finish_reason = None
+    try:
+        with get_circuit_breaker("llm"):
+            stream = await client.chat.completions.create(**request, stream=True, stream_options=STREAM_OPTIONS)
+            async for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                delta = choice.delta.content or ""
+                if delta and ttft is None:
+                    ttft = time.monotonic() - started
+                content += delta
+                finish_reason = choice.finish_reason or finish_reason
+    except Exception:
+        record_llm_error()
+        raise
+    prompt_tokens, completion_tokens = count_tokens(request, content, usage)
+    record_llm_request(time.monotonic() - started, prompt_tokens, completion_tokens, mode="stream", ttft_seconds=ttft)
+    return parse_paper_summaries(drop_truncated_line(content, finish_reason), papers)
+
+def split_summary_batches(papers: List[Dict], new_papers: List[Dict]) -> List[List[Dict]]:
+    """
+    Pack the papers still to summarize into token-budgeted LLM requests.
+
+    Abstract budgets follow each paper's rank in the whole digest, and a
+    request never holds more papers than its output budget can answer.
+    """
+    ranks = {paper["arxiv_id"]: rank for rank, paper in enumerate(papers)}
+    max_papers = max(1, min(SUMMARY_BATCH_SIZE, LLM_MAX_TOKENS // MAX_TOKENS_PER_PAPER))
+    return pack_summary_requests(
+        new_papers,
+        [ranks[paper["arxiv_id"]] for paper in new_papers],
+        max_papers
+    )
+
+def lookup_cached_summaries(papers: List[Dict]):
+    """
+    Split papers into those with a cached summary and those still to summarize.
+
+    Returns:
+        tuple: (cache keys by arXiv id, cached summaries by arXiv id, papers to summarize)
+    """
+    keys = {paper["arxiv_id"]: summary_cache_key(paper) for paper in papers}
+    cached = get_cached_summaries(list(keys.values()))
+    summaries = {
+        arxiv_id: cached[key]
+        for arxiv_id, key in keys.items()
+        if key in cached
+    }
+
+    new_papers = [paper for paper in papers if paper["arxiv_id"] not in summaries]
+    logger.info(f"Summary cache hits: {len(summaries)}, papers to summarize: {len(new_papers)}")
+    return keys, summaries, new_papers
+
+def store_generated_summaries(keys: Dict[str, str], generated: Dict[str, Dict]):
+    """
+    Save freshly generated summaries in the cache and enforce its limits.
+    """
+    if not generated:
+        return
+    save_summaries([
+        (keys[arxiv_id], arxiv_id, LLM_MODEL, summary)
+        for arxiv_id, summary in generated.items()
+    ])
+    evict_summaries(SUMMARY_CACHE_MAX_AGE_DAYS, SUMMARY_CACHE_MAX_BYTES)
+
+def summarize_papers(papers: List[Dict], stream: bool = False) -> Union[Dict[str, Dict], Iterator[Dict[str, Dict]]]:
+    """
+    Summarize the key contribution and significance of research papers.
+
+    Per-paper summaries are cached across configurations and runs, so only
+    papers that have not been summarized before are sent to the LLM. Those are
+    packed into token-budgeted batches summarized in parallel on the shared
+    worker pool. Presentation is left to the Slack views.
+
+    With stream=True, an iterator of progressively completed summaries is
+    returned instead; see stream_summarize_papers.
+
+    Returns:
+        dict: Summaries by arXiv id; papers the LLM failed on are missing
+
+    Raises:
+        Exception: The first summarization error, if no paper could be summarized
+    """
+    if stream:
+        return stream_summarize_papers(papers)
+
+    papers = papers[:MAX_DIGEST_PAPERS]
+    keys, summaries, new_papers = lookup_cached_summaries(papers)
+
+    if new_papers:
+        executor = get_summary_executor()
+        futures = [
+            executor.submit(contextvars.copy_context().run, generate_paper_summaries, batch)
+            for batch in split_summary_batches(papers, new_papers)
+        ]
+
+        generated = {}
+        errors = []
+        for future in futures:
+            try:
+                generated.update(future.result())
+            except Exception as e:
+                logger.error(f"Summarization error: {str(e)}")
+                errors.append(e)
+
+        if not generated and not summaries and errors:
+            raise errors[0]
+
+        summaries.update(generated)
+        store_generated_summaries(keys, generated)
+
+    return summaries
+
+def stream_summarize_papers(papers: List[Dict]) -> Iterator[Dict[str, Dict]]:
+    """
+    Summarize papers progressively as the LLM streams its output.
+
+    The cached summaries are yielded before any LLM call. A new snapshot of
+    all summaries so far follows each time a paper's line completes, and the
+    last one yielded is final.
+    """
+    papers = papers[:MAX_DIGEST_PAPERS]
+    keys, summaries, new_papers = lookup_cached_summaries(papers)
+    yield dict(summaries)
+
+    if not new_papers:
+        return
+
+    updates = queue.Queue()
+    executor = get_summary_executor()
+    batches = split_summary_batches(papers, new_papers)
+    for batch in batches:
+        # Each batch carries the caller's context, so its tokens count towards the run
+        executor.submit(contextvars.copy_context().run, stream_paper_summaries, batch, updates)
+
+    generated = {}
+    errors = []
+    pending = len(batches)
+    while pending:
+        update = updates.get()
+        if update is None:
+            pending -= 1
+        elif isinstance(update, Exception):
+            logger.error(f"Summarization error: {str(update)}")
+            errors.append(update)
+            pending -= 1
+        else:
+            generated.update(update)
+            summaries.update(update)
+            yield dict(summaries)
+
+    store_generated_summaries(keys, generated)
+    if not summaries and errors:
+        raise errors[0]
+
+async def summarize_papers_async(papers: List[Dict], client, limit: asyncio.Semaphore) -> Dict[str, Dict]:
+    """
+    Async variant of summarize_papers for the asyncio pipeline.
+
+    Batches run concurrently on the event loop, bounded by the given semaphore
+    instead of the shared thread pool; cache access runs in worker threads.
+    """
+    papers = papers[:MAX_DIGEST_PAPERS]
+    keys, summaries, new_papers = await asyncio.to_thread(lookup_cached_summaries, papers)
+
+    if new_papers:
+        async def run_batch(batch):
+            async with limit:
+                return await generate_paper_summaries_async(batch, client)
+
+        results = await asyncio.gather(
+            *(run_batch(batch) for batch in split_summary_batches(papers, new_papers)),
+            return_exceptions=True
+        )
+
+        generated = {}
+        errors = []
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Summarization error: {str(result)}")
+                errors.append(result)
+            else:
+                generated.update(result)
+
+        if not generated and not summaries and errors:
+            raise errors[0]
+
+        summaries.update(generated)
+        await asyncio.to_thread(store_generated_summaries, keys, generated)
+
+    return summaries
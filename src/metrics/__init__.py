@@ -0,0 +1,3 @@
+"""
+Pipeline metrics: Prometheus collectors, per-run stats and the metrics endpoint.
+"""
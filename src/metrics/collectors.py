@@ -0,0 +1,153 @@
+"""
+Minimal Prometheus collectors and text exposition.
+
+Only counters and histograms are needed by the bot, so they are implemented
+here rather than adding a client library dependency. Every collector
+registers itself on creation and render_metrics() writes all of them in the
+Prometheus text format (version 0.0.4).
+"""
+import math
+import threading
+
+# Default histogram buckets in seconds, from fast Slack calls to slow waves
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_collectors = []
+_collectors_lock = threading.Lock()
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + "}"
+
+class _Collector:
+    """
+    Base class of labelled collectors.
+    """
+
+    type_name = None
+
+    def __init__(self, name, documentation, labels=()):
+        """
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labels (tuple): Label names
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _collectors_lock:
+            _collectors.append(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}"
+        ]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_samples(items))
+        return lines
+
+class Counter(_Collector):
+    """
+    Monotonically increasing count, e.g. tokens or rate limit hits.
+    """
+
+    type_name = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        # Unlabelled series are exported from the start, as 0
+        if not self.labels:
+            self._values[()] = 0
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _render_samples(self, items):
+        return [f"{self.name}_total{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+class Histogram(_Collector):
+    """
+    Distribution of observed values, e.g. latencies in seconds.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            name (str): Metric name
+            documentation (str): Help text
+            labels (tuple): Label names
+            buckets (tuple): Upper bounds of the buckets, ascending
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        if not self.labels:
+            self._values[()] = ([0] * len(self.buckets), 0.0)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+            return counts[-1]
+
+    def _render_samples(self, items):
+        lines = []
+        for key, (counts, total) in items:
+            for bound, count in zip(self.buckets, counts):
+                bucket_labels = _format_labels(self.labels, key, [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {counts[-1]}")
+        return lines
+
+def render_metrics():
+    """
+    Render every registered collector in the Prometheus text format.
+
+    Returns:
+        str: Exposition text
+    """
+    with _collectors_lock:
+        collectors = list(_collectors)
+    lines = []
+    for collector in collectors:
+        lines.extend(collector.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,252 @@
+"""
+Instrumentation of the research update pipeline.
+
+Each stage reports through the record_* functions below. They update the
+process-wide Prometheus collectors and, when called inside track_run(), the
+statistics of the current run, which are saved to the run_stats table when
+the run ends. The current run is held in a context variable, so it follows
+the run into asyncio tasks, asyncio.to_thread calls and executor jobs
+submitted with contextvars.copy_context().
+"""
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager, asynccontextmanager
+from datetime import datetime, timezone
+from src.metrics.collectors import Counter, Histogram
+from src.database.papers import to_db_time
+from src.database.run_stats import save_run_stats
+
+logger = logging.getLogger(__name__)
+
+FAST_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+RUNS = Counter("research_bot_runs", "Research update runs by trigger and outcome", ("trigger", "status"))
+RUN_SECONDS = Histogram("research_bot_run_seconds", "Duration of research update runs", ("trigger",))
+QUEUE_DELAY_SECONDS = Histogram(
+    "research_bot_queue_delay_seconds", "Time runs waited between being queued and starting", ("queue",)
+)
+FETCH_SECONDS = Histogram("research_bot_fetch_seconds", "Time runs waited for their arXiv papers")
+PAPERS = Counter("research_bot_papers", "Papers seen by runs per pipeline stage", ("stage",))
+LLM_REQUEST_SECONDS = Histogram("research_bot_llm_request_seconds", "Duration of LLM requests", ("mode",))
+LLM_TTFT_SECONDS = Histogram("research_bot_llm_ttft_seconds", "Time to the first streamed LLM token", (), FAST_BUCKETS)
+LLM_TOKENS = Counter("research_bot_llm_tokens", "LLM tokens by kind", ("kind",))
+LLM_ERRORS = Counter("research_bot_llm_errors", "Failed LLM requests")
+SLACK_CALL_SECONDS = Histogram("research_bot_slack_call_seconds", "Duration of Slack API calls", ("method",), FAST_BUCKETS)
+SLACK_RATE_LIMITED = Counter("research_bot_slack_rate_limited", "Slack API calls answered with HTTP 429", ("method",))
+
+_current_run = contextvars.ContextVar("current_run", default=None)
+
+class RunStats:
+    """
+    Statistics of one research update run, safe to update from several threads.
+    """
+
+    COUNTERS = (
+        "papers_fetched", "papers_new", "papers_ranked", "llm_requests", "prompt_tokens",
+        "completion_tokens", "slack_calls", "slack_rate_limited"
+    )
+    DURATIONS = ("fetch_seconds", "llm_seconds", "slack_seconds")
+
+    def __init__(self, config, trigger, queue_delay_seconds=None):
+        """
+        Args:
+            config (dict): The configuration being run
+            trigger (str): "scheduled", "interactive" or "prepare"
+            queue_delay_seconds (float): Time the run waited before starting (optional)
+        """
+        self.config_id = config.get('id')
+        self.channel = config.get('channel')
+        self.trigger = trigger
+        self.queue_delay_seconds = queue_delay_seconds
+        self.status = "ok"
+        self.error = None
+        self.ttft_seconds = None
+        self.started_at = datetime.now(timezone.utc)
+        self.total_seconds = None
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        for name in self.COUNTERS:
+            setattr(self, name, 0)
+        for name in self.DURATIONS:
+            setattr(self, name, 0.0)
+
+    def add(self, **amounts):
+        with self._lock:
+            for name, amount in amounts.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def set_first_token(self, seconds):
+        with self._lock:
+            if self.ttft_seconds is None:
+                self.ttft_seconds = seconds
+
+    def to_row(self):
+        """
+        Get the statistics as a run_stats row.
+
+        Returns:
+            dict: Column values
+        """
+        row = {name: getattr(self, name) for name in self.COUNTERS + self.DURATIONS}
+        row.update({
+            "config_id": self.config_id,
+            "channel": self.channel,
+            "trigger": self.trigger,
+            "status": self.status,
+            "error": self.error,
+            "started_at": to_db_time(self.started_at),
+            "total_seconds": self.total_seconds,
+            "queue_delay_seconds": self.queue_delay_seconds,
+            "ttft_seconds": self.ttft_seconds
+        })
+        return row
+
+def current_run():
+    """
+    Get the statistics of the run the caller belongs to.
+
+    Returns:
+        RunStats: Current run, or None outside of track_run()
+    """
+    return _current_run.get()
+
+def _start_run(config, trigger, queued_at):
+    queue_delay = None
+    if queued_at is not None:
+        queue_delay = max(0.0, time.monotonic() - queued_at)
+        QUEUE_DELAY_SECONDS.observe(queue_delay, queue=trigger)
+    return RunStats(config, trigger, queue_delay)
+
+def _finish_run(stats, error=None):
+    if error is not None:
+        stats.status = "error"
+        stats.error = stats.error or str(error)
+    stats.total_seconds = time.monotonic() - stats._started
+    RUNS.inc(trigger=stats.trigger, status=stats.status)
+    RUN_SECONDS.observe(stats.total_seconds, trigger=stats.trigger)
+    logger.info(
+        f"Run stats for configuration {stats.config_id}: {stats.status} in {stats.total_seconds:.2f}s, "
+        f"fetch {stats.fetch_seconds:.2f}s, LLM {stats.llm_seconds:.2f}s "
+        f"({stats.prompt_tokens}+{stats.completion_tokens} tokens), "
+        f"Slack {stats.slack_seconds:.2f}s ({stats.slack_rate_limited} rate limited)"
+    )
+    return stats.to_row()
+
+@contextmanager
+def track_run(config, trigger, queued_at=None):
+    """
+    Collect the statistics of a research update run.
+
+    The block should set status to "empty" or "error" (and error) when the
+    run did not post a digest. Statistics are saved when the block exits.
+
+    Args:
+        config (dict): The configuration being run
+        trigger (str): "scheduled", "interactive" or "prepare"
+        queued_at (float): time.monotonic() when the run was queued (optional)
+
+    Yields:
+        RunStats: Statistics of the run
+    """
+    stats = _start_run(config, trigger, queued_at)
+    token = _current_run.set(stats)
+    error = None
+    try:
+        yield stats
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_run.reset(token)
+        save_run_stats(_finish_run(stats, error))
+
+@asynccontextmanager
+async def track_run_async(config, trigger, queued_at=None):
+    """
+    Async variant of track_run for coroutines on the engine's event loop.
+
+    The statistics are saved from a worker thread so the loop never waits
+    for the database write lock.
+    """
+    stats = _start_run(config, trigger, queued_at)
+    token = _current_run.set(stats)
+    error = None
+    try:
+        yield stats
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_run.reset(token)
+        await asyncio.to_thread(save_run_stats, _finish_run(stats, error))
+
+def record_fetch(seconds, papers):
+    """
+    Record a run's wait for its arXiv papers.
+    """
+    FETCH_SECONDS.observe(seconds)
+    PAPERS.inc(papers, stage="fetched")
+    stats = current_run()
+    if stats:
+        stats.add(fetch_seconds=seconds, papers_fetched=papers)
+
+def record_papers(stage, count):
+    """
+    Record the papers left after a filtering stage ("new" or "ranked").
+    """
+    PAPERS.inc(count, stage=stage)
+    stats = current_run()
+    if stats:
+        stats.add(**{f"papers_{stage}": count})
+
+def record_llm_request(seconds, prompt_tokens, completion_tokens, mode, ttft_seconds=None):
+    """
+    Record a completed LLM request.
+
+    Args:
+        seconds (float): Duration of the request
+        prompt_tokens (int): Input tokens
+        completion_tokens (int): Output tokens
+        mode (str): "stream" or "blocking"
+        ttft_seconds (float): Time to the first token of a streamed request (optional)
+    """
+    LLM_REQUEST_SECONDS.observe(seconds, mode=mode)
+    LLM_TOKENS.inc(prompt_tokens, kind="prompt")
+    LLM_TOKENS.inc(completion_tokens, kind="completion")
+    if ttft_seconds is not None:
+        LLM_TTFT_SECONDS.observe(ttft_seconds)
+    stats = current_run()
+    if stats:
+        stats.add(
+            llm_requests=1, llm_seconds=seconds,
+            prompt_tokens=prompt_tokens, completion_tokens=completion_tokens
+        )
+        if ttft_seconds is not None:
+            stats.set_first_token(ttft_seconds)
+
+def record_llm_error():
+    """
+    Record a failed LLM request.
+    """
+    LLM_ERRORS.inc()
+
+def record_slack_call(method, seconds):
+    """
+    Record a Slack API call, including any retries it needed.
+    """
+    SLACK_CALL_SECONDS.observe(seconds, method=method)
+    stats = current_run()
+    if stats:
+        stats.add(slack_calls=1, slack_seconds=seconds)
+
+def record_slack_rate_limit(method):
+    """
+    Record a Slack API response with HTTP status 429.
+    """
+    SLACK_RATE_LIMITED.inc(method=method)
+    stats = current_run()
+    if stats:
+        stats.add(slack_rate_limited=1)
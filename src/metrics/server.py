@@ -0,0 +1,55 @@
+"""
+Local HTTP endpoint serving the metrics in the Prometheus text format.
+"""
+import os
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.metrics.collectors import render_metrics
+
+logger = logging.getLogger(__name__)
+
+# Address of the metrics endpoint; METRICS_PORT=0 disables it
+METRICS_HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "9108"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the bot's log
+        pass
+
+def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    """
+    Serve /metrics from a background thread.
+
+    Args:
+        host (str): Interface to listen on
+        port (int): Port to listen on, 0 to disable the endpoint
+
+    Returns:
+        ThreadingHTTPServer: Running server, or None if disabled or the port is taken
+    """
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.error(f"Error starting metrics endpoint on {host}:{port}: {str(e)}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+    return server
@@ -0,0 +1,132 @@
+"""
+Runtime context shared by the Slack handlers and the scheduled jobs.
+
+main.py creates the context once at startup. Handlers receive it through the
+Bolt context and jobs look it up with get_runtime, so every modal submission
+and every job run reuses the same scheduler, clients and worker pools.
+
+Creating the context only opens the database and the Slack client. The
+scheduler, the asyncio engine and the LLM client pull in the research
+pipeline and its SDKs, so they are created on first use or by warm_up(),
+which main.py calls once Socket Mode is connected.
+"""
+import threading
+import logging
+from src.database.connection import init_db, get_db_connection, transaction
+from src.slack_app.client import get_slack_client
+from src.scheduler.job_queue import get_job_queue
+from src.metrics.server import start_metrics_server, METRICS_PORT
+
+logger = logging.getLogger(__name__)
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+class RuntimeContext:
+    """
+    Long-lived services of the bot process.
+
+    Attributes:
+        scheduler: The job scheduler, created on first use
+        slack_client: Slack WebClient
+        llm_client: NVIDIA NIMs client, created on first use
+        job_queue: Queue for interactive runs
+        engine: Asyncio engine for scheduled runs, started on first use
+        metrics_server: Prometheus metrics endpoint, or None if disabled
+        schedule_jobs: Whether configurations are scheduled on this process's
+            scheduler; False when separate workers run the scheduled updates
+    """
+
+    def __init__(self, slack_client, job_queue, metrics_server=None):
+        self.slack_client = slack_client
+        self.job_queue = job_queue
+        self.metrics_server = metrics_server
+        self.schedule_jobs = True
+        self._scheduler = None
+        self._llm_client = None
+        self._engine = None
+        self._lock = threading.Lock()
+
+    @property
+    def scheduler(self):
+        with self._lock:
+            if self._scheduler is None:
+                from src.scheduler.jobs import initialize_scheduler
+                self._scheduler = initialize_scheduler()
+            return self._scheduler
+
+    @property
+    def llm_client(self):
+        with self._lock:
+            if self._llm_client is None:
+                from src.llm_integration.client import get_llm_client
+                self._llm_client = get_llm_client()
+            return self._llm_client
+
+    @property
+    def engine(self):
+        with self._lock:
+            if self._engine is None:
+                from src.scheduler.async_jobs import get_async_engine
+                self._engine = get_async_engine()
+            return self._engine
+
+    def warm_up(self):
+        """
+        Create the scheduler, engine and LLM client ahead of the first job.
+        """
+        self.scheduler
+        self.engine
+        self.llm_client
+        logger.info("Runtime services started")
+
+    def db(self):
+        """
+        Get the calling thread's pooled database connection.
+
+        Returns:
+            sqlite3.Connection: Connection to the bot database
+        """
+        return get_db_connection()
+
+    def transaction(self):
+        """
+        Open a write transaction on the calling thread's connection.
+        """
+        return transaction()
+
+    def shutdown(self):
+        """
+        Stop the scheduler, worker pools and metrics endpoint that were started.
+        """
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+        self.job_queue.stop()
+        if self._engine is not None:
+            self._engine.stop()
+        if self.metrics_server is not None:
+            self.metrics_server.shutdown()
+            self.metrics_server.server_close()
+
+def get_runtime(metrics_port=None):
+    """
+    Get the process-wide runtime context, creating it on first use.
+
+    Args:
+        metrics_port (int): Port of the metrics endpoint, 0 to disable it;
+            defaults to METRICS_PORT and only applies when the context is created
+
+    Returns:
+        RuntimeContext: Shared runtime context
+    """
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            init_db()
+            _runtime = RuntimeContext(
+                slack_client=get_slack_client(),
+                job_queue=get_job_queue(),
+                metrics_server=start_metrics_server(port=METRICS_PORT if metrics_port is None else metrics_port)
+            )
+            logger.info("Runtime context created")
+        return _runtime
@@ -0,0 +1,380 @@
+"""
+Asyncio execution engine for research update jobs.
+
+All scheduled digests run as coroutines on one event loop owned by a single
+background thread. Each pipeline stage has its own concurrency limit, so
+hundreds of digests can be in flight while only the blocking arXiv fetches
+and database calls borrow worker threads.
+
+Scheduled digests run in two phases: a prepare run ahead of delivery time
+fetches, ranks and summarizes, checkpointing each stage in the database, and
+the delivery run renders and posts whatever the checkpoint holds, running
+any stage the prepare run did not complete.
+"""
+import os
+import time
+import asyncio
+import threading
+import logging
+from src.arxiv_integration.ranker import rank_papers
+from src.arxiv_integration.coordinator import get_config_topics
+from src.llm_integration.client import get_async_llm_client
+from src.llm_integration.summarizer import summarize_papers_async, LLM_CONCURRENCY, MAX_DIGEST_PAPERS
+from src.slack_app.views import create_research_update_blocks
+from src.slack_app.async_client import create_async_slack_client
+from src.database.connection import transaction
+from src.database.ledger import filter_undelivered, record_deliveries
+from src.database.checkpoints import get_checkpoint, save_checkpoint
+from src.scheduler.jobs import fetch_coordinator, parse_time_range
+from src.metrics.pipeline import track_run_async, record_fetch, record_papers
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-stage concurrency limits; the LLM limit is shared with the summarizer
+FETCH_CONCURRENCY = int(os.environ.get("FETCH_CONCURRENCY", "8"))
+SLACK_CONCURRENCY = int(os.environ.get("SLACK_CONCURRENCY", "10"))
+
+_engine = None
+_engine_lock = threading.Lock()
+
+class AsyncResearchEngine:
+    """
+    Runs research update pipelines on a dedicated asyncio event loop.
+    """
+
+    def __init__(self, slack_token=None, fetch_concurrency=FETCH_CONCURRENCY,
+                 llm_concurrency=LLM_CONCURRENCY, slack_concurrency=SLACK_CONCURRENCY):
+        """
+        Args:
+            slack_token (str): Slack bot token (optional, read from the environment)
+            fetch_concurrency (int): Maximum arXiv fetches in flight
+            llm_concurrency (int): Maximum LLM requests in flight
+            slack_concurrency (int): Maximum Slack API calls in flight
+        """
+        self.slack_token = slack_token or os.environ.get("SLACK_BOT_TOKEN")
+        self.fetch_concurrency = fetch_concurrency
+        self.llm_concurrency = llm_concurrency
+        self.slack_concurrency = slack_concurrency
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        # Prepare runs and checkpointed deliveries in flight, keyed by (config ID, delivery time)
+        self._preparing = {}
+        self._delivering = set()
+
+    def start(self):
+        """
+        Start the event loop thread and create the async clients on it.
+        """
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run_loop, name="research-engine", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.fetch_limit = asyncio.Semaphore(self.fetch_concurrency)
+        self.llm_limit = asyncio.Semaphore(self.llm_concurrency)
+        self.slack_limit = asyncio.Semaphore(self.slack_concurrency)
+        self.llm_client = get_async_llm_client()
+        # The Slack connection pool must be created on the running loop
+        self.slack_client = self.loop.run_until_complete(self._create_slack_client())
+        self._ready.set()
+        self.loop.run_forever()
+
+    async def _create_slack_client(self):
+        return create_async_slack_client(self.slack_token)
+
+    def stop(self):
+        """
+        Stop the event loop thread.
+        """
+        if self.loop is not None:
+            # Release the Slack connection pool before the loop goes away
+            asyncio.run_coroutine_threadsafe(self.slack_client.session.close(), self.loop).result()
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def submit(self, config, scheduled=True, queued_at=None, delivery_at=None):
+        """
+        Schedule a research update on the engine's event loop.
+
+        Args:
+            config (dict): The configuration for the job
+            scheduled (bool): Whether to coalesce the arXiv fetch with the rest of the wave
+            queued_at (float): time.monotonic() when the run was queued (optional)
+            delivery_at (str): Delivery time keying the run's checkpoint (optional)
+
+        Returns:
+            concurrent.futures.Future: Future resolved when the update has been posted
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(
+            self.run_research_update(config, scheduled, queued_at, delivery_at), self.loop
+        )
+
+    async def run_many(self, configs, scheduled=True):
+        """
+        Run research updates for many configurations concurrently.
+
+        Args:
+            configs (list): Configurations to run
+            scheduled (bool): Whether to coalesce the arXiv fetches
+        """
+        queued_at = time.monotonic()
+        await asyncio.gather(*(self.run_research_update(config, scheduled, queued_at) for config in configs))
+
+    async def post_message(self, **kwargs):
+        async with self.slack_limit:
+            return await self.slack_client.chat_postMessage(**kwargs)
+
+    def prepare(self, config, delivery_at, queued_at=None):
+        """
+        Schedule the prepare run of a scheduled digest on the engine's event loop.
+
+        Args:
+            config (dict): The configuration for the job
+            delivery_at (str): Delivery time of the digest, as a UTC database timestamp
+            queued_at (float): time.monotonic() when the run was queued (optional)
+
+        Returns:
+            concurrent.futures.Future: Future resolved when the digest is summarized
+        """
+        self.start()
+        return asyncio.run_coroutine_threadsafe(
+            self.prepare_research_update(config, delivery_at, queued_at), self.loop
+        )
+
+    async def load_checkpoint(self, config, delivery_at):
+        """
+        Load the checkpoint of a scheduled digest.
+
+        Args:
+            config (dict): The configuration for the job
+            delivery_at (str): Delivery time of the digest, or None for runs
+                that are not checkpointed
+
+        Returns:
+            dict: Checkpoint, with stage None if no stage has completed yet
+        """
+        checkpoint = None
+        if delivery_at is not None:
+            checkpoint = await asyncio.to_thread(get_checkpoint, config['id'], delivery_at)
+        return checkpoint or {"stage": None, "papers": None, "summaries": None}
+
+    async def advance(self, config, checkpoint, delivery_at, scheduled=True):
+        """
+        Run the stages a digest has not completed yet, up to its summaries.
+
+        The output of every stage is checkpointed before the next one starts,
+        so an interrupted run picks up after its last completed stage.
+
+        Args:
+            config (dict): The configuration for the job
+            checkpoint (dict): Checkpoint from load_checkpoint
+            delivery_at (str): Delivery time of the digest, or None to run
+                without checkpoints
+            scheduled (bool): Whether to coalesce the arXiv fetch with the rest of the wave
+
+        Returns:
+            dict: Checkpoint at the "summarized" stage or later
+        """
+        topics = get_config_topics(config)
+        checkpoint = dict(checkpoint)
+
+        async def complete(stage, papers, summaries=None):
+            checkpoint.update(stage=stage, papers=papers, summaries=summaries)
+            if delivery_at is not None:
+                await asyncio.to_thread(save_checkpoint, config['id'], delivery_at, stage, papers, summaries)
+
+        if checkpoint['stage'] is not None:
+            logger.info(f"Resuming research update for configuration {config['id']} after stage {checkpoint['stage']}")
+
+        if checkpoint['stage'] is None:
+            time_range = parse_time_range(config)
+
+            # The fetch coordinator blocks while it coalesces, so it runs in a worker thread
+            fetch_started = time.monotonic()
+            async with self.fetch_limit:
+                papers = await asyncio.to_thread(
+                    fetch_coordinator.get_papers, topics, time_range, scheduled
+                )
+            record_fetch(time.monotonic() - fetch_started, len(papers))
+
+            # Skip papers this channel has already received from this config
+            papers = await asyncio.to_thread(
+                filter_undelivered, config['id'], config['channel'], papers
+            )
+            record_papers("new", len(papers))
+            await complete("fetched", papers)
+
+        if checkpoint['stage'] == "fetched":
+            # Keep only the most relevant papers for the LLM
+            papers = rank_papers(checkpoint['papers'], topics, MAX_DIGEST_PAPERS)
+            record_papers("ranked", len(papers))
+            await complete("ranked", papers)
+
+        if checkpoint['stage'] == "ranked":
+            papers = checkpoint['papers']
+            summaries = {}
+            if papers:
+                summaries = await summarize_papers_async(papers, self.llm_client, self.llm_limit)
+            await complete("summarized", papers, summaries)
+
+        return checkpoint
+
+    async def prepare_research_update(self, config, delivery_at, queued_at=None):
+        """
+        Fetch, rank and summarize a scheduled digest ahead of its delivery.
+
+        Nothing is posted; failures are logged and left for the delivery run
+        to retry from the last completed stage. A prepare run already in
+        flight for the same delivery is joined instead of repeated.
+
+        Args:
+            config (dict): The configuration for the job
+            delivery_at (str): Delivery time of the digest, as a UTC database timestamp
+            queued_at (float): time.monotonic() when the run was queued (optional)
+        """
+        key = (config['id'], delivery_at)
+        if key not in self._preparing:
+            task = asyncio.ensure_future(self._run_prepare(config, delivery_at, queued_at))
+            self._preparing[key] = task
+            task.add_done_callback(lambda _: self._preparing.pop(key, None))
+        await asyncio.shield(self._preparing[key])
+
+    async def _run_prepare(self, config, delivery_at, queued_at):
+        checkpoint = await self.load_checkpoint(config, delivery_at)
+        if checkpoint['stage'] in ("summarized", "posted"):
+            return
+        async with track_run_async(config, "prepare", queued_at) as stats:
+            topics = get_config_topics(config)
+            try:
+                logger.info(f"Preparing research update due {delivery_at} for topics: {', '.join(topics)}")
+                checkpoint = await self.advance(config, checkpoint, delivery_at)
+                if not checkpoint['papers']:
+                    stats.status = "empty"
+            except Exception as e:
+                logger.error(f"Error preparing research update for topics {', '.join(topics)}: {str(e)}")
+                stats.status = "error"
+                stats.error = str(e)
+
+    async def run_research_update(self, config, scheduled=True, queued_at=None, delivery_at=None):
+        """
+        Execute a research update job on the event loop.
+
+        Scheduled deliveries start from the checkpoint their prepare run left,
+        so usually only rendering and posting are left to do.
+
+        Args:
+            config (dict): The configuration for the job
+            scheduled (bool): Whether to coalesce the arXiv fetch with the rest of the wave
+            queued_at (float): time.monotonic() when the run was queued (optional)
+            delivery_at (str): Delivery time keying the run's checkpoint (optional,
+                runs without one are not checkpointed)
+        """
+        key = (config['id'], delivery_at)
+        if delivery_at is not None:
+            if key in self._delivering:
+                logger.info(f"Research update due {delivery_at} for configuration {config['id']} is already running")
+                return
+            self._delivering.add(key)
+        try:
+            # A prepare run still in flight is joined rather than repeated
+            if key in self._preparing:
+                await asyncio.shield(self._preparing[key])
+            checkpoint = await self.load_checkpoint(config, delivery_at)
+            if checkpoint['stage'] == "posted":
+                logger.info(f"Research update due {delivery_at} for configuration {config['id']} was already posted")
+                return
+            await self._deliver(config, checkpoint, scheduled, queued_at, delivery_at)
+        finally:
+            self._delivering.discard(key)
+
+    async def _deliver(self, config, checkpoint, scheduled, queued_at, delivery_at):
+        async with track_run_async(config, "scheduled" if scheduled else "interactive", queued_at) as stats:
+            topics = get_config_topics(config)
+            try:
+                logger.info(f"Running research update for topics: {', '.join(topics)}")
+
+                prepared = checkpoint['stage'] is not None
+                checkpoint = await self.advance(config, checkpoint, delivery_at, scheduled)
+                papers = checkpoint['papers']
+                if prepared and papers:
+                    # Leave out papers delivered since the digest was prepared
+                    papers = await asyncio.to_thread(
+                        filter_undelivered, config['id'], config['channel'], papers
+                    )
+
+                if not papers:
+                    logger.info(f"No relevant papers found for topics: {', '.join(topics)}")
+                    stats.status = "empty"
+                    await self.post_message(
+                        channel=config['channel'],
+                        text=f"No new research papers found for topics: {', '.join(topics)} in the past {parse_time_range(config)} days."
+                    )
+                    await asyncio.to_thread(record_posted, config, delivery_at, [], {})
+                    return
+
+                summaries = checkpoint['summaries']
+                blocks = create_research_update_blocks(summaries, config, papers)
+                await self.post_message(
+                    channel=config['channel'],
+                    text="Research Update",
+                    blocks=blocks
+                )
+                await asyncio.to_thread(record_posted, config, delivery_at, papers, summaries)
+
+                logger.info(f"Successfully posted research update for topics: {', '.join(topics)}")
+
+            except Exception as e:
+                logger.error(f"Error in research update job for topics {', '.join(topics)}: {str(e)}")
+                stats.status = "error"
+                stats.error = str(e)
+
+                try:
+                    await self.post_message(
+                        channel=config['channel'],
+                        text=f"Error generating research update: {str(e)}"
+                    )
+                except Exception as inner_e:
+                    logger.error(f"Failed to send error message to Slack: {str(inner_e)}")
+
+def record_posted(config, delivery_at, papers, summaries):
+    """
+    Record a posted digest's papers as delivered and checkpoint the run as posted.
+
+    Args:
+        config (dict): The configuration for the job
+        delivery_at (str): Delivery time of the digest, or None if not checkpointed
+        papers (list): Papers in the digest
+        summaries (dict): Paper summaries by arXiv ID
+    """
+    with transaction():
+        record_deliveries(
+            config['id'],
+            config['channel'],
+            [paper['arxiv_id'] for paper in papers[:MAX_DIGEST_PAPERS]]
+        )
+        if delivery_at is not None:
+            save_checkpoint(config['id'], delivery_at, "posted", papers, summaries)
+
+def get_async_engine():
+    """
+    Get the process-wide asyncio engine, starting it on first use.
+
+    Returns:
+        AsyncResearchEngine: Running engine
+    """
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncResearchEngine()
+            _engine.start()
+        return _engine
@@ -0,0 +1,123 @@
+"""
+Job queue for work triggered from Slack.
+
+Slash commands and button clicks only enqueue a job and return, so Bolt's
+listener threads are never held by a long pipeline run. Jobs run in
+submission order on a small dedicated worker pool, apart from the scheduled
+runs, which go to the asyncio engine. Test updates therefore only queue
+behind other test updates, and their arXiv pages are fetched ahead of those
+of scheduled batches.
+"""
+import os
+import queue
+import threading
+import logging
+from concurrent.futures import Future
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Jobs running at once
+JOB_QUEUE_WORKERS = int(os.environ.get("JOB_QUEUE_WORKERS", "2"))
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+class JobQueue:
+    """
+    Thread-backed FIFO queue of jobs.
+    """
+
+    def __init__(self, workers=JOB_QUEUE_WORKERS):
+        """
+        Args:
+            workers (int): Number of worker threads
+        """
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+        self._unfinished = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start the worker threads.
+        """
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-queue-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """
+        Stop the workers once the jobs already queued have run.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Queue a job.
+
+        Args:
+            func (callable): Job to run
+            *args, **kwargs: Arguments passed to the job
+
+        Returns:
+            concurrent.futures.Future: Future resolved with the job's result
+        """
+        self.start()
+        future = Future()
+        with self._lock:
+            self._unfinished += 1
+        self._queue.put((future, func, args, kwargs))
+        return future
+
+    def jobs_ahead(self):
+        """
+        Count the jobs a newly submitted job waits behind.
+
+        Returns:
+            int: Number of jobs still queued or running
+        """
+        with self._lock:
+            return self._unfinished
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+
+            future, func, args, kwargs = job
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(func(*args, **kwargs))
+                except Exception as e:
+                    logger.error(f"Error in queued job {getattr(func, '__name__', func)}: {str(e)}")
+                    future.set_exception(e)
+            finally:
+                with self._lock:
+                    self._unfinished -= 1
+
+def get_job_queue():
+    """
+    Get the process-wide job queue, starting it on first use.
+
+    Returns:
+        JobQueue: Running job queue
+    """
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+            _job_queue.start()
+        return _job_queue
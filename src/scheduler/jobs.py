@@ -2,149 +2,420 @@
 Job scheduling and execution functions.
 """
 from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-from src.arxiv_integration.client import search_arxiv_papers
-from src.llm_integration.summarizer import summarize_papers
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from src.arxiv_integration.ranker import rank_papers
+from src.arxiv_integration.coordinator import FetchCoordinator, get_config_topics
+from src.llm_integration.summarizer import summarize_papers, MAX_DIGEST_PAPERS
 from src.slack_app.views import create_research_update_blocks
-from src.database.models import get_all_configs
+from src.database.connection import DB_PATH
+from src.database.ledger import filter_undelivered, record_deliveries
+from src.database.models import (
+    get_config, get_configs_for_frequency, get_configs_updated_since, get_db_time, get_state, set_state,
+    iter_config_pages
+)
+from src.database.papers import to_db_time, from_db_time
+from src.database.checkpoints import get_unfinished_checkpoints
+from src.metrics.pipeline import track_run, record_fetch, record_papers
+from src.scheduler.triggers import (
+    build_trigger, build_prepare_trigger, get_next_run_time, get_last_run_time, get_due_frequencies,
+    PREPARE_LEAD_MINUTES
+)
+from apscheduler.jobstores.base import JobLookupError
+import os
+import time
 import logging
-from datetime import datetime, timezone, timedelta
+import threading
+from datetime import datetime, timedelta, timezone
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds after its scheduled time a missed run is still replayed on startup
+MISFIRE_GRACE_SECONDS = int(os.environ.get("MISFIRE_GRACE_SECONDS", "3600"))
+
+# App state key holding the time jobs were last synced with the configurations
+JOBS_SYNCED_AT_KEY = "scheduler_jobs_synced_at"
+
+# App state key holding the prepare lead time the jobs were scheduled with
+PREPARE_LEAD_KEY = "scheduler_prepare_lead_minutes"
+
+# Minimum seconds between edits of a digest that is still streaming in;
+# chat.update allows about one call per second per channel
+DIGEST_UPDATE_INTERVAL_SECONDS = float(os.environ.get("DIGEST_UPDATE_INTERVAL_SECONDS", "1.5"))
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_due_configs():
+    """
+    Get the configurations whose scheduled job fires in the current window.
+    
+    Workers replace this with the configurations of their own shard.
+    
+    Returns:
+        list: Configurations of the frequencies due at the current delivery,
+            in the schedule's timezone
+    """
+    return [
+        config
+        for frequency in get_due_frequencies(MISFIRE_GRACE_SECONDS)
+        for config in iter_config_pages(get_configs_for_frequency, frequency)
+    ]
+
+# Shared by all jobs so that runs firing together share arXiv queries and the paper store
+fetch_coordinator = FetchCoordinator(due_configs=get_due_configs)
+
 def initialize_scheduler():
     """
     Initialize and start the job scheduler.
     
+    Jobs are persisted in the bot's database, so they survive restarts and
+    runs missed while the bot was down are replayed once within the misfire
+    grace period. The scheduler is shared by the whole process, since two
+    schedulers on the same job store would run every job twice.
+    
     Returns:
         BackgroundScheduler: Initialized scheduler
     """
-    scheduler = BackgroundScheduler()
-    scheduler.start()
-    return scheduler
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = BackgroundScheduler(
+                jobstores={"default": SQLAlchemyJobStore(url=f"sqlite:///{DB_PATH}")},
+                job_defaults={
+                    "coalesce": True,
+                    "misfire_grace_time": MISFIRE_GRACE_SECONDS,
+                    "max_instances": 1
+                }
+            )
+            _scheduler.start()
+        return _scheduler
 
-def load_existing_jobs(scheduler, app):
+def load_existing_jobs(scheduler):
     """
-    Load and schedule jobs for all existing configurations.
+    Schedule jobs for configurations created or changed since the last boot.
+    
+    Unchanged configurations already have their jobs in the persistent job
+    store, so startup cost grows with the number of changes, not of configs.
+    Every job is rescheduled when the prepare lead time has changed.
     
     Args:
         scheduler: The job scheduler
-        app: Slack app instance
     """
-    configs = get_all_configs()
+    synced_at = get_db_time()
+    since = get_state(JOBS_SYNCED_AT_KEY)
+    if get_state(PREPARE_LEAD_KEY) != str(PREPARE_LEAD_MINUTES):
+        since = None
+    configs = get_configs_updated_since(since)
     for config in configs:
-        setup_scheduled_job(config, scheduler, app)
+        setup_scheduled_job(config, scheduler)
+    set_state(JOBS_SYNCED_AT_KEY, synced_at)
+    set_state(PREPARE_LEAD_KEY, str(PREPARE_LEAD_MINUTES))
+    
+    logger.info(f"Registered {len(configs)} new or changed scheduled jobs")
 
-def setup_scheduled_job(config, scheduler=None, app=None):
+def setup_scheduled_job(config, scheduler):
     """
     Set up a scheduled job for a research update configuration.
     
     Args:
         config (dict): The configuration for the job
-        scheduler: The job scheduler (optional)
-        app: Slack app instance (optional)
+        scheduler: The shared job scheduler from the runtime context
     """
-    if scheduler is None:
-        scheduler = initialize_scheduler()
-    
-    # Remove any existing job for this config
     job_id = f"research_update_{config['id']}"
-    if scheduler.get_job(job_id):
-        scheduler.remove_job(job_id)
     
     # Set up cron schedule
-    if config['frequency'] == 'daily':
-        trigger = CronTrigger(hour=9, minute=0)  # Run at 9:00 AM daily
-    else:  # weekly
-        trigger = CronTrigger(day_of_week='mon', hour=9, minute=0)  # Monday at 9:00 AM
+    trigger = build_trigger(config)
     
-    # Add the job to the scheduler
+    # Add the job to the scheduler, replacing any existing job for this config.
+    # Only the config ID is persisted; the current config is loaded at run time.
     scheduler.add_job(
-        run_research_update,
+        enqueue_research_update,
         trigger=trigger,
         id=job_id,
-        args=[config, app],
+        args=[config['id']],
         replace_existing=True
     )
     
+    # Fetch, rank and summarize ahead of delivery, so the delivery only posts
+    prepare_job_id = f"prepare_research_update_{config['id']}"
+    if PREPARE_LEAD_MINUTES > 0:
+        scheduler.add_job(
+            enqueue_research_prepare,
+            trigger=build_prepare_trigger(config),
+            id=prepare_job_id,
+            args=[config['id']],
+            replace_existing=True
+        )
+    else:
+        _remove_job(scheduler, prepare_job_id)
+    
     # Format topics for logging
     all_topics = [config["topic"]] + config.get("additional_topics", [])
     topics_text = ", ".join(all_topics)
     
     logger.info(f"Scheduled job {job_id} - {config['frequency']} updates for topics: {topics_text}")
 
-def run_research_update(config, app_or_client):
+def _remove_job(scheduler, job_id):
+    try:
+        scheduler.remove_job(job_id)
+    except JobLookupError:
+        pass
+
+def remove_scheduled_jobs(config_id, scheduler):
     """
-    Execute a research update job.
+    Remove the delivery and prepare jobs of a configuration.
     
     Args:
-        config (dict): The configuration for the job
-        app_or_client: Slack app instance or WebClient
+        config_id (int): ID of the configuration
+        scheduler: The shared job scheduler from the runtime context
     """
-    try:
-        # Handle both app object and direct client object
-        if hasattr(app_or_client, 'client'):
-            client = app_or_client.client
-        else:
-            client = app_or_client
-            
-        # Gather all topics
-        topics = [config['topic']]
-        if config.get('additional_topics'):
-            topics.extend(config['additional_topics'])
-            
-        logger.info(f"Running research update for topics: {', '.join(topics)}")
-        
-        # Convert time_range to int if it's a string
-        time_range = config['time_range']
-        if isinstance(time_range, str):
-            try:
-                time_range = int(time_range)
-            except ValueError:
-                raise ValueError(f"Invalid time_range value: {time_range}")
+    _remove_job(scheduler, f"research_update_{config_id}")
+    _remove_job(scheduler, f"prepare_research_update_{config_id}")
+
+def parse_time_range(config):
+    """
+    Get the lookback period of a configuration as an integer number of days.
+    
+    Args:
+        config (dict): The configuration for the job
         
-        # Ensure time_range is valid
-        if not isinstance(time_range, int):
+    Returns:
+        int: Number of days to look back
+    """
+    # Convert time_range to int if it's a string
+    time_range = config['time_range']
+    if isinstance(time_range, str):
+        try:
+            time_range = int(time_range)
+        except ValueError:
             raise ValueError(f"Invalid time_range value: {time_range}")
+    
+    # Ensure time_range is valid
+    if not isinstance(time_range, int):
+        raise ValueError(f"Invalid time_range value: {time_range}")
+    return time_range
 
-        # Compute start date for search
-        start_date = datetime.now(timezone.utc) - timedelta(days=time_range)
-        
-        # Search for relevant papers
-        papers = search_arxiv_papers(topics, time_range)
-        
-        if not papers:
-            logger.info(f"No relevant papers found for topics: {', '.join(topics)}")
-            client.chat_postMessage(
-                channel=config['channel'],
-                text=f"No new research papers found for topics: {', '.join(topics)} in the past {time_range} days."
-            )
-            return
-        
-        # Generate summary with LLM
-        summary = summarize_papers(papers, topics)
-        
-        # Post to Slack
-        blocks = create_research_update_blocks(summary, config, papers)
-        client.chat_postMessage(
-            channel=config['channel'],
+def _get_scheduled_config(config_id, runtime):
+    config = get_config(config_id)
+    if config is None:
+        # The configuration was deleted, so its jobs are no longer needed
+        logger.info(f"Removing jobs for deleted configuration {config_id}")
+        remove_scheduled_jobs(config_id, runtime.scheduler)
+    return config
+
+def enqueue_research_update(config_id):
+    """
+    Hand a scheduled research update to the asyncio engine.
+    
+    The scheduler thread returns immediately, so the number of digests
+    running at once is no longer capped by the scheduler's thread pool.
+    The run is keyed by its delivery time, so it picks up the checkpoint
+    its prepare run left.
+    
+    Args:
+        config_id (int): ID of the configuration to run
+    """
+    # Imported here because the runtime module depends on this one
+    from src.runtime import get_runtime
+    runtime = get_runtime()
+    
+    config = _get_scheduled_config(config_id, runtime)
+    if config is None:
+        return
+    
+    delivery_time = get_last_run_time(config, MISFIRE_GRACE_SECONDS)
+    delivery_at = to_db_time(delivery_time) if delivery_time else None
+    runtime.engine.submit(config, queued_at=time.monotonic(), delivery_at=delivery_at)
+
+def enqueue_research_prepare(config_id):
+    """
+    Hand the prepare run of a configuration's next delivery to the asyncio engine.
+    
+    Args:
+        config_id (int): ID of the configuration to prepare
+    """
+    from src.runtime import get_runtime
+    runtime = get_runtime()
+    
+    config = _get_scheduled_config(config_id, runtime)
+    if config is None:
+        return
+    
+    delivery_at = to_db_time(get_next_run_time(config))
+    runtime.engine.prepare(config, delivery_at, queued_at=time.monotonic())
+
+def resume_unfinished_runs(engine):
+    """
+    Resume scheduled runs that were interrupted before posting.
+    
+    Runs whose delivery time is still ahead are prepared again from their
+    last completed stage. Runs that were due within the misfire grace period
+    are delivered now; a delivery the scheduler replays at the same time
+    finds the run in flight or posted and is skipped.
+    
+    Args:
+        engine: The asyncio engine from the runtime context
+    
+    Returns:
+        int: Number of resumed runs
+    """
+    now = datetime.now(timezone.utc)
+    checkpoints = get_unfinished_checkpoints(now - timedelta(seconds=MISFIRE_GRACE_SECONDS))
+    resumed = 0
+    for checkpoint in checkpoints:
+        config = get_config(checkpoint['config_id'])
+        if config is None:
+            continue
+        queued_at = time.monotonic()
+        if from_db_time(checkpoint['delivery_at']) > now:
+            engine.prepare(config, checkpoint['delivery_at'], queued_at=queued_at)
+        else:
+            engine.submit(config, queued_at=queued_at, delivery_at=checkpoint['delivery_at'])
+        resumed += 1
+    
+    if resumed:
+        logger.info(f"Resumed {resumed} interrupted research updates")
+    return resumed
+
+def stream_digest_to_slack(client, channel, ts, snapshots, config, papers):
+    """
+    Edit a posted message in place as the paper summaries stream in.
+    
+    Edits are throttled to DIGEST_UPDATE_INTERVAL_SECONDS; the final digest
+    is always written once the stream ends.
+    
+    Args:
+        client: Slack WebClient
+        channel (str): Channel ID of the message
+        ts (str): Timestamp of the message to edit
+        snapshots: Iterator of progressively completed summaries by arXiv id
+        config (dict): The configuration for the job
+        papers (list): Papers included in the digest
+    """
+    posted = None
+    summaries = None
+    last_update = 0
+    for summaries in snapshots:
+        if time.monotonic() - last_update < DIGEST_UPDATE_INTERVAL_SECONDS:
+            continue
+        client.chat_update(
+            channel=channel,
+            ts=ts,
             text="Research Update",
-            blocks=blocks
+            blocks=create_research_update_blocks(summaries, config, papers)
         )
-        
-        logger.info(f"Successfully posted research update for topics: {', '.join(topics)}")
-        
-    except Exception as e:
-        # Log error and notify admin
-        error_msg = f"Error in research update job for topics {', '.join(topics)}: {str(e)}"
-        logger.error(error_msg)
-        
+        posted = summaries
+        last_update = time.monotonic()
+    
+    if summaries is not None and summaries != posted:
+        client.chat_update(
+            channel=channel,
+            ts=ts,
+            text="Research Update",
+            blocks=create_research_update_blocks(summaries, config, papers)
+        )
+
+def run_research_update(config, app_or_client, scheduled=False, stream=True, queued_at=None):
+    """
+    Execute a research update job.
+    
+    Stage timings, paper counts, LLM tokens and Slack calls of the run are
+    recorded in the pipeline metrics and the run_stats table.
+    
+    Args:
+        config (dict): The configuration for the job
+        app_or_client: Slack app instance or WebClient
+        scheduled (bool): Whether the run was fired by the scheduler, in which
+            case the arXiv fetch is coalesced with the other jobs of the wave
+        stream (bool): Whether to post a placeholder right away and fill it in
+            as the summaries stream from the LLM
+        queued_at (float): time.monotonic() when the run was queued (optional)
+    
+    Returns:
+        bool: True if the update, or the notice that nothing new was found, was posted
+    """
+    with track_run(config, "scheduled" if scheduled else "interactive", queued_at) as stats:
+        topics = get_config_topics(config)
+        placeholder = None
         try:
-            client.chat_postMessage(
-                channel=config['channel'],
-                text=f"Error generating research update: {str(e)}"
+            # Handle both app object and direct client object
+            if hasattr(app_or_client, 'client'):
+                client = app_or_client.client
+            else:
+                client = app_or_client
+                
+            logger.info(f"Running research update for topics: {', '.join(topics)}")
+            
+            if stream:
+                placeholder = client.chat_postMessage(
+                    channel=config['channel'],
+                    text=f":hourglass_flowing_sand: Gathering research papers on {', '.join(topics)}..."
+                )
+            
+            time_range = parse_time_range(config)
+            
+            # Search for relevant papers
+            fetch_started = time.monotonic()
+            papers = fetch_coordinator.get_papers(topics, time_range, coalesce=scheduled)
+            record_fetch(time.monotonic() - fetch_started, len(papers))
+            
+            # Skip papers this channel has already received from this config
+            papers = filter_undelivered(config['id'], config['channel'], papers)
+            record_papers("new", len(papers))
+            
+            # Keep only the most relevant papers for the LLM
+            papers = rank_papers(papers, topics, MAX_DIGEST_PAPERS)
+            record_papers("ranked", len(papers))
+            
+            if not papers:
+                logger.info(f"No relevant papers found for topics: {', '.join(topics)}")
+                stats.status = "empty"
+                text = f"No new research papers found for topics: {', '.join(topics)} in the past {time_range} days."
+                if placeholder:
+                    client.chat_update(channel=placeholder['channel'], ts=placeholder['ts'], text=text)
+                else:
+                    client.chat_postMessage(channel=config['channel'], text=text)
+                return True
+            
+            if placeholder:
+                # Fill in the placeholder as paper summaries arrive
+                snapshots = summarize_papers(papers, stream=True)
+                stream_digest_to_slack(client, placeholder['channel'], placeholder['ts'], snapshots, config, papers)
+            else:
+                # Generate summary with LLM
+                summaries = summarize_papers(papers)
+                
+                # Render and post to Slack
+                blocks = create_research_update_blocks(summaries, config, papers)
+                client.chat_postMessage(
+                    channel=config['channel'],
+                    text="Research Update",
+                    blocks=blocks
+                )
+            record_deliveries(
+                config['id'],
+                config['channel'],
+                [paper['arxiv_id'] for paper in papers[:MAX_DIGEST_PAPERS]]
             )
-        except Exception as inner_e:
-            logger.error(f"Failed to send error message to Slack: {str(inner_e)}")
\ No newline at end of file
+            
+            logger.info(f"Successfully posted research update for topics: {', '.join(topics)}")
+            return True
+            
+        except Exception as e:
+            # Log error and notify admin
+            error_msg = f"Error in research update job for topics {', '.join(topics)}: {str(e)}"
+            logger.error(error_msg)
+            stats.status = "error"
+            stats.error = str(e)
+            
+            try:
+                text = f"Error generating research update: {str(e)}"
+                if placeholder:
+                    client.chat_update(channel=placeholder['channel'], ts=placeholder['ts'], text=text, blocks=[])
+                else:
+                    client.chat_postMessage(channel=config['channel'], text=text)
+            except Exception as inner_e:
+                logger.error(f"Failed to send error message to Slack: {str(inner_e)}")
+            return False
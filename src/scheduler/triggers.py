@@ -0,0 +1,144 @@
+"""
+Cron triggers of the scheduled research updates.
+
+Kept apart from the job functions so the Slack handlers and the home tab can
+compute schedules without importing the research pipeline. APScheduler and
+tzlocal are imported when the first trigger is built, since the handlers
+import this module before Socket Mode connects.
+"""
+from datetime import datetime, timedelta
+import functools
+import os
+
+# Time of day digests are delivered
+DELIVERY_HOUR = 9
+DELIVERY_MINUTE = 0
+
+# Minutes before delivery that a digest is fetched, ranked and summarized;
+# 0 runs every stage at delivery time
+PREPARE_LEAD_MINUTES = int(os.environ.get("PREPARE_LEAD_MINUTES", "60"))
+
+# Timezone of the delivery schedule, e.g. "Europe/Berlin"; defaults to the host's
+# local timezone. Due runs are always worked out in this timezone.
+SCHEDULE_TIMEZONE = os.environ.get("SCHEDULE_TIMEZONE") or None
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+FREQUENCIES = ("daily", "weekly")
+
+@functools.lru_cache(maxsize=None)
+def get_schedule_timezone():
+    """
+    Get the timezone of the delivery schedule.
+    
+    Returns:
+        tzinfo: SCHEDULE_TIMEZONE, or the host's local timezone if it is not set
+    """
+    from apscheduler.util import astimezone
+    from tzlocal import get_localzone
+    return astimezone(SCHEDULE_TIMEZONE) or get_localzone()
+
+def _delivery_trigger(config, minutes_before=0):
+    from apscheduler.triggers.cron import CronTrigger
+    timezone = get_schedule_timezone()
+    # Shift the delivery time back, moving weekly digests to the previous day if needed
+    day_offset, minute_of_day = divmod(DELIVERY_HOUR * 60 + DELIVERY_MINUTE - minutes_before, 24 * 60)
+    hour, minute = divmod(minute_of_day, 60)
+    if config['frequency'] == 'daily':
+        return CronTrigger(hour=hour, minute=minute, timezone=timezone)
+    return CronTrigger(day_of_week=WEEKDAYS[day_offset % 7], hour=hour, minute=minute, timezone=timezone)
+
+def build_trigger(config):
+    """
+    Build the cron trigger of a configuration's scheduled job.
+    
+    Args:
+        config (dict): The configuration for the job
+    
+    Returns:
+        CronTrigger: 9:00 AM daily, or Mondays at 9:00 AM for weekly updates
+    """
+    return _delivery_trigger(config)
+
+def build_prepare_trigger(config):
+    """
+    Build the cron trigger of a configuration's prepare job.
+    
+    Args:
+        config (dict): The configuration for the job
+    
+    Returns:
+        CronTrigger: PREPARE_LEAD_MINUTES before each delivery
+    """
+    return _delivery_trigger(config, PREPARE_LEAD_MINUTES)
+
+def get_next_run_time(config):
+    """
+    Get the next time a configuration's scheduled job fires.
+    
+    Computed from the trigger rather than read from the job store, so it
+    costs no database query.
+    
+    Args:
+        config (dict): The configuration for the job
+    
+    Returns:
+        datetime: Timezone-aware time of the next run
+    """
+    trigger = build_trigger(config)
+    return trigger.get_next_fire_time(None, datetime.now(trigger.timezone))
+
+def get_last_fire_time(trigger, within_seconds, now=None):
+    """
+    Get the most recent time a trigger fired.
+    
+    Args:
+        trigger (CronTrigger): The trigger
+        within_seconds (int): How far back to look
+        now (datetime): Current time (optional)
+    
+    Returns:
+        datetime: Timezone-aware fire time, or None if the trigger did not
+            fire within the window
+    """
+    now = now or datetime.now(trigger.timezone)
+    fire_time = trigger.get_next_fire_time(None, now - timedelta(seconds=within_seconds))
+    if fire_time is None or fire_time > now:
+        return None
+    return fire_time
+
+def get_last_run_time(config, within_seconds):
+    """
+    Get the scheduled time of a configuration's most recent delivery.
+    
+    Args:
+        config (dict): The configuration for the job
+        within_seconds (int): How far back to look
+    
+    Returns:
+        datetime: Timezone-aware time of the delivery, or None if none was
+            due within the window
+    """
+    return get_last_fire_time(build_trigger(config), within_seconds)
+
+def get_due_frequencies(within_seconds, now=None):
+    """
+    Get the frequencies with a delivery in the current delivery window.
+    
+    The current delivery is the next daily one, counting deliveries up to
+    within_seconds ago, so it covers both its prepare run and its delivery.
+    Weekly configurations are due when their delivery is that same one.
+    
+    Args:
+        within_seconds (int): How far back a delivery still counts
+        now (datetime): Current time (optional)
+    
+    Returns:
+        list: Frequencies due at the current delivery
+    """
+    since = (now or datetime.now(get_schedule_timezone())) - timedelta(seconds=within_seconds)
+    deliveries = {
+        frequency: build_trigger({"frequency": frequency}).get_next_fire_time(None, since)
+        for frequency in FREQUENCIES
+    }
+    return [frequency for frequency in FREQUENCIES if deliveries[frequency] == deliveries["daily"]]
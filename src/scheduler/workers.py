@@ -0,0 +1,277 @@
+"""
+Worker mode: scheduled research updates shared by several processes or hosts.
+
+Workers run without the Slack listener or the persistent job store. Each
+worker polls the schedule, works out which prepare and delivery runs are
+due, and takes the ones for configurations in its shard. Configurations are
+assigned to the live workers by rendezvous hashing, so a worker joining or
+leaving only moves its own share. A run is claimed through a lease in the
+shared database before it starts and the lease is renewed while it is in
+flight; when a worker crashes its shard moves to the others, which take over
+its runs once their leases expire and resume them from their checkpoints.
+The fetch coordinator only batches the topics of the worker's own shard, so
+each worker asks arXiv for its share of the topics rather than all of them.
+"""
+import os
+import time
+import queue
+import socket
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from src.database.models import get_configs_for_frequency, iter_config_pages
+from src.database.papers import to_db_time
+from src.database.leases import (
+    heartbeat, get_live_workers, remove_worker, get_leases, claim_lease, renew_leases, complete_lease
+)
+from src.scheduler.jobs import MISFIRE_GRACE_SECONDS, fetch_coordinator, get_due_configs
+from src.scheduler.triggers import (
+    build_trigger, build_prepare_trigger, get_last_fire_time, get_schedule_timezone, FREQUENCIES, PREPARE_LEAD_MINUTES
+)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Unique name of this worker; defaults to host name and process ID
+WORKER_ID = os.environ.get("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+
+# Seconds between schedule polls and heartbeats
+WORKER_POLL_SECONDS = float(os.environ.get("WORKER_POLL_SECONDS", "5"))
+
+# Seconds a claimed run stays leased without renewal
+WORKER_LEASE_SECONDS = int(os.environ.get("WORKER_LEASE_SECONDS", "60"))
+
+def shard_owner(config_id, workers):
+    """
+    Pick the worker responsible for a configuration.
+
+    Args:
+        config_id (int): ID of the configuration
+        workers (list): IDs of the live workers
+
+    Returns:
+        str: ID of the worker with the highest hash for the configuration
+    """
+    return max(
+        workers,
+        key=lambda worker_id: hashlib.blake2b(f"{worker_id}:{config_id}".encode("utf-8"), digest_size=8).digest()
+    )
+
+def get_due_slots(now=None):
+    """
+    Get the prepare and delivery runs due within the misfire grace period.
+
+    Args:
+        now (datetime): Current time (optional)
+
+    Returns:
+        list: (phase, frequency, delivery time) tuples, with the delivery
+            time as a UTC database timestamp
+    """
+    now = now or datetime.now(get_schedule_timezone())
+    slots = []
+    for frequency in FREQUENCIES:
+        # Triggers only depend on the frequency
+        schedule = {"frequency": frequency}
+        delivery_trigger = build_trigger(schedule)
+        delivered = get_last_fire_time(delivery_trigger, MISFIRE_GRACE_SECONDS, now)
+        if delivered is not None:
+            slots.append(("deliver", frequency, to_db_time(delivered)))
+        if PREPARE_LEAD_MINUTES > 0:
+            prepared = get_last_fire_time(build_prepare_trigger(schedule), MISFIRE_GRACE_SECONDS, now)
+            if prepared is not None:
+                delivery = delivery_trigger.get_next_fire_time(None, prepared)
+                # Once the delivery is due it runs every stage itself
+                if delivery > now:
+                    slots.append(("prepare", frequency, to_db_time(delivery)))
+    return slots
+
+class ScheduleWorker:
+    """
+    Claims and runs the scheduled research updates of one worker's shard.
+    """
+
+    def __init__(self, engine, worker_id=WORKER_ID, poll_seconds=WORKER_POLL_SECONDS,
+                 lease_seconds=WORKER_LEASE_SECONDS):
+        """
+        Args:
+            engine (AsyncResearchEngine): Engine the claimed runs are submitted to
+            worker_id (str): Unique name of this worker
+            poll_seconds (float): Seconds between schedule polls and heartbeats
+            lease_seconds (int): Seconds a claimed run stays leased without renewal
+        """
+        self.engine = engine
+        self.worker_id = worker_id
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self._running = set()
+        # Pending configurations of this worker's shard per due slot, with the
+        # live workers they were hashed against
+        self._shards = {}
+        self._shards_lock = threading.Lock()
+        self._finished = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Join the worker pool and start polling from a background thread.
+
+        Returns:
+            ScheduleWorker: This worker
+        """
+        heartbeat(self.worker_id)
+        fetch_coordinator.due_configs = self.get_due_configs
+        self._thread = threading.Thread(target=self._run, name="schedule-worker", daemon=True)
+        self._thread.start()
+        logger.info(f"Worker {self.worker_id} started")
+        return self
+
+    def stop(self):
+        """
+        Stop polling and leave the worker pool.
+
+        Runs still in flight keep their leases until they expire, so another
+        worker resumes them if this process exits before they finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        fetch_coordinator.due_configs = get_due_configs
+        remove_worker(self.worker_id)
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.error(f"Error polling the schedule: {str(e)}")
+            self._stop.wait(self.poll_seconds)
+
+    def poll(self, now=None):
+        """
+        Renew this worker's leases and claim the due runs of its shard.
+
+        Args:
+            now (datetime): Current time (optional)
+
+        Returns:
+            int: Number of runs claimed
+        """
+        heartbeat(self.worker_id)
+        self._complete_finished()
+        if self._running:
+            renew_leases(self.worker_id, self.lease_seconds)
+
+        slots = get_due_slots(now)
+        # Forget the shards of slots past their window
+        with self._shards_lock:
+            for slot in set(self._shards) - set(slots):
+                del self._shards[slot]
+        if not slots:
+            return 0
+        workers = tuple(get_live_workers() or [self.worker_id])
+        claimed = 0
+        for slot in slots:
+            phase, frequency, delivery_at = slot
+            # Rehash only when a worker joined or left since the shard was taken
+            shard = self._shards.get(slot)
+            if shard is None or shard[0] != workers:
+                shard = (workers, self.load_shard(frequency, workers))
+                with self._shards_lock:
+                    self._shards[slot] = shard
+            if shard[1]:
+                claimed += self.claim_runs(phase, delivery_at, shard[1])
+        return claimed
+
+    def get_due_configs(self):
+        """
+        Get the configurations of this worker's shard whose runs are still due.
+
+        Used by the fetch coordinator in place of every due configuration, so
+        a merged arXiv query only carries the topics of this worker's runs.
+
+        Returns:
+            list: Pending configurations of the due slots
+        """
+        with self._shards_lock:
+            configs = {
+                config_id: config
+                for _, pending in self._shards.values()
+                for config_id, config in pending.items()
+            }
+        return list(configs.values())
+
+    def load_shard(self, frequency, workers):
+        """
+        Load the configurations of a frequency assigned to this worker.
+
+        Args:
+            frequency (str): "daily" or "weekly"
+            workers (tuple): IDs of the live workers
+
+        Returns:
+            dict: Configurations in this worker's shard by ID
+        """
+        return {
+            config['id']: config for config in iter_config_pages(get_configs_for_frequency, frequency)
+            if shard_owner(config['id'], workers) == self.worker_id
+        }
+
+    def claim_runs(self, phase, delivery_at, pending):
+        """
+        Claim and submit the runs of a slot that are neither finished nor leased.
+
+        Configurations whose run has finished are removed from pending, so
+        later polls of the slot skip them.
+
+        Args:
+            phase (str): "prepare" or "deliver"
+            delivery_at (str): Delivery time, as a UTC database timestamp
+            pending (dict): Configurations in this worker's shard by ID
+
+        Returns:
+            int: Number of runs claimed
+        """
+        leases = get_leases(delivery_at, phase)
+        claimed = 0
+        for config in list(pending.values()):
+            key = (config['id'], delivery_at, phase)
+            lease = leases.get(config['id'])
+            if lease and lease['status'] == 'done':
+                with self._shards_lock:
+                    del pending[config['id']]
+                continue
+            if key in self._running or (lease and not lease['expired']):
+                continue
+            if not claim_lease(config['id'], delivery_at, phase, self.worker_id, self.lease_seconds):
+                continue
+            if lease:
+                logger.info(f"Taking over {phase} run of configuration {config['id']} from worker {lease['worker_id']}")
+
+            queued_at = time.monotonic()
+            if phase == "prepare":
+                future = self.engine.prepare(config, delivery_at, queued_at=queued_at)
+            else:
+                future = self.engine.submit(config, queued_at=queued_at, delivery_at=delivery_at)
+            self._running.add(key)
+            # Leases are completed from the polling thread, not the engine's loop
+            future.add_done_callback(lambda _, key=key: self._finished.put(key))
+            claimed += 1
+
+        if claimed:
+            logger.info(f"Worker {self.worker_id} claimed {claimed} {phase} runs due {delivery_at}")
+        return claimed
+
+    def _complete_finished(self):
+        while True:
+            try:
+                key = self._finished.get_nowait()
+            except queue.Empty:
+                return
+            self._running.discard(key)
+            complete_lease(*key, self.worker_id)
@@ -5,29 +5,40 @@ import os
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from src.slack_app.handlers import register_handlers
-from src.slack_app.views import create_home_tab_view
+from src.slack_app.home import publish_home_tab
 
-def create_slack_app():
+def create_slack_app(runtime, verify_token=True):
     """
     Create and configure the Slack Bolt app.
     
+    Args:
+        runtime (RuntimeContext): Shared runtime context made available to
+            every handler as context["runtime"]
+        verify_token (bool): Whether to check the bot token with auth.test
+            while creating the app
+    
     Returns:
         App: Configured Slack Bolt app
     """
-    # Initialize app with tokens from environment
+    # Initialize app with the shared client, which holds the bot token
     app = App(
-        token=os.environ.get("SLACK_BOT_TOKEN"),
-        signing_secret=os.environ.get("SLACK_SIGNING_SECRET")
+        signing_secret=os.environ.get("SLACK_SIGNING_SECRET"),
+        client=runtime.slack_client,
+        token_verification_enabled=verify_token
     )
     
-    # Add home tab handler
+    @app.middleware
+    def inject_runtime(context, next):
+        context["runtime"] = runtime
+        next()
+    
+    # Add home tab handler; the view is only republished when it changed
     @app.event("app_home_opened")
     def handle_home_tab(client, event, logger):
+        if event.get("tab", "home") != "home":
+            return
         try:
-            client.views_publish(
-                user_id=event["user"],
-                view=create_home_tab_view()
-            )
+            publish_home_tab(client, event["user"], event.get("view"))
         except Exception as e:
             logger.error(f"Error publishing home tab: {e}")
 
@@ -44,4 +55,21 @@ def start_socket_mode(app):
         app: Configured Slack Bolt app
     """
     handler = SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"])
-    handler.start() 
\ No newline at end of file
+    handler.start() 
+
+def connect_socket_mode(app):
+    """
+    Connect the Slack app in Socket Mode without blocking.
+    
+    Events are handled on the handler's threads, so the caller can finish
+    starting up while the bot already responds.
+    
+    Args:
+        app: Configured Slack Bolt app
+    
+    Returns:
+        SocketModeHandler: Connected handler
+    """
+    handler = SocketModeHandler(app, os.environ["SLACK_APP_TOKEN"])
+    handler.connect()
+    return handler
@@ -0,0 +1,63 @@
+"""
+Async Slack Web API client for the asyncio research engine.
+
+Kept apart from the sync client so that aiohttp is only loaded with the engine.
+"""
+import os
+import time
+import aiohttp
+from slack_sdk.web.async_client import AsyncWebClient
+from slack_sdk.http_retry.builtin_async_handlers import (
+    AsyncConnectionErrorRetryHandler, AsyncRateLimitErrorRetryHandler
+)
+from src.clients.resilience import HTTP_MAX_RETRIES
+from src.metrics.pipeline import record_slack_call, record_slack_rate_limit
+from src.slack_app.client import SLACK_API_URL, api_method_of
+
+# Maximum open connections to the Slack API from the asyncio engine
+SLACK_POOL_SIZE = int(os.environ.get("SLACK_POOL_SIZE", "20"))
+
+class AsyncRecordingRateLimitRetryHandler(AsyncRateLimitErrorRetryHandler):
+    """
+    Async rate limit retry handler that counts every 429, including the last one.
+    """
+
+    async def can_retry_async(self, *, state, request, response=None, error=None):
+        if response is not None and response.status_code == 429:
+            record_slack_rate_limit(api_method_of(request))
+        return await super().can_retry_async(state=state, request=request, response=response, error=error)
+
+class InstrumentedAsyncWebClient(AsyncWebClient):
+    """
+    AsyncWebClient that records the duration of every API call.
+    """
+
+    async def api_call(self, api_method, **kwargs):
+        started = time.monotonic()
+        try:
+            return await super().api_call(api_method, **kwargs)
+        finally:
+            record_slack_call(api_method, time.monotonic() - started)
+
+def create_async_slack_client(token=None):
+    """
+    Create an async Slack client with a keep-alive connection pool.
+    
+    Must be called on the event loop that will use the client.
+    
+    Args:
+        token (str): Slack bot token (optional, read from the environment)
+    
+    Returns:
+        AsyncWebClient: Slack client that retries rate limited and dropped calls
+    """
+    session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=SLACK_POOL_SIZE))
+    return InstrumentedAsyncWebClient(
+        token=token or os.environ.get("SLACK_BOT_TOKEN"),
+        base_url=SLACK_API_URL,
+        session=session,
+        retry_handlers=[
+            AsyncConnectionErrorRetryHandler(max_retry_count=HTTP_MAX_RETRIES),
+            AsyncRecordingRateLimitRetryHandler(max_retry_count=HTTP_MAX_RETRIES)
+        ]
+    )
@@ -0,0 +1,66 @@
+"""
+Slack Web API client shared by the app and the research jobs.
+
+Every API call is timed and every rate limited response counted in the
+pipeline metrics, attributed to the research run making the call. The async
+client of the research engine lives in async_client, so that aiohttp is not
+loaded before the app has connected.
+"""
+import os
+import time
+from slack_sdk import WebClient
+from slack_sdk.http_retry.builtin_handlers import ConnectionErrorRetryHandler, RateLimitErrorRetryHandler
+from src.clients.registry import get_shared_client
+from src.clients.resilience import HTTP_MAX_RETRIES
+from src.metrics.pipeline import record_slack_call, record_slack_rate_limit
+
+# Base URL of the Slack Web API
+SLACK_API_URL = os.environ.get("SLACK_API_URL", "https://slack.com/api/")
+
+def api_method_of(request):
+    """
+    Get the Slack API method name of a retried HTTP request.
+    """
+    return request.url.rsplit("/", 1)[-1]
+
+class RecordingRateLimitRetryHandler(RateLimitErrorRetryHandler):
+    """
+    Rate limit retry handler that counts every 429, including the last one.
+    """
+
+    def can_retry(self, *, state, request, response=None, error=None):
+        if response is not None and response.status_code == 429:
+            record_slack_rate_limit(api_method_of(request))
+        return super().can_retry(state=state, request=request, response=response, error=error)
+
+class InstrumentedWebClient(WebClient):
+    """
+    WebClient that records the duration of every API call.
+    """
+
+    def api_call(self, api_method, **kwargs):
+        started = time.monotonic()
+        try:
+            return super().api_call(api_method, **kwargs)
+        finally:
+            record_slack_call(api_method, time.monotonic() - started)
+
+def _create_slack_client():
+    # Rate limited calls wait for the Retry-After the API returns
+    return InstrumentedWebClient(
+        token=os.environ.get("SLACK_BOT_TOKEN"),
+        base_url=SLACK_API_URL,
+        retry_handlers=[
+            ConnectionErrorRetryHandler(max_retry_count=HTTP_MAX_RETRIES),
+            RecordingRateLimitRetryHandler(max_retry_count=HTTP_MAX_RETRIES)
+        ]
+    )
+
+def get_slack_client():
+    """
+    Get the shared Slack WebClient.
+    
+    Returns:
+        WebClient: Slack client that retries rate limited and dropped calls
+    """
+    return get_shared_client("slack", _create_slack_client)
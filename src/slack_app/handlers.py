@@ -1,9 +1,10 @@
 """
 Slack event and command handlers.
 """
-from src.slack_app.views import get_config_modal
-from src.database.models import save_config, get_all_configs
-from src.scheduler.jobs import setup_scheduled_job, run_research_update
+from src.slack_app.views import get_config_modal, create_config_selector_blocks
+from src.database.models import save_config, get_config, get_configs_for_channel
+from src.slack_app.home import publish_home_tab
+import time
 
 def register_handlers(app):
     """
@@ -20,6 +21,9 @@ def register_handlers(app):
     
     # Add test command
     app.command("/test-research-update")(test_research_update)
+    
+    # Configuration picked for a test update
+    app.action("select_test_config")(handle_test_config_selection)
 
 def open_config_modal(ack, body, client):
     """
@@ -36,7 +40,7 @@ def open_config_modal(ack, body, client):
         view=get_config_modal()
     )
 
-def handle_config_submission(ack, body, view, client):
+def handle_config_submission(ack, body, view, client, context, logger):
     """
     Process the submission of the configuration modal.
     
@@ -45,6 +49,8 @@ def handle_config_submission(ack, body, view, client):
         body: Request body
         view: View payload
         client: Slack client
+        context: Bolt context holding the runtime context
+        logger: Logger instance
     """
     ack()
     
@@ -70,15 +76,18 @@ def handle_config_submission(ack, body, view, client):
         "time_range": time_range,  # Now stored as integer
         "topic": values["main_topic"]["topic_input"]["value"],
         "additional_topics": additional_topics,
-        "channel": values["channel"]["channel_select"]["selected_channel"]
+        "channel": values["channel"]["channel_select"]["selected_channel"],
+        "created_by": body["user"]["id"]
     }
     
     # Save configuration to database
     config_id = save_config(config)
     config["id"] = config_id
     
-    # Set up the job in the scheduler
-    setup_scheduled_job(config)
+    # Set up the job in the shared scheduler; workers find new configurations in the database
+    if context["runtime"].schedule_jobs:
+        from src.scheduler.jobs import setup_scheduled_job
+        setup_scheduled_job(config, context["runtime"].scheduler)
     
     # Format topics for display
     all_topics = [config["topic"]] + config["additional_topics"]
@@ -89,39 +98,128 @@ def handle_config_submission(ack, body, view, client):
         channel=body["user"]["id"],
         text=f"Research bot configured successfully! Updates on topics: {topics_text} will be posted to <#{config['channel']}> {config['frequency']}."
     )
+    
+    # Show the new configuration on the user's home tab
+    try:
+        publish_home_tab(client, body["user"]["id"])
+    except Exception as e:
+        logger.error(f"Error publishing home tab: {str(e)}")
 
-def test_research_update(ack, body, client, logger):
+def test_research_update(ack, body, client, context, logger):
     """
     Test command to manually trigger a research update.
     
+    The command text may hold a configuration ID. Otherwise the channel's only
+    configuration is used, or the user is asked to pick one. The update itself
+    runs on the job queue, so the handler returns right away.
+    
     Args:
         ack: Acknowledge function
         body: Request body
         client: Slack client
+        context: Bolt context holding the runtime context
         logger: Logger instance
     """
     ack()
     
-    # Get the first available configuration or use default values
-    configs = get_all_configs()
-    if configs:
-        config = configs[0]
+    runtime = context["runtime"]
+    channel = body["channel_id"]
+    config_id = body.get("text", "").strip().lstrip("#")
+    if config_id:
+        config = get_config(int(config_id)) if config_id.isdigit() else None
+        if config is None:
+            client.chat_postEphemeral(
+                channel=channel,
+                user=body["user_id"],
+                text=f"Configuration {config_id} not found."
+            )
+            return
+        enqueue_test_update(runtime, channel, config)
+        return
+    
+    # Other channels' configurations need their ID in the command text
+    configs = get_configs_for_channel(channel, limit=101)
+    if not configs:
         client.chat_postMessage(
-            channel=body["channel_id"],
-            text=f"Running test research update using configuration ID: {config['id']}..."
+            channel=channel,
+            text="No configurations post to this channel. Pass a configuration ID, or set one up using /configure-research-bot"
         )
-        
-        try:
-            # Run the update process - pass just the client instead of client.app
-            run_research_update(config, client)
-        except Exception as e:
-            logger.error(f"Error running research update: {str(e)}")
-            client.chat_postMessage(
-                channel=body["channel_id"],
-                text=f"Error running research update: {str(e)}"
-            )
+    elif len(configs) == 1:
+        enqueue_test_update(runtime, channel, configs[0])
     else:
-        client.chat_postMessage(
-            channel=body["channel_id"],
-            text="No configurations found. Please set up a configuration first using /configure-research-bot"
-        )
\ No newline at end of file
+        client.chat_postEphemeral(
+            channel=channel,
+            user=body["user_id"],
+            text="Select a configuration to test",
+            blocks=create_config_selector_blocks(configs)
+        )
+
+def handle_test_config_selection(ack, body, client, context, logger):
+    """
+    Queue a test update for the configuration picked in the selector.
+    
+    Args:
+        ack: Acknowledge function
+        body: Request body
+        client: Slack client
+        context: Bolt context holding the runtime context
+        logger: Logger instance
+    """
+    ack()
+    
+    config_id = int(body["actions"][0]["selected_option"]["value"])
+    config = get_config(config_id)
+    if config is None:
+        logger.error(f"Selected configuration {config_id} no longer exists")
+        return
+    enqueue_test_update(context["runtime"], body["channel"]["id"], config)
+
+def enqueue_test_update(runtime, channel, config):
+    """
+    Post a progress message and queue a research update.
+    
+    The run uses the runtime's shared Slack client rather than Bolt's
+    per-request one, so its Slack calls are recorded in the run's metrics.
+    
+    Args:
+        runtime (RuntimeContext): Runtime context holding the client and job queue
+        channel (str): Channel ID to report progress in
+        config (dict): The configuration to run
+    """
+    client = runtime.slack_client
+    job_queue = runtime.job_queue
+    ahead = job_queue.jobs_ahead()
+    status = f"{ahead} job(s) ahead" if ahead else "starting shortly"
+    progress = client.chat_postMessage(
+        channel=channel,
+        text=f":hourglass: Test research update for configuration {config['id']} queued, {status}."
+    )
+    job_queue.submit(
+        run_test_update, client, config, progress['channel'], progress['ts'], time.monotonic()
+    )
+
+def run_test_update(client, config, channel, ts, queued_at=None):
+    """
+    Run a queued test update and keep its progress message up to date.
+    
+    Args:
+        client: Slack client
+        config (dict): The configuration to run
+        channel (str): Channel ID of the progress message
+        ts (str): Timestamp of the progress message
+        queued_at (float): time.monotonic() when the update was queued (optional)
+    """
+    client.chat_update(
+        channel=channel,
+        ts=ts,
+        text=f":arrows_counterclockwise: Running test research update for configuration {config['id']}..."
+    )
+    
+    # The pipeline is imported on first use so the app connects before it loads
+    from src.scheduler.jobs import run_research_update
+    
+    if run_research_update(config, client, queued_at=queued_at):
+        text = f":white_check_mark: Test research update for configuration {config['id']} posted to <#{config['channel']}>."
+    else:
+        text = f":x: Test research update for configuration {config['id']} failed, see <#{config['channel']}> for details."
+    client.chat_update(channel=channel, ts=ts, text=text)
@@ -0,0 +1,167 @@
+"""
+Cached App Home tab.
+
+The home view is built from the user's configurations, their next scheduled
+updates and the stats of their last runs. Built views are cached per user
+under a key of those inputs, so opening the tab again only rebuilds the view
+when something it shows has changed. The view's hash travels in its
+private_metadata, and Slack sends the published view back with every
+app_home_opened event, so views.publish is skipped when the hash matches.
+
+Configurations saved before their creator was recorded are listed for the
+members of the channel they post to. The user's channels are only looked up
+while such configurations exist, and are cached for a few minutes.
+"""
+import os
+import time
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from src.slack_app.views import create_home_tab_view
+from src.database.models import get_configs_for_user, has_unowned_configs
+from src.database.run_stats import get_latest_run_stats
+from src.scheduler.triggers import get_next_run_time
+
+logger = logging.getLogger(__name__)
+
+# Users whose built home view is kept in memory
+HOME_CACHE_SIZE = int(os.environ.get("HOME_CACHE_SIZE", "1000"))
+
+# Seconds a user's channel memberships are reused
+HOME_CHANNELS_TTL_SECONDS = int(os.environ.get("HOME_CHANNELS_TTL_SECONDS", "300"))
+
+_views = OrderedDict()
+_views_lock = threading.Lock()
+
+_channels = OrderedDict()
+_channels_lock = threading.Lock()
+
+def hash_view(view):
+    """
+    Hash the content of a view.
+
+    Args:
+        view (dict): Slack Block Kit view
+
+    Returns:
+        str: Hex digest that changes whenever the view's content does
+    """
+    payload = json.dumps(view, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def get_member_channels(client, user_id):
+    """
+    Get the public channels a user is a member of.
+
+    Args:
+        client: Slack WebClient
+        user_id (str): Slack user ID
+
+    Returns:
+        list: Channel IDs, empty if they could not be loaded
+    """
+    with _channels_lock:
+        cached = _channels.get(user_id)
+        if cached is not None and time.monotonic() - cached[0] < HOME_CHANNELS_TTL_SECONDS:
+            return cached[1]
+
+    channels = []
+    cursor = None
+    try:
+        while True:
+            response = client.users_conversations(
+                user=user_id, types="public_channel", exclude_archived=True, limit=1000, cursor=cursor
+            )
+            channels.extend(channel["id"] for channel in response["channels"])
+            cursor = (response.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                break
+    except Exception as e:
+        logger.error(f"Error getting channels of user {user_id}: {str(e)}")
+        return []
+
+    with _channels_lock:
+        _channels[user_id] = (time.monotonic(), channels)
+        _channels.move_to_end(user_id)
+        while len(_channels) > HOME_CACHE_SIZE:
+            _channels.popitem(last=False)
+    return channels
+
+def get_home_inputs(user_id, client=None):
+    """
+    Load everything the home view of a user shows.
+
+    Args:
+        user_id (str): Slack user ID
+        client: Slack WebClient used to find the user's channels (optional)
+
+    Returns:
+        tuple: (configurations, next run time by config ID, last run stats by config ID)
+    """
+    channels = []
+    if client is not None and has_unowned_configs():
+        channels = get_member_channels(client, user_id)
+    configs = get_configs_for_user(user_id, channels)
+    next_runs = {config['id']: get_next_run_time(config) for config in configs}
+    last_runs = get_latest_run_stats([config['id'] for config in configs])
+    return configs, next_runs, last_runs
+
+def _inputs_key(configs, next_runs, last_runs):
+    return tuple(
+        (
+            config['id'],
+            config.get('updated_at'),
+            next_runs[config['id']].timestamp(),
+            last_runs.get(config['id'], {}).get('id')
+        )
+        for config in configs
+    )
+
+def build_home_view(user_id, client=None):
+    """
+    Get the home view of a user, rebuilding it only if its inputs changed.
+
+    Args:
+        user_id (str): Slack user ID
+        client: Slack WebClient used to find the user's channels (optional)
+
+    Returns:
+        dict: Home view with its hash in private_metadata
+    """
+    inputs = get_home_inputs(user_id, client)
+    key = _inputs_key(*inputs)
+    with _views_lock:
+        cached = _views.get(user_id)
+        if cached is not None and cached[0] == key:
+            _views.move_to_end(user_id)
+            return cached[1]
+
+    view = create_home_tab_view(*inputs)
+    view["private_metadata"] = hash_view(view)
+    with _views_lock:
+        _views[user_id] = (key, view)
+        _views.move_to_end(user_id)
+        while len(_views) > HOME_CACHE_SIZE:
+            _views.popitem(last=False)
+    return view
+
+def publish_home_tab(client, user_id, published_view=None):
+    """
+    Publish the home view of a user unless Slack already shows it.
+
+    Args:
+        client: Slack WebClient
+        user_id (str): Slack user ID
+        published_view (dict): The view currently published, as sent in
+            app_home_opened events (optional)
+
+    Returns:
+        bool: True if the view was published, False if it was unchanged
+    """
+    view = build_home_view(user_id, client)
+    if published_view and published_view.get("private_metadata") == view["private_metadata"]:
+        return False
+    client.views_publish(user_id=user_id, view=view)
+    return True
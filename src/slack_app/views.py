@@ -1,6 +1,12 @@
 """
 Slack UI elements for the bot configuration.
 """
+from src.database.papers import from_db_time
+
+# Configurations listed on the home tab; a view holds at most 100 blocks
+HOME_MAX_CONFIGS = 20
+
+RUN_STATUS_EMOJI = {"ok": ":white_check_mark:", "empty": ":zzz:", "error": ":x:"}
 
 def get_config_modal():
     """
@@ -79,48 +85,71 @@ def get_config_modal():
         ]
     }
 
-def create_research_update_blocks(summary, config, papers):
+def escape_mrkdwn(text):
     """
-    Create formatted Slack message blocks with proper length validation.
+    Escape the characters Slack treats as control sequences in mrkdwn.
     """
-    topics = [config['topic']] + config.get('additional_topics', [])
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+def create_paper_block(paper, summary):
+    """
+    Create the section block of one paper in a research update.
     
-    # Split summary into chunks under 3000 characters
-    summary_chunks = []
-    current_chunk = []
-    current_length = 0
-    
-    for line in summary.split('\n'):
-        line_length = len(line)
-        if current_length + line_length > 2500:  # Leave room for markdown formatting
-            summary_chunks.append("\n".join(current_chunk))
-            current_chunk = []
-            current_length = 0
-        current_chunk.append(line)
-        current_length += line_length
-    
-    if current_chunk:
-        summary_chunks.append("\n".join(current_chunk))
+    The link and title come from the paper record; only the summary text
+    comes from the LLM.
+    
+    Args:
+        paper (dict): Paper entry
+        summary (dict): Paper summary, or None while it is pending or if it failed
+    
+    Returns:
+        dict: Slack Block Kit section
+    """
+    title = escape_mrkdwn(paper['title'][:300])
+    if summary is None:
+        text = f":page_facing_up: <{paper['pdf_url']}|{title}>"
+    else:
+        emoji = ":star:" if summary['important'] else ":page_facing_up:"
+        text = (
+            f"{emoji} *<{paper['pdf_url']}|{title}>*\n"
+            f":pushpin: _Key Contribution_: {escape_mrkdwn(summary['contribution'][:1000])}\n"
+            f":mag: _Why It Matters_: {escape_mrkdwn(summary['significance'][:1000])}"
+        )
+    
+    return {
+        "type": "section",
+        "text": {"type": "mrkdwn", "text": text}
+    }
 
+def create_research_update_blocks(summaries, config, papers):
+    """
+    Create formatted Slack message blocks for a research update.
+    
+    Every paper gets its own section, which keeps each block well under
+    Slack's 3000 character limit.
+    
+    Args:
+        summaries (dict): Paper summaries by arXiv id
+        config (dict): The configuration of the update
+        papers (list): Papers in the digest, best first
+    
+    Returns:
+        list: Slack Block Kit blocks
+    """
+    topics = [config['topic']] + config.get('additional_topics', [])
+    
     blocks = [
         {
             "type": "header",
             "text": {
                 "type": "plain_text",
-                "text": f":microscope: Latest Research in {', '.join(topics)}"
+                "text": f":microscope: Latest Research in {', '.join(topics)}"[:150]
             }
         }
     ]
     
-    # Add summary chunks as separate sections
-    for i, chunk in enumerate(summary_chunks, 1):
-        blocks.append({
-            "type": "section",
-            "text": {
-                "type": "mrkdwn",
-                "text": f"*Part {i}:*\n{chunk}"
-            }
-        })
+    for paper in papers:
+        blocks.append(create_paper_block(paper, summaries.get(paper['arxiv_id'])))
     
     # Add context block at the end
     blocks.append({
@@ -136,91 +165,193 @@ def create_research_update_blocks(summary, config, papers):
     
     return blocks
 
-def create_home_tab_view():
-    """Create the app home view with introduction and quick actions"""
-    return {
-        "type": "home",
-        "blocks": [
-            {
-                "type": "header",
-                "text": {
-                    "type": "plain_text",
-                    "text": "🔬 Research Daily Update Bot :lab_coat:",
-                    "emoji": True
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "*Welcome to your AI Research Assistant!* \nI automatically track arXiv papers and deliver curated updates to your Slack channels."
-                }
-            },
-            {
-                "type": "divider"
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "✨ *Key Features*\n• Daily/weekly research digests\n• Multi-topic monitoring\n• LLM-powered summaries (Llama 3 70B)\n• Customizable filters and schedules"
-                }
-            },
-            {
-                "type": "actions",
-                "elements": [
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "⚙️ Configure Bot",
-                            "emoji": True
-                        },
-                        "value": "configure",
-                        "action_id": "open_config_modal"
+def create_config_selector_blocks(configs):
+    """
+    Create the message blocks letting a user pick the configuration to test.
+    
+    Args:
+        configs (list): Configurations to choose from, at most 100
+    
+    Returns:
+        list: Slack Block Kit blocks
+    """
+    options = []
+    for config in configs[:100]:
+        topics = ", ".join([config['topic']] + config.get('additional_topics', []))
+        label = f"#{config['id']}: {topics}"
+        options.append({
+            "text": {"type": "plain_text", "text": label if len(label) <= 75 else label[:72] + "..."},
+            "value": str(config['id'])
+        })
+    
+    return [
+        {
+            "type": "section",
+            "block_id": "test_config",
+            "text": {"type": "mrkdwn", "text": "Which configuration should I run a test update for?"},
+            "accessory": {
+                "type": "static_select",
+                "action_id": "select_test_config",
+                "placeholder": {"type": "plain_text", "text": "Select a configuration"},
+                "options": options
+            }
+        }
+    ]
+
+def format_slack_date(value, fallback):
+    """
+    Format a time so Slack shows it in each reader's own timezone.
+    
+    Args:
+        value (datetime): Timezone-aware time
+        fallback (str): Text shown by clients that cannot format dates
+    
+    Returns:
+        str: Slack date token
+    """
+    return f"<!date^{int(value.timestamp())}^{{date_short_pretty}} at {{time}}|{fallback}>"
+
+def create_home_config_block(config, next_run, last_run):
+    """
+    Create the home tab section describing one configuration.
+    
+    Args:
+        config (dict): The configuration
+        next_run (datetime): Time of its next scheduled update, or None
+        last_run (dict): run_stats row of its last update, or None
+    
+    Returns:
+        dict: Slack Block Kit section
+    """
+    topics = escape_mrkdwn(", ".join([config['topic']] + config.get('additional_topics', [])))
+    lines = [
+        f"*#{config['id']}* {topics}",
+        f"<#{config['channel']}> · {config['frequency']} · papers from the last {config['time_range']} days"
+    ]
+    if next_run is not None:
+        lines.append(f":calendar: Next update {format_slack_date(next_run, next_run.strftime('%Y-%m-%d %H:%M %Z'))}")
+    if last_run is None:
+        lines.append(":hourglass: No update posted yet")
+    else:
+        started = from_db_time(last_run['started_at'])
+        summary = (
+            f"{RUN_STATUS_EMOJI.get(last_run['status'], ':grey_question:')} Last update "
+            f"{format_slack_date(started, last_run['started_at'] + ' UTC')} · "
+            f"{last_run['papers_ranked'] or 0} papers · {last_run['total_seconds'] or 0:.1f}s"
+        )
+        if last_run['completion_tokens']:
+            summary += f" · {last_run['prompt_tokens'] + last_run['completion_tokens']:,} tokens"
+        lines.append(summary)
+    return {"type": "section", "text": {"type": "mrkdwn", "text": "\n".join(lines)}}
+
+def create_home_tab_view(configs=(), next_runs=None, last_runs=None):
+    """
+    Create the app home view with the user's configurations and quick actions.
+    
+    Args:
+        configs (list): Configurations the user set up
+        next_runs (dict): Next scheduled update time by configuration ID
+        last_runs (dict): run_stats row of the last update by configuration ID
+    
+    Returns:
+        dict: Slack Block Kit home view
+    """
+    next_runs = next_runs or {}
+    last_runs = last_runs or {}
+    blocks = [
+        {
+            "type": "header",
+            "text": {
+                "type": "plain_text",
+                "text": "🔬 Research Daily Update Bot :lab_coat:",
+                "emoji": True
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "*Welcome to your AI Research Assistant!* \nI automatically track arXiv papers and deliver curated updates to your Slack channels."
+            }
+        },
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "⚙️ Configure Bot",
+                        "emoji": True
                     },
-                    {
-                        "type": "button",
-                        "text": {
-                            "type": "plain_text",
-                            "text": "🔍 Test Update",
-                            "emoji": True
-                        },
-                        "value": "test_update",
-                        "action_id": "trigger_test_update"
-                    }
-                ]
-            },
-            {
-                "type": "divider"
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "📘 *Getting Started*\n1. Use `/configure-research-bot` to set up your first monitor\n2. Specify your research topics (e.g. `LLM`, `Diffusion Models`)\n3. Choose update frequency and channel\n4. Let me handle the rest!"
-                }
-            },
-            {
-                "type": "section",
-                "text": {
-                    "type": "mrkdwn",
-                    "text": "🔧 *Commands*\n`/configure-research-bot` - Set up new monitoring\n`/test-research-update` - Trigger immediate update\n`/list-research-configs` - Show active configurations"
+                    "value": "configure",
+                    "action_id": "open_config_modal"
+                },
+                {
+                    "type": "button",
+                    "text": {
+                        "type": "plain_text",
+                        "text": "🔍 Test Update",
+                        "emoji": True
+                    },
+                    "value": "test_update",
+                    "action_id": "trigger_test_update"
                 }
-            },
-            {
-                "type": "divider"
-            },
-            {
+            ]
+        },
+        {
+            "type": "divider"
+        }
+    ]
+    
+    if configs:
+        blocks.append({
+            "type": "section",
+            "text": {"type": "mrkdwn", "text": f"📚 *Your research updates* ({len(configs)})"}
+        })
+        for config in configs[:HOME_MAX_CONFIGS]:
+            blocks.append(create_home_config_block(config, next_runs.get(config['id']), last_runs.get(config['id'])))
+        if len(configs) > HOME_MAX_CONFIGS:
+            blocks.append({
                 "type": "context",
-                "elements": [
-                    {
-                        "type": "mrkdwn",
-                        "text": "🔍 _Tracking research areas:_ Computer Vision • NLP • Generative AI • Robotics\n"
-                                "📆 _Next scheduled update:_ Today at 9:00 AM\n"
-                                "📧 _Contact:_ <mailto:yutongy@nvidia.com|April Yang>"
-                    }
-                ]
+                "elements": [{"type": "mrkdwn", "text": f"and {len(configs) - HOME_MAX_CONFIGS} more"}]
+            })
+    else:
+        # Onboarding for users without configurations
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "✨ *Key Features*\n• Daily/weekly research digests\n• Multi-topic monitoring\n• LLM-powered summaries (Llama 3 70B)\n• Customizable filters and schedules"
             }
-        ]
-    }
\ No newline at end of file
+        })
+        blocks.append({
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "📘 *Getting Started*\n1. Use `/configure-research-bot` to set up your first monitor\n2. Specify your research topics (e.g. `LLM`, `Diffusion Models`)\n3. Choose update frequency and channel\n4. Let me handle the rest!"
+            }
+        })
+    
+    blocks.extend([
+        {
+            "type": "divider"
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "🔧 *Commands*\n`/configure-research-bot` - Set up new monitoring\n`/test-research-update` - Trigger immediate update\n`/list-research-configs` - Show active configurations"
+            }
+        },
+        {
+            "type": "context",
+            "elements": [
+                {
+                    "type": "mrkdwn",
+                    "text": "📧 _Contact:_ <mailto:yutongy@nvidia.com|April Yang>"
+                }
+            ]
+        }
+    ])
+    return {"type": "home", "blocks": blocks}
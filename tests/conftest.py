@@ -0,0 +1,25 @@
+"""
+Shared fixtures for the test suite.
+"""
+import os
+import tempfile
+import pytest
+
+# Modules read DB_PATH when imported, so never let them default to the real database
+os.environ.setdefault("DB_PATH", os.path.join(tempfile.mkdtemp(prefix="research-bot-tests-"), "research_bot.db"))
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """
+    Point the database at a fresh file with the full schema.
+
+    Returns:
+        str: Path of the database file
+    """
+    from src.database import connection
+    path = str(tmp_path / "research_bot.db")
+    connection.close_db_connection()
+    monkeypatch.setattr(connection, "DB_PATH", path)
+    connection.init_db()
+    yield path
+    connection.close_db_connection()
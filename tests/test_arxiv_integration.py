@@ -0,0 +1,189 @@
+"""
+Tests for the arXiv client, the fetch coordinator and the BM25 ranker.
+"""
+import time
+import threading
+from datetime import datetime, timezone, timedelta
+import pytest
+from src.arxiv_integration import coordinator
+from src.arxiv_integration import client
+from src.arxiv_integration.client import PriorityLock, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from src.clients.resilience import CircuitBreaker
+from src.arxiv_integration.coordinator import FetchCoordinator, paper_matches_topic
+from src.arxiv_integration.ranker import rank_papers, score_papers
+from src.database.papers import get_papers_for_topics
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+# Papers with the topics whose own arXiv phrase query returns them
+CORPUS = [
+    ("Retrieval-Augmented Generation for open-domain QA", "We study RAG pipelines.",
+     {"retrieval augmented generation", "rag"}),
+    ("Average-case storage bounds", "Storage and averaging for streaming sketches.", set()),
+    ("Scaling LLMs with mixture of experts", "Large language models route tokens to experts.",
+     {"llm", "large language model", "mixture of experts"}),
+    ("LLM-based agents for code review", "An agent framework built on a large language model.",
+     {"llm", "large language model"}),
+    ("Fallback schedulers in OS kernels", "Kernel scheduling without llmops tooling.", set()),
+    ("Diffusion models for protein design", "Score-based diffusion model variants.", {"diffusion model"}),
+    ("Graph neural networks at scale", "Message passing for large graphs.", {"graph neural network"}),
+    ("Policy gradients revisited", "Learning stochastic policies with low variance.", {"policy gradient"}),
+]
+
+def make_paper(index, title, abstract):
+    return {
+        "arxiv_id": f"2601.{index:05d}v1",
+        "title": title,
+        "authors": [f"Author {index}"],
+        "abstract": abstract,
+        "published": NOW - timedelta(hours=index + 1),
+        "pdf_url": f"https://arxiv.org/pdf/2601.{index:05d}v1",
+        "doi": ""
+    }
+
+PAPERS = [(make_paper(i, title, abstract), topics) for i, (title, abstract, topics) in enumerate(CORPUS)]
+TOPICS = sorted({topic for _, topics in PAPERS for topic in topics})
+
+def per_topic_results(topic):
+    return {paper["arxiv_id"] for paper, topics in PAPERS if topic in topics}
+
+@pytest.mark.parametrize("topic, text, expected", [
+    ("rag", "Average-case storage bounds", False),
+    ("rag", "RAG pipelines", True),
+    ("llm", "LLMs and LLM-based agents", True),
+    ("llm", "without llmops tooling", False),
+    ("retrieval augmented generation", "Retrieval-Augmented Generation", True),
+    ("retrieval-augmented generation", "retrieval augmented generation", True),
+    ("large language models", "a large language model", True),
+    ("policy", "stochastic policies", True),
+    ("graph neural network", "graph neural networks", True),
+])
+def test_paper_matches_topic_on_whole_words(topic, text, expected):
+    paper = {"title": text, "abstract": "", "authors": []}
+    assert paper_matches_topic(paper, topic) is expected
+
+def test_merged_fetch_routes_papers_like_per_topic_queries(db_path, monkeypatch):
+    queries = []
+
+    def fake_stream(topics, since, until=None, page_size=None, priority=None):
+        # arXiv answers an OR-query with the union of its per-topic results
+        queries.append(list(topics))
+        matches = [paper for paper, labels in PAPERS if labels & set(topics) and paper["published"] > since]
+        yield from sorted(matches, key=lambda paper: paper["published"], reverse=True)
+
+    monkeypatch.setattr(coordinator, "stream_arxiv_papers", fake_stream)
+    fetcher = FetchCoordinator(window_seconds=0)
+    fetcher.get_papers(TOPICS, 7, coalesce=False)
+
+    assert queries == [TOPICS]
+    cutoff = NOW - timedelta(days=7)
+    for topic in TOPICS:
+        routed = {paper["arxiv_id"] for paper in get_papers_for_topics([topic], cutoff)}
+        assert routed == per_topic_results(topic), topic
+
+def test_quiet_topic_refetches_only_the_overlap_after_a_fetch(db_path, monkeypatch):
+    fetch_starts = []
+
+    def fake_stream(topics, since, until=None, page_size=None, priority=None):
+        fetch_starts.append(since)
+        return iter(())
+
+    monkeypatch.setattr(coordinator, "stream_arxiv_papers", fake_stream)
+    FetchCoordinator(window_seconds=0).get_papers(["quiet topic"], 30, coalesce=False)
+    # A new process has no in-memory results and relies on the stored watermark
+    FetchCoordinator(window_seconds=0).get_papers(["quiet topic"], 30, coalesce=False)
+
+    first, second = fetch_starts
+    assert datetime.now(timezone.utc) - first > timedelta(days=29)
+    overlap = timedelta(hours=coordinator.WATERMARK_OVERLAP_HOURS)
+    assert datetime.now(timezone.utc) - second < overlap + timedelta(minutes=1)
+
+def test_priority_lock_serves_interactive_fetches_before_waiting_batches():
+    lock = PriorityLock()
+    order = []
+
+    def fetch(name, priority):
+        with lock.hold(priority):
+            order.append(name)
+
+    threads = []
+    with lock.hold(PRIORITY_BATCH):
+        for name, priority in [("batch 1", PRIORITY_BATCH), ("batch 2", PRIORITY_BATCH), ("test", PRIORITY_INTERACTIVE)]:
+            thread = threading.Thread(target=fetch, args=(name, priority))
+            thread.start()
+            threads.append(thread)
+            # Queue the callers in a known order
+            while len(lock._waiting) < len(threads):
+                time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+    assert order == ["test", "batch 1", "batch 2"]
+
+def test_stream_only_counts_page_requests_towards_the_circuit_breaker(monkeypatch):
+    class FakeResult:
+        def __init__(self, index):
+            self.paper = make_paper(index, "Title", "Abstract.")
+
+    breaker = CircuitBreaker("arxiv", failure_threshold=1)
+    monkeypatch.setattr(client, "get_circuit_breaker", lambda name: breaker)
+    monkeypatch.setattr(client, "fetch_arxiv_page", lambda query, start, page_size, priority: [
+        FakeResult(i) for i in range(start, start + page_size)
+    ])
+    monkeypatch.setattr(client, "result_to_paper", lambda result: result.paper)
+
+    papers = client.stream_arxiv_papers(["llm"], NOW - timedelta(days=1), NOW, page_size=2)
+    next(papers)
+    # An error in the caller's processing between pages is not an arXiv failure
+    with pytest.raises(ValueError):
+        papers.throw(ValueError("bad paper"))
+    assert breaker.state == "closed"
+
+def ranked_ids(papers, topics, top_k=10, **kwargs):
+    return [paper["arxiv_id"] for paper in rank_papers(papers, topics, top_k, **kwargs)]
+
+def test_bm25_ranks_by_topic_relevance():
+    papers = [
+        make_paper(0, "A survey of graph databases", "Indexing graphs on disk."),
+        make_paper(1, "Diffusion models for audio", "We train on speech."),
+        make_paper(2, "Efficient attention", "Diffusion appears once in passing."),
+        make_paper(3, "Diffusion model distillation", "Distilling diffusion models into few diffusion steps."),
+    ]
+    # Title terms count double, repeated terms score higher and unrelated papers are dropped
+    assert ranked_ids(papers, ["diffusion model"]) == [
+        papers[3]["arxiv_id"], papers[1]["arxiv_id"], papers[2]["arxiv_id"]
+    ]
+    assert ranked_ids(papers, ["diffusion model"], top_k=2) == [papers[3]["arxiv_id"], papers[1]["arxiv_id"]]
+
+def test_bm25_scores_each_paper_by_its_best_topic():
+    papers = [
+        make_paper(0, "Protein folding", "Structure prediction for proteins."),
+        make_paper(1, "Robot grasping", "Robot manipulation with grasping policies."),
+        make_paper(2, "Weather forecasting", "Numerical weather models."),
+    ]
+    scores = score_papers(papers, ["protein folding", "robot grasping"])
+    assert scores[0] > 0 and scores[1] > 0
+    assert scores[2] == 0
+    assert set(ranked_ids(papers, ["protein folding", "robot grasping"])) == {
+        papers[0]["arxiv_id"], papers[1]["arxiv_id"]
+    }
+
+def test_bm25_keeps_newer_papers_first_among_ties():
+    papers = [make_paper(i, "Sparse attention", "Sparse attention kernels.") for i in range(3)]
+    assert ranked_ids(papers, ["sparse attention"]) == [paper["arxiv_id"] for paper in papers]
+
+def test_rank_papers_drops_papers_that_do_not_mention_topics():
+    papers = [make_paper(0, "Weather forecasting", "Numerical weather models.")]
+    assert rank_papers(papers, ["protein folding"], 10) == []
+
+@pytest.mark.parametrize("topic, title", [
+    ("transformers", "A Transformer for vision"),
+    ("transformer", "Vision transformers at scale"),
+    ("llm", "Evaluating LLMs on code"),
+    ("llms", "An LLM for theorem proving"),
+    ("graph neural network", "Graph neural networks for molecules"),
+])
+def test_rank_papers_matches_singular_and_plural_topics(topic, title):
+    papers = [make_paper(0, title, "No further detail."), make_paper(1, "Weather forecasting", "Numerical weather models.")]
+    # The ranker keeps exactly the papers the coordinator routes to the topic
+    assert paper_matches_topic(papers[0], topic)
+    assert ranked_ids(papers, [topic]) == [papers[0]["arxiv_id"]]
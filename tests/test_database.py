@@ -0,0 +1,95 @@
+"""
+Tests for the delivery ledger and worker leases.
+"""
+import os
+import sys
+import subprocess
+import threading
+from src.database.ledger import filter_undelivered, record_deliveries
+from src.database.leases import (
+    heartbeat, get_live_workers, get_leases, claim_lease, renew_leases, complete_lease
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DELIVERY_AT = "2026-10-19 09:00:00"
+
+def papers(*arxiv_ids):
+    return [{"arxiv_id": arxiv_id} for arxiv_id in arxiv_ids]
+
+def test_ledger_filters_deliveries_in_order(db_path):
+    record_deliveries(1, "C1", ["2601.00001v1"])
+
+    remaining = filter_undelivered(1, "C1", papers("2601.00003v1", "2601.00001v1", "2601.00002v1"))
+    assert [paper["arxiv_id"] for paper in remaining] == ["2601.00003v1", "2601.00002v1"]
+    # Deliveries are per configuration and channel
+    assert len(filter_undelivered(1, "C2", papers("2601.00001v1"))) == 1
+    assert len(filter_undelivered(2, "C1", papers("2601.00001v1"))) == 1
+
+def test_ledger_sees_deliveries_from_another_connection(db_path):
+    assert filter_undelivered(1, "C1", papers("2601.00001v1"))
+
+    # Each thread has its own connection
+    thread = threading.Thread(target=record_deliveries, args=(1, "C1", ["2601.00001v1"]))
+    thread.start()
+    thread.join()
+
+    assert filter_undelivered(1, "C1", papers("2601.00001v1")) == []
+
+def test_ledger_sees_deliveries_from_another_process(db_path):
+    assert filter_undelivered(1, "C1", papers("2601.00002v1"))
+
+    subprocess.run(
+        [sys.executable, "-c", "from src.database.ledger import record_deliveries; "
+                               "assert record_deliveries(1, 'C1', ['2601.00002v1'])"],
+        cwd=REPO_ROOT, env=dict(os.environ, DB_PATH=db_path), check=True
+    )
+
+    assert filter_undelivered(1, "C1", papers("2601.00002v1")) == []
+
+def test_live_lease_blocks_other_workers(db_path):
+    assert claim_lease(1, DELIVERY_AT, "deliver", "worker-a", 60)
+    assert not claim_lease(1, DELIVERY_AT, "deliver", "worker-b", 60)
+    # Phases and delivery times are leased separately
+    assert claim_lease(1, DELIVERY_AT, "prepare", "worker-b", 60)
+    assert claim_lease(1, "2026-10-20 09:00:00", "deliver", "worker-b", 60)
+
+    lease = get_leases(DELIVERY_AT, "deliver")[1]
+    assert lease["worker_id"] == "worker-a"
+    assert lease["status"] == "running"
+    assert not lease["expired"]
+
+def test_expired_lease_is_taken_over(db_path):
+    # A lease that is already past its expiry, as if its worker had crashed
+    assert claim_lease(1, DELIVERY_AT, "deliver", "worker-a", -1)
+    assert get_leases(DELIVERY_AT, "deliver")[1]["expired"]
+
+    assert claim_lease(1, DELIVERY_AT, "deliver", "worker-b", 60)
+    lease = get_leases(DELIVERY_AT, "deliver")[1]
+    assert lease["worker_id"] == "worker-b"
+    assert lease["attempts"] == 2
+
+    # The crashed worker no longer holds the lease
+    assert not complete_lease(1, DELIVERY_AT, "deliver", "worker-a")
+    assert complete_lease(1, DELIVERY_AT, "deliver", "worker-b")
+
+def test_finished_run_is_never_claimed_again(db_path):
+    assert claim_lease(1, DELIVERY_AT, "deliver", "worker-a", -1)
+    assert complete_lease(1, DELIVERY_AT, "deliver", "worker-a")
+
+    assert get_leases(DELIVERY_AT, "deliver")[1]["status"] == "done"
+    assert not claim_lease(1, DELIVERY_AT, "deliver", "worker-b", 60)
+
+def test_renewal_keeps_running_leases_alive(db_path):
+    assert claim_lease(1, DELIVERY_AT, "deliver", "worker-a", -1)
+    assert claim_lease(2, DELIVERY_AT, "deliver", "worker-a", -1)
+    assert complete_lease(2, DELIVERY_AT, "deliver", "worker-a")
+
+    assert renew_leases("worker-a", 60) == 1
+    assert not get_leases(DELIVERY_AT, "deliver")[1]["expired"]
+    assert not claim_lease(1, DELIVERY_AT, "deliver", "worker-b", 60)
+
+def test_live_workers_are_sorted(db_path):
+    heartbeat("worker-b")
+    heartbeat("worker-a")
+    assert get_live_workers() == ["worker-a", "worker-b"]
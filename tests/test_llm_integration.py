@@ -0,0 +1,55 @@
+"""
+Tests for the token-budget packer of summarization requests.
+"""
+from src.llm_integration import packer
+from src.llm_integration.packer import (
+    estimate_tokens, normalize_abstract, truncate_to_tokens, allocate_abstract_budgets, pack_summary_requests
+)
+
+def sentences(count, words=12):
+    return " ".join(f"Sentence {i} " + "word " * words + "ends here." for i in range(count))
+
+def make_paper(index, abstract):
+    return {"arxiv_id": f"2601.{index:05d}v1", "title": f"Paper {index} title", "abstract": abstract}
+
+def test_normalize_abstract_strips_latex():
+    abstract = r"We use \textbf{sparse} $\alpha$-attention~\cite{vaswani} on 50\% of   tokens."
+    assert normalize_abstract(abstract) == "We use sparse alpha-attention on 50% of tokens."
+
+def test_truncate_ends_at_a_sentence_within_budget():
+    text = sentences(20)
+    truncated = truncate_to_tokens(text, 50)
+    assert estimate_tokens(truncated) <= 50
+    assert truncated.endswith("ends here.")
+    assert truncate_to_tokens("Short abstract.", 50) == "Short abstract."
+
+def test_budgets_fit_the_total_and_favor_better_ranks():
+    lengths = [300] * 6
+    budgets = allocate_abstract_budgets(lengths, list(range(6)), 600)
+    assert sum(budgets) <= 600
+    assert budgets == sorted(budgets, reverse=True)
+    assert all(packer.MIN_ABSTRACT_TOKENS <= budget <= packer.MAX_ABSTRACT_TOKENS for budget in budgets)
+
+def test_short_abstracts_keep_their_length_and_free_budget_for_others():
+    budgets = allocate_abstract_budgets([40, 1000, 1000], [0, 1, 2], 600)
+    assert budgets[0] == 40
+    assert budgets[1] + budgets[2] <= 560
+    assert budgets[1] > budgets[2]
+
+def test_requests_respect_paper_and_token_limits(monkeypatch):
+    monkeypatch.setattr(packer, "REQUEST_INPUT_TOKEN_BUDGET", 400)
+    papers = [make_paper(i, sentences(30)) for i in range(10)]
+
+    requests = pack_summary_requests(papers, list(range(10)), max_papers=3)
+
+    packed = [paper for request in requests for paper in request]
+    assert [paper["arxiv_id"] for paper in packed] == [paper["arxiv_id"] for paper in papers]
+    for request in requests:
+        assert len(request) <= 3
+        tokens = sum(
+            estimate_tokens(paper["title"]) + estimate_tokens(paper["prompt_abstract"]) + packer.PAPER_OVERHEAD_TOKENS
+            for paper in request
+        )
+        assert len(request) == 1 or tokens <= 400
+    total = sum(estimate_tokens(paper["prompt_abstract"]) for paper in packed)
+    assert total <= packer.DIGEST_INPUT_TOKEN_BUDGET
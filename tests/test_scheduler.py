@@ -0,0 +1,73 @@
+"""
+Tests for the schedule triggers and worker sharding.
+"""
+from concurrent.futures import Future
+from datetime import datetime
+from src.database.leases import heartbeat
+from src.database.models import save_config
+from src.scheduler.triggers import get_due_frequencies, get_schedule_timezone
+from src.scheduler.workers import ScheduleWorker, shard_owner
+
+class FakeEngine:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, config, queued_at=None, delivery_at=None):
+        self.submitted.append((config['id'], delivery_at))
+        future = Future()
+        future.set_result(None)
+        return future
+
+def at(day, hour, minute=0):
+    return datetime(2026, 10, day, hour, minute, tzinfo=get_schedule_timezone())
+
+def test_weekly_configs_are_due_with_mondays_delivery():
+    # 2026-10-19 is a Monday; the current delivery is the next one, or one within the grace period
+    assert get_due_frequencies(3600, at(18, 8, 30)) == ["daily"]
+    assert get_due_frequencies(3600, at(19, 8, 30)) == ["daily", "weekly"]
+    assert get_due_frequencies(3600, at(19, 9, 30)) == ["daily", "weekly"]
+    assert get_due_frequencies(3600, at(19, 10, 30)) == ["daily"]
+
+def test_shard_owner_only_moves_configs_of_departed_worker():
+    before = {config_id: shard_owner(config_id, ["a", "b", "c"]) for config_id in range(300)}
+    after = {config_id: shard_owner(config_id, ["a", "b"]) for config_id in range(300)}
+    assert set(before.values()) == {"a", "b", "c"}
+    assert all(after[config_id] == owner for config_id, owner in before.items() if owner != "c")
+
+def test_worker_reuses_its_shard_until_workers_change(db_path, monkeypatch):
+    for i in range(4):
+        save_config({"frequency": "daily", "time_range": 1, "topic": "llm", "channel": f"C{i}"})
+    loads = []
+    load_shard = ScheduleWorker.load_shard
+    monkeypatch.setattr(ScheduleWorker, "load_shard", lambda self, *args: loads.append(args) or load_shard(self, *args))
+
+    engine = FakeEngine()
+    worker = ScheduleWorker(engine, worker_id="a")
+    now = at(20, 9, 1)
+    assert worker.poll(now) == 4
+    worker.poll(now)
+    worker.poll(now)
+    assert len(loads) == 1
+    assert [delivery_at for _, delivery_at in engine.submitted] == ["2026-10-20 09:00:00"] * 4
+
+    heartbeat("b")
+    assert worker.poll(now) == 0
+    assert len(loads) == 2
+    assert len(engine.submitted) == 4
+
+def test_worker_only_reports_its_own_pending_configs_as_due(db_path):
+    config_ids = [
+        save_config({"frequency": "daily", "time_range": 1, "topic": f"topic {i}", "channel": f"C{i}"})
+        for i in range(8)
+    ]
+    heartbeat("b")
+    worker = ScheduleWorker(FakeEngine(), worker_id="a")
+    now = at(20, 9, 1)
+    worker.poll(now)
+    owned = {config_id for config_id in config_ids if shard_owner(config_id, ("a", "b")) == "a"}
+    assert 0 < len(owned) < len(config_ids)
+    assert {config['id'] for config in worker.get_due_configs()} == owned
+
+    # Finished runs are no longer due, so their topics leave the arXiv batch
+    worker.poll(now)
+    assert worker.get_due_configs() == []
@@ -0,0 +1,50 @@
+"""
+Tests for the App Home tab.
+"""
+from src.database.models import save_config
+from src.slack_app import home
+
+class FakeClient:
+    def __init__(self, channels):
+        self.channels = channels
+        self.calls = 0
+
+    def users_conversations(self, **kwargs):
+        self.calls += 1
+        return {"channels": [{"id": channel} for channel in self.channels], "response_metadata": {}}
+
+def make_config(channel, created_by=None):
+    return {
+        "frequency": "daily",
+        "time_range": 1,
+        "topic": "llm",
+        "additional_topics": [],
+        "channel": channel,
+        "created_by": created_by
+    }
+
+def test_home_lists_unowned_configs_to_channel_members(db_path):
+    owned = save_config(make_config("C1", created_by="U1"))
+    legacy = save_config(make_config("C2"))
+    save_config(make_config("C3"))
+    home._channels.clear()
+
+    member = FakeClient(["C2"])
+    configs, _, _ = home.get_home_inputs("U1", member)
+    assert [config['id'] for config in configs] == [owned, legacy]
+
+    configs, _, _ = home.get_home_inputs("U2", FakeClient([]))
+    assert configs == []
+
+    # Memberships are cached between home opens
+    home.get_home_inputs("U1", member)
+    assert member.calls == 1
+
+def test_home_skips_channel_lookup_without_unowned_configs(db_path):
+    save_config(make_config("C1", created_by="U1"))
+    home._channels.clear()
+
+    client = FakeClient(["C1"])
+    configs, _, _ = home.get_home_inputs("U1", client)
+    assert len(configs) == 1
+    assert client.calls == 0